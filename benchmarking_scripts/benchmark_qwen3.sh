@@ -8,12 +8,16 @@
 # Configuration
 #/scratch/mmarkoc-pdx_performance/models/Qwen3-4B/Qwen_Qwen3-4B-GGUF_Qwen3-4B-Q4_K_M.gguf
 #/scratch/mmarkoc-pdx_performance/models/Qwen3-0.6B/Qwen_Qwen3-0.6B-GGUF_Qwen3-0.6B-Q8_0.gguf
-MODEL_PATH=~/models/Qwen3-8B/qwen3-8b-q5_k_m.gguf
+# Any GGUF works (e.g. MODEL_PATH=... ./script for a model matrix); the report names it
+MODEL_PATH=${MODEL_PATH:-~/models/Qwen3-8B/qwen3-8b-q5_k_m.gguf}
 LLAMA_BENCH=~/llama.cpp/build/bin/llama-bench
 THREADS=64
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 OUTPUT_DIR=~/perf-analysis-modeling-project/measurements/aaron
 OUTPUT_FILE=${OUTPUT_DIR}/benchmark_results_${TIMESTAMP}.md
+JSONL_FILE=${OUTPUT_DIR}/benchmark_results_${TIMESTAMP}.jsonl
+BENCH_STDERR=$(mktemp)
+trap 'rm -f $BENCH_STDERR' EXIT
 
 # Colors for terminal output
 GREEN='\033[0;32m'
@@ -37,6 +41,14 @@ handle_error() {
     echo "" >> $OUTPUT_FILE
 }
 
+# llama-bench writes its JSONL records (-oe jsonl) and its log messages to stderr:
+# append the records to $JSONL_FILE tagged with the test section, print the logs
+split_bench_stderr() {
+    local test_section=$1
+    grep '^{' $BENCH_STDERR | sed "s/^{/{\"test_section\": \"$test_section\", \"node\": \"$(hostname)\", /" >> $JSONL_FILE
+    grep -v '^{' $BENCH_STDERR
+}
+
 # Check if files exist
 check_prerequisites() {
     local errors=0
@@ -80,12 +92,12 @@ if ! module load openblas 2>/dev/null; then
 fi
 
 # Create markdown header
-cat > $OUTPUT_FILE << 'HEADER'
-# Qwen3-8B Performance Benchmark Results
+cat > $OUTPUT_FILE << HEADER
+# $(basename "$MODEL_PATH" .gguf) Performance Benchmark Results
 
 ## Test Configuration
 
-**Model:** Qwen3-8B (Q5_K_M quantization)  
+**Model:** $(basename "$MODEL_PATH")  
 **Hardware:** ORCA Supercluster  
 **Framework:** llama.cpp  
 HEADER
@@ -127,13 +139,17 @@ echo "" >> $OUTPUT_FILE
 
 # Test 1: CPU-Only (64 threads)
 echo -e "${GREEN}[1/3] Running CPU-Only benchmark (64 threads)...${NC}"
+CPU_CMD="$LLAMA_BENCH -m $MODEL_PATH -t $THREADS -oe jsonl"
 echo "## Test 1: CPU-Only (64 threads)" >> $OUTPUT_FILE
+echo "**Command:** \`CUDA_VISIBLE_DEVICES=\"\" $CPU_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
 # Run CPU-only test and capture output
-CPU_OUTPUT=$(CUDA_VISIBLE_DEVICES="" timeout 600 $LLAMA_BENCH -m $MODEL_PATH -t $THREADS 2>&1)
+CPU_OUTPUT=$(CUDA_VISIBLE_DEVICES="" timeout 600 $CPU_CMD 2>$BENCH_STDERR)
 CPU_EXIT_CODE=$?
+CPU_OUTPUT="$(split_bench_stderr "Test 1: CPU-Only (64 threads)")
+$CPU_OUTPUT"
 
 # Check if it completed successfully (look for benchmark results in output)
 if [ $CPU_EXIT_CODE -eq 0 ] && echo "$CPU_OUTPUT" | grep -q "t/s"; then
@@ -149,12 +165,16 @@ sleep 2
 
 # Test 2: GPU with 10 layers offloaded
 echo -e "${GREEN}[2/3] Running GPU benchmark with 10 layers offloaded...${NC}"
+GPU10_CMD="$LLAMA_BENCH -m $MODEL_PATH -ngl 10 -t $THREADS -oe jsonl"
 echo "## Test 2: GPU Partial Offloading (10 layers)" >> $OUTPUT_FILE
+echo "**Command:** \`$GPU10_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
-GPU10_OUTPUT=$(timeout 600 $LLAMA_BENCH -m $MODEL_PATH -ngl 10 -t $THREADS 2>&1)
+GPU10_OUTPUT=$(timeout 600 $GPU10_CMD 2>$BENCH_STDERR)
 GPU10_EXIT_CODE=$?
+GPU10_OUTPUT="$(split_bench_stderr "Test 2: GPU Partial Offloading (10 layers)")
+$GPU10_OUTPUT"
 
 if [ $GPU10_EXIT_CODE -eq 0 ] && echo "$GPU10_OUTPUT" | grep -q "t/s"; then
     echo "$GPU10_OUTPUT" | tee -a $OUTPUT_FILE
@@ -169,12 +189,16 @@ sleep 2
 
 # Test 3: GPU with all layers offloaded
 echo -e "${GREEN}[3/3] Running GPU benchmark with full offloading (all layers)...${NC}"
+GPU99_CMD="$LLAMA_BENCH -m $MODEL_PATH -ngl 99 -t $THREADS -oe jsonl"
 echo "## Test 3: GPU Full Offloading (all layers)" >> $OUTPUT_FILE
+echo "**Command:** \`$GPU99_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
-GPU99_OUTPUT=$(timeout 600 $LLAMA_BENCH -m $MODEL_PATH -ngl 99 -t $THREADS 2>&1)
+GPU99_OUTPUT=$(timeout 600 $GPU99_CMD 2>$BENCH_STDERR)
 GPU99_EXIT_CODE=$?
+GPU99_OUTPUT="$(split_bench_stderr "Test 3: GPU Full Offloading (all layers)")
+$GPU99_OUTPUT"
 
 if [ $GPU99_EXIT_CODE -eq 0 ] && echo "$GPU99_OUTPUT" | grep -q "t/s"; then
     echo "$GPU99_OUTPUT" | tee -a $OUTPUT_FILE
@@ -220,6 +244,7 @@ echo "*Stored in: $OUTPUT_FILE*" >> $OUTPUT_FILE
 echo ""
 echo -e "${BLUE}=== Benchmark Complete! ===${NC}"
 echo -e "${GREEN}Results saved to: $OUTPUT_FILE${NC}"
+echo -e "${GREEN}llama-bench records saved to: $JSONL_FILE${NC}"
 echo ""
 echo "You can view the results with:"
 echo "  cat $OUTPUT_FILE"
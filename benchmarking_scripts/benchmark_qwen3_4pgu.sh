@@ -6,12 +6,16 @@
 # COMMAND to acquire Nodes: salloc --cpus-per-task 64 --mem 200G --gres=gpu:4 --time=1:00:00
 
 # Configuration
-MODEL_PATH=~/models/Qwen3-8B/qwen3-8b-q5_k_m.gguf
+# Any GGUF works (e.g. MODEL_PATH=... ./script for a model matrix); the report names it
+MODEL_PATH=${MODEL_PATH:-~/models/Qwen3-8B/qwen3-8b-q5_k_m.gguf}
 LLAMA_BENCH=~/llama.cpp/build/bin/llama-bench
 THREADS=64
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 OUTPUT_DIR=~/perf-analysis-modeling-project/measurements/aaron
 OUTPUT_FILE=${OUTPUT_DIR}/benchmark_results_4gpu_${TIMESTAMP}.md
+JSONL_FILE=${OUTPUT_DIR}/benchmark_results_4gpu_${TIMESTAMP}.jsonl
+BENCH_STDERR=$(mktemp)
+trap 'rm -f $BENCH_STDERR' EXIT
 
 # Colors for terminal output
 GREEN='\033[0;32m'
@@ -35,6 +39,14 @@ handle_error() {
     echo "" >> $OUTPUT_FILE
 }
 
+# llama-bench writes its JSONL records (-oe jsonl) and its log messages to stderr:
+# append the records to $JSONL_FILE tagged with the test section, print the logs
+split_bench_stderr() {
+    local test_section=$1
+    grep '^{' $BENCH_STDERR | sed "s/^{/{\"test_section\": \"$test_section\", \"node\": \"$(hostname)\", /" >> $JSONL_FILE
+    grep -v '^{' $BENCH_STDERR
+}
+
 # Check if files exist
 check_prerequisites() {
     local errors=0
@@ -85,12 +97,12 @@ if ! module load openblas 2>/dev/null; then
 fi
 
 # Create markdown header
-cat > $OUTPUT_FILE << 'HEADER'
-# Qwen3-8B Performance Benchmark Results - 4 GPU Configuration
+cat > $OUTPUT_FILE << HEADER
+# $(basename "$MODEL_PATH" .gguf) Performance Benchmark Results - 4 GPU Configuration
 
 ## Test Configuration
 
-**Model:** Qwen3-8B (Q5_K_M quantization)  
+**Model:** $(basename "$MODEL_PATH")  
 **Hardware:** ORCA Supercluster  
 **Framework:** llama.cpp  
 HEADER
@@ -133,14 +145,18 @@ echo "" >> $OUTPUT_FILE
 
 # Test 1: Single GPU (Baseline)
 echo -e "${GREEN}[1/4] Running Single GPU benchmark (baseline)...${NC}"
+GPU1_CMD="$LLAMA_BENCH -m $MODEL_PATH -ngl 99 -t $THREADS -oe jsonl"
 echo "## Test 1: Single GPU (Baseline)" >> $OUTPUT_FILE
+echo "**Command:** \`CUDA_VISIBLE_DEVICES=0 $GPU1_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo "**Configuration:** All layers on GPU 0" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
-GPU1_OUTPUT=$(CUDA_VISIBLE_DEVICES=0 timeout 600 $LLAMA_BENCH -m $MODEL_PATH -ngl 99 -t $THREADS 2>&1)
+GPU1_OUTPUT=$(CUDA_VISIBLE_DEVICES=0 timeout 600 $GPU1_CMD 2>$BENCH_STDERR)
 GPU1_EXIT_CODE=$?
+GPU1_OUTPUT="$(split_bench_stderr "Test 1: Single GPU (Baseline)")
+$GPU1_OUTPUT"
 
 if [ $GPU1_EXIT_CODE -eq 0 ] && echo "$GPU1_OUTPUT" | grep -q "t/s"; then
     echo "$GPU1_OUTPUT" | tee -a $OUTPUT_FILE
@@ -155,14 +171,18 @@ sleep 2
 
 # Test 2: Dual GPU
 echo -e "${GREEN}[2/4] Running Dual GPU benchmark...${NC}"
+GPU2_CMD="$LLAMA_BENCH -m $MODEL_PATH -ngl 99 -ts 8,8,0,0 -t $THREADS -oe jsonl"
 echo "## Test 2: Dual GPU (2 GPUs)" >> $OUTPUT_FILE
+echo "**Command:** \`$GPU2_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo "**Configuration:** Tensor split 8,8,0,0 (using GPU 0 and 1)" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
-GPU2_OUTPUT=$(timeout 600 $LLAMA_BENCH -m $MODEL_PATH -ngl 99 -ts 8,8,0,0 -t $THREADS 2>&1)
+GPU2_OUTPUT=$(timeout 600 $GPU2_CMD 2>$BENCH_STDERR)
 GPU2_EXIT_CODE=$?
+GPU2_OUTPUT="$(split_bench_stderr "Test 2: Dual GPU (2 GPUs)")
+$GPU2_OUTPUT"
 
 if [ $GPU2_EXIT_CODE -eq 0 ] && echo "$GPU2_OUTPUT" | grep -q "t/s"; then
     echo "$GPU2_OUTPUT" | tee -a $OUTPUT_FILE
@@ -177,14 +197,18 @@ sleep 2
 
 # Test 3: Quad GPU Balanced
 echo -e "${GREEN}[3/4] Running Quad GPU benchmark (balanced)...${NC}"
+GPU4_CMD="$LLAMA_BENCH -m $MODEL_PATH -ngl 99 -ts 4,4,4,4 -t $THREADS -oe jsonl"
 echo "## Test 3: Quad GPU - Balanced Distribution" >> $OUTPUT_FILE
+echo "**Command:** \`$GPU4_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo "**Configuration:** Tensor split 4,4,4,4 (evenly distributed)" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
-GPU4_OUTPUT=$(timeout 600 $LLAMA_BENCH -m $MODEL_PATH -ngl 99 -ts 4,4,4,4 -t $THREADS 2>&1)
+GPU4_OUTPUT=$(timeout 600 $GPU4_CMD 2>$BENCH_STDERR)
 GPU4_EXIT_CODE=$?
+GPU4_OUTPUT="$(split_bench_stderr "Test 3: Quad GPU - Balanced Distribution")
+$GPU4_OUTPUT"
 
 if [ $GPU4_EXIT_CODE -eq 0 ] && echo "$GPU4_OUTPUT" | grep -q "t/s"; then
     echo "$GPU4_OUTPUT" | tee -a $OUTPUT_FILE
@@ -199,14 +223,18 @@ sleep 2
 
 # Test 4: Quad GPU Custom Split
 echo -e "${GREEN}[4/4] Running Quad GPU benchmark (custom split)...${NC}"
+GPU4C_CMD="$LLAMA_BENCH -m $MODEL_PATH -ngl 99 -ts 5,5,3,3 -t $THREADS -oe jsonl"
 echo "## Test 4: Quad GPU - Custom Distribution" >> $OUTPUT_FILE
+echo "**Command:** \`$GPU4C_CMD\`" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo "**Configuration:** Tensor split 5,5,3,3 (weighted distribution)" >> $OUTPUT_FILE
 echo "" >> $OUTPUT_FILE
 echo '```' >> $OUTPUT_FILE
 
-GPU4C_OUTPUT=$(timeout 600 $LLAMA_BENCH -m $MODEL_PATH -ngl 99 -ts 5,5,3,3 -t $THREADS 2>&1)
+GPU4C_OUTPUT=$(timeout 600 $GPU4C_CMD 2>$BENCH_STDERR)
 GPU4C_EXIT_CODE=$?
+GPU4C_OUTPUT="$(split_bench_stderr "Test 4: Quad GPU - Custom Distribution")
+$GPU4C_OUTPUT"
 
 if [ $GPU4C_EXIT_CODE -eq 0 ] && echo "$GPU4C_OUTPUT" | grep -q "t/s"; then
     echo "$GPU4C_OUTPUT" | tee -a $OUTPUT_FILE
@@ -265,6 +293,7 @@ echo "*Stored in: $OUTPUT_FILE*" >> $OUTPUT_FILE
 echo ""
 echo -e "${BLUE}=== 4-GPU Benchmark Complete! ===${NC}"
 echo -e "${GREEN}Results saved to: $OUTPUT_FILE${NC}"
+echo -e "${GREEN}llama-bench records saved to: $JSONL_FILE${NC}"
 echo ""
 echo "You can view the results with:"
 echo "  cat $OUTPUT_FILE"
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Stand-in for llama-bench when no GPU node / model is at hand
+
+Accepts the llama-bench flags the sweep tooling uses and prints plausible
+records (md, json, jsonl or csv; jsonl one test at a time) after sleeping
+FAKE_LLAMA_BENCH_SECONDS per test. Throughput comes from FAKE_PP_TS / FAKE_TG_TS (GPU) and FAKE_CPU_PP_TS /
+FAKE_CPU_TG_TS (CPU-only), with a little noise per repetition, scaled down
+for deep KV caches (-d, softened by -fa and quantized -ctk/-ctv, worsened by
+-nkvo) and small ubatches (-ub). The FAKE_* rates are for Qwen3-8B Q5_K_M;
+other models named in the -m file name ("...Qwen3-4B-Q4_K_M.gguf") report
+their own type/size/params, pp scaled by params and tg by weight bytes.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+
+# Quant mixes the -m file name may carry: (llama-bench model_type suffix, bits per weight)
+QUANTS = {
+    'Q4_0': ('Q4_0', 4.50), 'Q4_K_S': ('Q4_K - Small', 4.58), 'Q4_K_M': ('Q4_K - Medium', 4.85),
+    'Q5_K_S': ('Q5_K - Small', 5.54), 'Q5_K_M': ('Q5_K - Medium', 5.69), 'Q6_K': ('Q6_K', 6.56),
+    'Q8_0': ('Q8_0', 8.50), 'F16': ('F16', 16.0),
+}
+REFERENCE_PARAMS, REFERENCE_SIZE = 8190000000, 5840000000
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('-m', '--model', default='models/7B/ggml-model-q4_0.gguf')
+    parser.add_argument('-r', '--repetitions', type=int, default=5)
+    parser.add_argument('-o', '--output', default='md')
+    parser.add_argument('-oe', '--output-err')
+    parser.add_argument('-p', '--n-prompt', type=int, default=512)
+    parser.add_argument('-n', '--n-gen', type=int, default=128)
+    parser.add_argument('-pg')
+    parser.add_argument('-d', '--n-depth', type=int, default=0)
+    parser.add_argument('-b', '--batch-size', type=int, default=2048)
+    parser.add_argument('-ub', '--ubatch-size', type=int, default=512)
+    parser.add_argument('-ctk', '--cache-type-k', default='f16')
+    parser.add_argument('-ctv', '--cache-type-v', default='f16')
+    parser.add_argument('-t', '--threads', type=int, default=64)
+    parser.add_argument('-C', '--cpu-mask', default='0x0')
+    parser.add_argument('--cpu-strict', type=int, default=0)
+    parser.add_argument('--poll', type=int, default=50)
+    parser.add_argument('--numa', default='')
+    parser.add_argument('-ngl', '--n-gpu-layers', type=int, default=99)
+    parser.add_argument('-sm', '--split-mode', default='layer')
+    parser.add_argument('-mg', '--main-gpu', type=int, default=0)
+    parser.add_argument('-nkvo', '--no-kv-offload', type=int, default=0)
+    parser.add_argument('-fa', '--flash-attn', type=int, default=0)
+    parser.add_argument('-ts', '--tensor-split', default='0')
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def make_tests(args):
+    tests = []
+    if args.n_prompt:
+        tests.append((args.n_prompt, 0))
+    if args.n_gen:
+        tests.append((0, args.n_gen))
+    if args.pg:
+        pp, tg = (int(v) for v in args.pg.split(','))
+        tests.append((pp, tg))
+    return tests
+
+def fake_model(path):
+    """(model_type, model_size, model_n_params) for a GGUF file name like Qwen3-4B-Q4_K_M.gguf."""
+    size = re.search(r'(\d+(?:\.\d+)?)B', os.path.basename(path), re.IGNORECASE)
+    quant = re.search(r'(Q\d_K_[SM]|Q\d_K|Q\d_0|F16)', os.path.basename(path), re.IGNORECASE)
+    if not size or not quant or quant.group(1).upper() not in QUANTS:
+        return 'qwen3 8B Q5_K - Medium', REFERENCE_SIZE, REFERENCE_PARAMS
+    params = {'0.6': 596049920, '4': 4022468096, '8': REFERENCE_PARAMS}.get(size.group(1), float(size.group(1)) * 1e9)
+    label, bits = QUANTS[quant.group(1).upper()]
+    return f"qwen3 {size.group(1)}B {label}", int(params * bits / 8), int(params)
+
+def make_record(args, n_prompt, n_gen, gpu_info, test_time):
+    on_gpu = bool(gpu_info) and args.n_gpu_layers > 0
+    if n_gen and not n_prompt:
+        base = float(os.environ.get('FAKE_TG_TS' if on_gpu else 'FAKE_CPU_TG_TS', 75.0 if on_gpu else 15.0))
+        tokens = n_gen
+    else:
+        base = float(os.environ.get('FAKE_PP_TS' if on_gpu else 'FAKE_CPU_PP_TS', 2400.0 if on_gpu else 7.0))
+        tokens = n_prompt + n_gen
+    if not on_gpu:
+        # FAKE_CPU_*_TS are for 64 threads: pp scales with cores, tg flattens once memory-bound
+        base *= min(1.0, args.threads / (24 if n_gen and not n_prompt else 64))
+    # Attention over the KV cache slows tg far more than pp as depth grows; small ubatches starve pp.
+    # Flash attention and smaller cache types soften that; -nkvo pulls the cache over PCIe.
+    kv_bits = {'f16': 16, 'q8_0': 8.5, 'q4_0': 4.5}
+    kv_cost = (kv_bits.get(args.cache_type_k, 16) + kv_bits.get(args.cache_type_v, 16)) / 32
+    kv_cost *= 0.7 if args.flash_attn else 1.0
+    kv_cost *= 4.0 if args.no_kv_offload and on_gpu else 1.0
+    base /= 1 + kv_cost * args.n_depth / (16384 if n_gen and not n_prompt else 65536)
+    if kv_bits.get(args.cache_type_k, 16) < 16 or kv_bits.get(args.cache_type_v, 16) < 16:
+        base *= 0.97
+    if n_prompt:
+        base *= min(1.0, args.ubatch_size / 512) ** 0.5
+    model_type, model_size, model_n_params = fake_model(args.model)
+    # pp is compute-bound (scales with params), tg bandwidth-bound (weight bytes) plus a fixed per-token cost
+    if n_gen and not n_prompt:
+        base /= 0.1 + 0.9 * model_size / REFERENCE_SIZE
+    else:
+        base *= REFERENCE_PARAMS / model_n_params
+    samples_ts = [base * random.uniform(0.98, 1.02) for _ in range(args.repetitions)]
+    samples_ns = [int(tokens / ts * 1e9) for ts in samples_ts]
+    avg = sum(samples_ts) / len(samples_ts)
+    std = (sum((s - avg) ** 2 for s in samples_ts) / max(1, len(samples_ts) - 1)) ** 0.5
+    return {
+        'build_commit': 'fake', 'build_number': 0,
+        'cpu_info': 'Fake CPU', 'gpu_info': gpu_info, 'backends': 'CUDA,BLAS',
+        'model_filename': args.model, 'model_type': model_type,
+        'model_size': model_size, 'model_n_params': model_n_params,
+        'n_batch': args.batch_size, 'n_ubatch': args.ubatch_size, 'n_threads': args.threads,
+        'cpu_mask': args.cpu_mask, 'cpu_strict': bool(args.cpu_strict), 'poll': args.poll,
+        'type_k': args.cache_type_k, 'type_v': args.cache_type_v,
+        'n_gpu_layers': args.n_gpu_layers, 'split_mode': args.split_mode, 'main_gpu': args.main_gpu,
+        'no_kv_offload': bool(args.no_kv_offload), 'flash_attn': bool(args.flash_attn),
+        'tensor_split': args.tensor_split, 'use_mmap': True, 'embeddings': False,
+        'n_prompt': n_prompt, 'n_gen': n_gen, 'n_depth': args.n_depth,
+        'test_time': test_time,
+        'avg_ns': int(sum(samples_ns) / len(samples_ns)), 'stddev_ns': 0,
+        'avg_ts': avg, 'stddev_ts': std, 'samples_ns': samples_ns, 'samples_ts': samples_ts,
+    }
+
+def format_records(records, fmt):
+    if fmt == 'jsonl':
+        return "".join(json.dumps(r) + "\n" for r in records)
+    if fmt == 'json':
+        return json.dumps(records, indent=2) + "\n"
+    if fmt == 'csv':
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=list(records[0]))
+        writer.writeheader()
+        for r in records:
+            writer.writerow(dict(r, samples_ns=" ".join(map(str, r['samples_ns'])),
+                                 samples_ts=" ".join(f"{v:.6f}" for v in r['samples_ts'])))
+        return buf.getvalue()
+    lines = ["| model                          |       size |     params | backend    | threads |            test |                  t/s |",
+             "| ------------------------------ | ---------: | ---------: | ---------- | ------: | --------------: | -------------------: |"]
+    for r in records:
+        test = f"pp{r['n_prompt']}" if not r['n_gen'] else f"tg{r['n_gen']}" if not r['n_prompt'] \
+            else f"pp{r['n_prompt']}+tg{r['n_gen']}"
+        if r['n_depth']:
+            test += f" @ d{r['n_depth']}"
+        size = f"{r['model_size'] / 2**30:6.2f} GiB" if r['model_size'] >= 2**30 else f"{r['model_size'] / 2**20:6.2f} MiB"
+        params = f"{r['model_n_params'] / 1e9:6.2f} B" if r['model_n_params'] >= 1e9 else f"{r['model_n_params'] / 1e6:6.2f} M"
+        lines.append(f"| {r['model_type']:30s} | {size} | {params} "
+                     f"| {r['backends']:10s} | {r['n_threads']:7d} | {test:>15s} | {r['avg_ts']:12.2f} ± {r['stddev_ts']:.2f} |")
+    return "\n".join(lines) + "\n\nbuild: fake (0)\n"
+
+def main(argv=None):
+    args = parse_args(argv)
+    visible = os.environ.get('CUDA_VISIBLE_DEVICES')
+    n_devices = len([d for d in visible.split(',') if d.strip()]) if visible is not None else 1
+    if n_devices:
+        gpu_info = ", ".join(["NVIDIA A30"] * n_devices)
+        print(f"ggml_cuda_init: found {n_devices} CUDA devices:", file=sys.stderr)
+        for i in range(n_devices):
+            print(f"  Device {i}: NVIDIA A30, compute capability 8.0, VMM: yes", file=sys.stderr)
+    else:
+        gpu_info = ""
+        print("ggml_cuda_init: failed to initialize CUDA: no CUDA-capable device is detected", file=sys.stderr)
+
+    delay = float(os.environ.get('FAKE_LLAMA_BENCH_SECONDS', 0.1))
+    records = []
+    for n_prompt, n_gen in make_tests(args):
+        # Real llama-bench stamps test_time before its warmup run and depth prefill. The fake has
+        # neither, so its test_time is closer to the repetitions than a real record's would be
+        test_time = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        time.sleep(delay)
+        records.append(make_record(args, n_prompt, n_gen, gpu_info, test_time))
+        if args.output == 'jsonl':
+            # Like llama-bench, jsonl output prints each test as soon as it finishes
+            sys.stdout.write(format_records(records[-1:], 'jsonl'))
+            sys.stdout.flush()
+
+    if args.output != 'jsonl':
+        sys.stdout.write(format_records(records, args.output))
+    if args.output_err:
+        sys.stderr.write(format_records(records, args.output_err))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Stand-in for nvidia-smi when testing the telemetry sampler off a GPU node
+
+Supports the two invocations telemetry.py makes:
+    --query-gpu=index,... --format=csv,noheader,nounits [-i 0,1]
+    dmon -s t -d N [-i 0,1]
+Readings come from FAKE_GPU_COUNT, FAKE_SM_MHZ, FAKE_POWER_W, FAKE_PCIE_MBPS
+(with a little noise). FAKE_THROTTLE_FILE, if it exists, switches every GPU
+to a throttled state (lower clocks, reason 0x4) for as long as it exists.
+"""
+
+import os
+import random
+import sys
+import time
+
+def gpu_ids(argv):
+    if '-i' in argv:
+        return argv[argv.index('-i') + 1].split(',')
+    return [str(i) for i in range(int(os.environ.get('FAKE_GPU_COUNT', 4)))]
+
+def throttled():
+    flag = os.environ.get('FAKE_THROTTLE_FILE')
+    return bool(flag) and os.path.exists(flag)
+
+def noisy(value):
+    return value * random.uniform(0.99, 1.01)
+
+def query_row(gpu):
+    sm = float(os.environ.get('FAKE_SM_MHZ', 1440))
+    power = float(os.environ.get('FAKE_POWER_W', 160))
+    if throttled():
+        sm, power = sm * 0.6, power * 0.7
+    values = {
+        'index': gpu,
+        'clocks.sm': f"{noisy(sm):.0f}",
+        'clocks.mem': "1215",
+        'power.draw': f"{noisy(power):.2f}",
+        'memory.used': "6350",
+        'utilization.gpu': f"{random.randint(90, 100)}",
+        'utilization.memory': f"{random.randint(60, 80)}",
+        'temperature.gpu': f"{random.randint(55, 65)}",
+        'clocks_throttle_reasons.active': "0x0000000000000004" if throttled() else "0x0000000000000000",
+    }
+    return values
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    gpus = gpu_ids(argv)
+    query = next((a.split('=', 1)[1] for a in argv if a.startswith('--query-gpu=')), None)
+    if query:
+        fields = query.split(',')
+        for gpu in gpus:
+            row = query_row(gpu)
+            print(", ".join(row.get(f, "[N/A]") for f in fields))
+        return 0
+    if argv[:1] == ['dmon']:
+        delay = float(argv[argv.index('-d') + 1]) if '-d' in argv else 1.0
+        mbps = float(os.environ.get('FAKE_PCIE_MBPS', 900))
+        print("# gpu  rxpci  txpci", flush=True)
+        print("# Idx   MB/s   MB/s", flush=True)
+        while True:
+            for gpu in gpus:
+                print(f"{gpu:>5s} {noisy(mbps):6.0f} {noisy(mbps / 4):6.0f}", flush=True)
+            time.sleep(delay)
+    print("fake_nvidia_smi: unsupported arguments", file=sys.stderr)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
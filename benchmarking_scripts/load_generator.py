@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Open-loop serving load generator for llama-server
+
+Requests arrive on a schedule (Poisson, constant, or replayed from a trace)
+whether or not earlier ones have finished, and go out over a pool of
+keep-alive HTTP connections as streaming /completion calls. Latencies are
+measured from the scheduled arrival, so time spent waiting for a connection
+or a server slot counts (no coordinated omission). Each rate step records
+TTFT, TPOT and end-to-end histograms into
+serving_results_<timestamp>.jsonl, which analyze_results.py and
+visualize_results.py pick up.
+
+    python3 load_generator.py --rates 1,2,4,8               # fixed steps
+    python3 load_generator.py --search --slo ttft_p99=2000,tpot_p99=100
+    python3 load_generator.py --trace trace.jsonl --rates 2  # replay, rescaled to 2 req/s
+
+Trace lines are {"timestamp": <seconds>, "prompt_tokens": N, "n_predict": M}
+(prompt_tokens/n_predict optional). mock_llama_server.py stands in for
+llama-server in tests.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ANALYSIS_DIR = Path(__file__).resolve().parent.parent / "measurements/aaron"
+sys.path.insert(0, str(ANALYSIS_DIR))
+
+from serving_latency import LatencyHistogram, format_slo, parse_slo, slo_violations
+
+from sweep import BLUE, GREEN, NC, OUTPUT_DIR, RED, YELLOW
+
+SERVER_URL = "http://127.0.0.1:8080"
+DURATION = 60           # seconds of arrivals per rate step
+DRAIN_TIMEOUT = 120     # seconds to wait for in-flight requests after the last arrival
+CONNECTIONS = 64
+PROMPT_TOKENS = 512
+N_PREDICT = 128
+
+class ConnectionPool:
+    """At most `size` keep-alive connections to one host; callers wait for a free one."""
+
+    def __init__(self, host, port, size):
+        self.host, self.port = host, port
+        self.slots = asyncio.Semaphore(size)
+        self.idle = []
+
+    async def acquire(self):
+        await self.slots.acquire()
+        if self.idle:
+            return self.idle.pop()
+        try:
+            return await asyncio.open_connection(self.host, self.port)
+        except OSError:
+            self.slots.release()
+            raise
+
+    def release(self, conn, reusable):
+        if reusable:
+            self.idle.append(conn)
+        else:
+            conn[1].close()
+        self.slots.release()
+
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+async def read_body(reader, headers):
+    """Yield body chunks (chunked, Content-Length or until close); the last item says if the connection is reusable."""
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            yield await reader.readexactly(size)
+            await reader.readline()
+        yield headers.get('connection', '').lower() != 'close'
+    elif 'content-length' in headers:
+        yield await reader.readexactly(int(headers['content-length']))
+        yield headers.get('connection', '').lower() != 'close'
+    else:
+        while chunk := await reader.read(65536):
+            yield chunk
+        yield False
+
+async def stream_completion(pool, path, payload):
+    """POST one streaming request; yield each SSE event's JSON as it arrives."""
+    body = json.dumps(payload).encode()
+    reader, writer = conn = await pool.acquire()
+    reusable = False
+    try:
+        writer.write(f"POST {path} HTTP/1.1\r\nHost: {pool.host}:{pool.port}\r\n"
+                     f"Content-Type: application/json\r\nAccept: text/event-stream\r\n"
+                     f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        status = (await reader.readline()).decode().split(' ', 2)
+        if len(status) < 2:
+            raise ConnectionError("connection closed before response")
+        headers = {}
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            key, _, value = line.decode().partition(':')
+            headers[key.strip().lower()] = value.strip()
+        if status[1] != '200':
+            raise ConnectionError(f"HTTP {status[1]}")
+
+        buffer = b''
+        async for chunk in read_body(reader, headers):
+            if isinstance(chunk, bool):
+                reusable = chunk
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+            for line in lines:
+                if line.startswith(b'data:'):
+                    yield json.loads(line[5:])
+    finally:
+        pool.release(conn, reusable)
+
+async def one_request(pool, path, arrival, prompt_tokens, n_predict, hists, counters):
+    payload = {
+        # Random token ids: no prompt-cache hits and an exact prompt length
+        'prompt': [random.randint(100, 30000) for _ in range(prompt_tokens)],
+        'n_predict': n_predict,
+        'stream': True,
+        'cache_prompt': False,
+        'ignore_eos': True,
+    }
+    first = last = None
+    tokens = 0
+    try:
+        async for event in stream_completion(pool, path, payload):
+            now = time.perf_counter()
+            if event.get('content') or event.get('tokens'):
+                first = first or now
+                last = now
+                tokens += 1
+            if event.get('stop'):
+                # Keep reading to the end of the body so the connection can be reused
+                tokens = event.get('timings', {}).get('predicted_n', tokens)
+                last = now
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+        counters['errors'] += 1
+        return
+    if first is None:
+        counters['errors'] += 1
+        return
+    hists['ttft'].record(first - arrival)
+    if tokens > 1:
+        hists['tpot'].record((last - first) / (tokens - 1))
+    hists['e2e'].record(last - arrival)
+    counters['tokens'] += tokens
+    counters['done'] += 1
+    counters['end'] = max(counters['end'], last)
+
+def arrival_schedule(rate, duration, arrival, trace=None):
+    """[(offset seconds, prompt_tokens or None, n_predict or None)] for one step."""
+    if trace:
+        # Replay the trace's shape, time-scaled so its mean rate is `rate`
+        span = trace[-1]['timestamp'] - trace[0]['timestamp'] or 1.0
+        scale = (len(trace) - 1) / span / rate if len(trace) > 1 else 1.0
+        schedule = [((t['timestamp'] - trace[0]['timestamp']) * scale, t.get('prompt_tokens'), t.get('n_predict'))
+                    for t in trace]
+        return [s for s in schedule if s[0] < duration]
+    schedule, t = [], 0.0
+    while True:
+        t += random.expovariate(rate) if arrival == 'poisson' else 1.0 / rate
+        if t >= duration:
+            return schedule
+        schedule.append((t, None, None))
+
+async def run_step(rate, args, trace=None):
+    url = urlsplit(args.url)
+    pool = ConnectionPool(url.hostname, url.port or 80, args.connections)
+    hists = {metric: LatencyHistogram() for metric in ('ttft', 'tpot', 'e2e')}
+    counters = {'errors': 0, 'tokens': 0, 'done': 0, 'end': 0.0}
+    schedule = arrival_schedule(rate, args.duration, args.arrival, trace)
+
+    start = time.perf_counter()
+    tasks = []
+    for offset, prompt_tokens, n_predict in schedule:
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one_request(
+            pool, url.path or '/completion', start + offset,
+            prompt_tokens or args.prompt_tokens, n_predict or args.n_predict, hists, counters)))
+    done, pending = await asyncio.wait(tasks, timeout=DRAIN_TIMEOUT) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+    counters['errors'] += len(pending)
+    pool.close()
+
+    end = counters['end'] if counters['end'] and not pending else time.perf_counter()
+    elapsed = end - start
+    return {
+        'node': args.node,
+        'url': args.url,
+        'arrival': 'trace' if trace else args.arrival,
+        'target_rate': rate,
+        'duration': args.duration,
+        'prompt_tokens': args.prompt_tokens,
+        'n_predict': args.n_predict,
+        'connections': args.connections,
+        'n_requests': len(schedule),
+        'n_errors': counters['errors'],
+        'achieved_rate': counters['done'] / elapsed if elapsed > 0 else 0.0,
+        'output_tps': counters['tokens'] / elapsed if elapsed > 0 else 0.0,
+        'slo': [[metric, pct, limit] for (metric, pct), limit in args.slo.items()],
+        **{metric: hist.to_dict() for metric, hist in hists.items()},
+    }
+
+def report_step(step, slo):
+    ttft = LatencyHistogram.from_dict(step['ttft'])
+    tpot = LatencyHistogram.from_dict(step['tpot'])
+    broken = slo_violations(step, slo)
+    color = RED if broken else GREEN
+    print(f"{color}{step['target_rate']:7.2f} req/s → {step['achieved_rate']:6.2f} done/s, "
+          f"{step['output_tps']:7.1f} t/s | TTFT p50 {ttft.percentile(50)*1000:.0f} ms "
+          f"p99 {ttft.percentile(99)*1000:.0f} ms | TPOT p99 {tpot.percentile(99)*1000:.1f} ms | "
+          f"{step['n_errors']} errors{' | SLO broken: ' + ', '.join(broken) if broken else ''}{NC}")
+    return not broken
+
+def search_rates(args, measure):
+    """Double the rate until the SLO breaks, then bisect between the last pass and first failure."""
+    passed, failed = None, None
+    rate = args.start_rate
+    while failed is None and rate <= args.max_rate:
+        if measure(rate):
+            passed, rate = rate, rate * 2
+        else:
+            failed = rate
+    if passed is None or failed is None:
+        return passed
+    for _ in range(args.search_steps):
+        rate = (passed + failed) / 2
+        if measure(rate):
+            passed = rate
+        else:
+            failed = rate
+    return passed
+
+def load_trace(path):
+    with open(path) as f:
+        trace = [json.loads(line) for line in f if line.strip()]
+    return sorted(trace, key=lambda t: t['timestamp'])
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop streaming load generator for llama-server")
+    parser.add_argument('--url', default=f"{SERVER_URL}/completion", help="completion endpoint (default: %(default)s)")
+    parser.add_argument('--rates', default="1,2,4", help="comma-separated request rates in req/s (default: %(default)s)")
+    parser.add_argument('--arrival', choices=['poisson', 'constant'], default='poisson', help="default: %(default)s")
+    parser.add_argument('--trace', type=Path, help="JSONL arrival trace to replay instead of --arrival")
+    parser.add_argument('--duration', type=float, default=DURATION, help="seconds of arrivals per step (default: %(default)s)")
+    parser.add_argument('--connections', type=int, default=CONNECTIONS, help="connection pool size (default: %(default)s)")
+    parser.add_argument('--prompt-tokens', type=int, default=PROMPT_TOKENS, help="default: %(default)s")
+    parser.add_argument('--n-predict', type=int, default=N_PREDICT, help="default: %(default)s")
+    parser.add_argument('--slo', default="", help="p-latency limits in ms, e.g. ttft_p99=2000,tpot_p99=100")
+    parser.add_argument('--search', action='store_true', help="find the max rate that meets --slo")
+    parser.add_argument('--start-rate', type=float, default=0.5, help="first --search rate (default: %(default)s)")
+    parser.add_argument('--max-rate', type=float, default=256, help="give up doubling past this (default: %(default)s)")
+    parser.add_argument('--search-steps', type=int, default=4, help="bisection steps after doubling (default: %(default)s)")
+    parser.add_argument('--seed', type=int, help="seed arrivals and prompts")
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR, help="default: %(default)s")
+    parser.add_argument('--node', default=socket.gethostname(), help="node name recorded with results")
+    args = parser.parse_args(argv)
+    args.slo = parse_slo(args.slo)
+    if args.search and not args.slo:
+        parser.error("--search needs --slo")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+    trace = load_trace(args.trace) if args.trace else None
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = args.output_dir / f"serving_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+    print(f"{BLUE}=== llama-server load: {args.url} ==={NC}")
+    print(f"{'trace ' + args.trace.name if trace else args.arrival} arrivals, {args.duration:g}s per step, "
+          f"{args.prompt_tokens} prompt / {args.n_predict} output tokens, {args.connections} connections")
+    if args.slo:
+        print(f"SLO: {format_slo(args.slo)}")
+    print(f"Results stream to: {output_file}\n")
+
+    def measure(rate):
+        step = asyncio.run(run_step(rate, args, trace))
+        with open(output_file, 'a') as f:
+            f.write(json.dumps(step) + "\n")
+        return report_step(step, args.slo)
+
+    if args.search:
+        best = search_rates(args, measure)
+        if best is None:
+            print(f"\n{YELLOW}⚠ No rate from {args.start_rate:g} req/s met the SLO{NC}")
+        else:
+            print(f"\n{GREEN}💡 Max sustainable rate: {best:.2f} req/s{NC}")
+    else:
+        for rate in (float(r) for r in args.rates.split(',')):
+            measure(rate)
+
+    print(f"\n{BLUE}=== Load generation complete ==={NC}")
+    print(f"{GREEN}Results saved to: {output_file}{NC}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Stand-in for llama-server when testing load_generator.py off a GPU node
+
+Serves GET /health and POST /completion (streaming SSE over chunked
+transfer encoding, or a single JSON body) on keep-alive connections. Like
+llama-server with -np N, at most --slots requests decode at once and the
+rest queue. Prefill takes prompt_tokens / --prompt-tps seconds, then tokens
+stream at --tps per slot, slowed by --batch-penalty for every other busy
+slot (shared GPU bandwidth).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode().split(' ', 2)
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+        key, _, value = line.decode().partition(':')
+        headers[key.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return method, path, body
+
+def respond(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body)
+
+def send_chunk(writer, data):
+    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+class MockServer:
+    def __init__(self, args):
+        self.args = args
+        self.slots = asyncio.Semaphore(args.slots)
+        self.busy = 0
+
+    async def completion(self, writer, request):
+        prompt = request.get('prompt', '')
+        prompt_n = len(prompt) if isinstance(prompt, list) else max(1, len(prompt) // 4)
+        n_predict = request.get('n_predict', 128)
+        if n_predict < 0:
+            n_predict = 128
+        stream = request.get('stream', False)
+
+        async with self.slots:
+            self.busy += 1
+            try:
+                started = time.perf_counter()
+                await asyncio.sleep(prompt_n / self.args.prompt_tps)
+                prompt_ms = (time.perf_counter() - started) * 1000
+                if stream:
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                                 b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n")
+                decode_start = time.perf_counter()
+                for i in range(n_predict):
+                    slowdown = 1 + self.args.batch_penalty * (self.busy - 1)
+                    await asyncio.sleep(slowdown / self.args.tps)
+                    if stream:
+                        send_chunk(writer, b"data: " + json.dumps({'content': ' tok', 'stop': False}).encode() + b"\n\n")
+                        await writer.drain()
+                predicted_ms = (time.perf_counter() - decode_start) * 1000
+            finally:
+                self.busy -= 1
+
+        final = {
+            'content': '' if stream else ' tok' * n_predict,
+            'stop': True,
+            'tokens_predicted': n_predict,
+            'tokens_evaluated': prompt_n,
+            'timings': {'prompt_n': prompt_n, 'prompt_ms': prompt_ms,
+                        'predicted_n': n_predict, 'predicted_ms': predicted_ms},
+        }
+        if stream:
+            send_chunk(writer, b"data: " + json.dumps(final).encode() + b"\n\n")
+            writer.write(b"0\r\n\r\n")
+        else:
+            respond(writer, "200 OK", final)
+
+    async def handle(self, reader, writer):
+        try:
+            while (request := await read_request(reader)) is not None:
+                method, path, body = request
+                if method == 'GET' and path == '/health':
+                    respond(writer, "200 OK", {'status': 'ok'})
+                elif method == 'POST' and path == '/completion':
+                    await self.completion(writer, json.loads(body or b'{}'))
+                else:
+                    respond(writer, "404 Not Found", {'error': f"{method} {path}"})
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(args):
+    server = MockServer(args)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    print(f"mock llama-server on http://{args.host}:{args.port} ({args.slots} slots, "
+          f"{args.tps:g} t/s per slot, prefill {args.prompt_tps:g} t/s)", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mock llama-server that streams tokens at a set rate")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--slots', type=int, default=4, help="concurrent decodes, like -np (default: %(default)s)")
+    parser.add_argument('--tps', type=float, default=50.0, help="tokens/sec per slot (default: %(default)s)")
+    parser.add_argument('--prompt-tps', type=float, default=2000.0, help="prefill tokens/sec (default: %(default)s)")
+    parser.add_argument('--batch-penalty', type=float, default=0.1,
+                        help="per-token slowdown per additional busy slot (default: %(default)s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
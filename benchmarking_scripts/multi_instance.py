@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-instance llama-bench runner
+
+Each layout runs N llama-bench replicas at once from a process pool whose
+workers wait on a shared barrier. The barrier only lines up the process
+starts: every replica then loads the model and warms up on its own, so the
+timed repetitions of each test can drift apart. Records carry wall_start /
+wall_end like sweep.py's, and each phase reports how much of the replicas'
+measured time actually overlapped. Layouts:
+    NxKgpu  N replicas with K GPUs each (e.g. 1x4gpu, 2x2gpu, 4x1gpu)
+    Nxnuma  N CPU-only replicas, one per NUMA node (numactl-pinned)
+A solo run of one replica comes first, so the report can separate
+interference from the replica's own speed. Records land in
+benchmark_results_multi_<timestamp>.jsonl for analyze_results.py.
+"""
+
+import argparse
+import multiprocessing
+import os
+import re
+import shutil
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sweep import (BLUE, GREEN, LLAMA_BENCH, MODEL_PATH, NC, OUTPUT_DIR, RED, TIMEOUT, YELLOW,
+                   JsonlSink, build_command, detect_gpus, detect_numa_nodes, detect_topology, stream_llama_bench)
+from llama_bench_ingest import test_label
+
+BARRIER_TIMEOUT = 120
+MIN_OVERLAP = 0.9       # warn when replicas measured together for less than this share of a test
+_barrier = None
+
+def parse_layout(layout):
+    """'4x1gpu' -> (4, 1, 'gpu'); '4xnuma' -> (4, 1, 'numa')."""
+    match = re.fullmatch(r'(\d+)x(?:(\d+)gpu|numa)', layout)
+    if not match:
+        raise ValueError(f"Unknown layout: {layout} (expected NxKgpu or Nxnuma)")
+    if match.group(2):
+        return int(match.group(1)), int(match.group(2)), 'gpu'
+    return int(match.group(1)), 1, 'numa'
+
+def instance_jobs(layout, gpus, topology):
+    """(job, allocation) per replica, handing each its own GPUs or NUMA node."""
+    n, per_instance, kind = parse_layout(layout)
+    replicas = []
+    if kind == 'gpu':
+        if n * per_instance > len(gpus):
+            raise ValueError(f"{layout} needs {n * per_instance} GPUs, {len(gpus)} available")
+        for i in range(n):
+            params = {'ngl': 99}
+            if per_instance > 1:
+                params['ts'] = "/".join(['1'] * per_instance)
+            replicas.append(({'params': params, 'numa_bind': []},
+                             {'gpus': gpus[i * per_instance:(i + 1) * per_instance], 'numa_nodes': []}))
+    else:
+        nodes = sorted(topology)
+        if n > len(nodes):
+            raise ValueError(f"{layout} needs {n} NUMA nodes, {len(nodes)} available")
+        for node in nodes[:n]:
+            params = {'ngl': 0, 'threads': len(topology[node]), 'numa': 'numactl'}
+            replicas.append(({'params': params, 'numa_bind': [node]}, {'gpus': [], 'numa_nodes': [node]}))
+    return replicas
+
+def _init_worker(barrier):
+    global _barrier
+    _barrier = barrier
+
+def run_replica(cmd, env, timeout):
+    """Pool worker: wait for every replica, then run llama-bench; records get wall_start/wall_end."""
+    try:
+        _barrier.wait(BARRIER_TIMEOUT)
+    except Exception as e:
+        return None, [], "", f"barrier: {type(e).__name__}"
+    started = time.time()
+    records = []
+    returncode, tail, error = stream_llama_bench(cmd, env, [timeout], records.append)
+    if error is None and returncode != 0:
+        error = f"exit code {returncode}"
+    return started, records, tail, error
+
+def measured_overlap(records):
+    """{test: share of the shortest replica's timed repetitions during which every replica was timing}.
+
+    A test's timed span is taken as its samples_ns laid back from when it was printed.
+    """
+    spans = {}
+    for record in records:
+        end = record.get('wall_end')
+        if end is not None and record.get('samples_ns'):
+            spans.setdefault(test_label(record), []).append((end - sum(record['samples_ns']) / 1e9, end))
+    return {test: max(0.0, min(e for _, e in s) - max(b for b, _ in s)) / min(e - b for b, e in s)
+            for test, s in spans.items() if len(s) > 1 and min(e - b for b, e in s) > 0}
+
+def run_concurrently(replicas, args):
+    """Start every replica behind one barrier; returns [(started, records, stderr tail, error)]."""
+    commands = [build_command(job, allocation, args, args.repetitions) for job, allocation in replicas]
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(len(commands))
+    with ctx.Pool(len(commands), initializer=_init_worker, initargs=(barrier,)) as pool:
+        return pool.starmap(run_replica, [(cmd, env, args.timeout) for cmd, env in commands])
+
+def tag_records(records, section, layout, instance, concurrency, node):
+    for record in records:
+        record.update(test_section=section, node=node, layout=layout,
+                      instance=instance, concurrency=concurrency)
+    return records
+
+def run_layout(layout, index, gpus, topology, args, sink):
+    replicas = instance_jobs(layout, gpus, topology)
+    phases = [('solo', replicas[:1])] if len(replicas) > 1 and not args.no_solo else []
+    phases.append((f"x{len(replicas)}", replicas))
+
+    failures = 0
+    for phase, group in phases:
+        section = f"Test {index}: {layout} {phase}"
+        print(f"{GREEN}[{section}] starting {len(group)} replica(s){NC}")
+        outcomes = run_concurrently(group, args)
+        starts = [o[0] for o in outcomes if o[0] is not None]
+        n_records = 0
+        phase_records = []
+        for instance, (started, records, tail, error) in enumerate(outcomes):
+            records = tag_records(records, section, layout, instance, len(group), args.node)
+            sink.write(records)
+            phase_records += records
+            n_records += len(records)
+            if error or not records:
+                failures += 1
+                print(f"{RED}✗ replica {instance}: {error or 'no records'}: {tail}{NC}")
+        skew = (max(starts) - min(starts)) * 1000 if starts else 0
+        print(f"{GREEN}✓ {section}: {n_records} records, start skew {skew:.1f} ms{NC}")
+        overlap = measured_overlap(phase_records)
+        if overlap:
+            color = GREEN if min(overlap.values()) >= MIN_OVERLAP else YELLOW
+            print(f"{color}  timed phases overlapped: " +
+                  ", ".join(f"{test} {share:.0%}" for test, share in overlap.items()) + NC)
+        index += 1
+    return index, failures
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run concurrent llama-bench replicas per layout")
+    parser.add_argument('--layout', action='append', required=True,
+                        help="NxKgpu or Nxnuma, repeatable (e.g. --layout 1x4gpu --layout 4x1gpu)")
+    parser.add_argument('--model', type=Path, default=MODEL_PATH, help="default: %(default)s")
+    parser.add_argument('--llama-bench', type=Path, default=LLAMA_BENCH,
+                        help="llama-bench binary, or fake_llama_bench.py for dry runs (default: %(default)s)")
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR, help="default: %(default)s")
+    parser.add_argument('--gpus', help="comma-separated GPU ids (default: detected)")
+    parser.add_argument('--numa-sysfs', default='/sys/devices/system/node',
+                        help="NUMA topology root (default: %(default)s)")
+    parser.add_argument('--repetitions', type=int, default=5, help="llama-bench -r (default: %(default)s)")
+    parser.add_argument('--timeout', type=int, default=TIMEOUT, help="per-test timeout in seconds (default: %(default)s)")
+    parser.add_argument('--no-solo', action='store_true', help="skip the single-replica reference run")
+    parser.add_argument('--node', default=socket.gethostname(), help="node name recorded with results")
+    args = parser.parse_args(argv)
+    args.numactl = shutil.which('numactl')
+    args.model = Path(os.path.expanduser(str(args.model)))
+    if args.llama_bench.exists():
+        args.llama_bench = args.llama_bench.resolve()
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    gpus = args.gpus.split(',') if args.gpus else detect_gpus()
+    args.numa_cpus = detect_numa_nodes(args.numa_sysfs)
+    topology = detect_topology(args.numa_cpus, args.numa_sysfs)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = args.output_dir / f"benchmark_results_multi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    sink = JsonlSink(output_file)
+
+    print(f"{BLUE}=== llama-bench multi-instance: {', '.join(args.layout)} ==={NC}")
+    print(f"GPUs: {', '.join(gpus) or 'none'} | NUMA nodes: {len(topology)}")
+    print(f"Results stream to: {output_file}\n")
+
+    index, failures = 1, 0
+    for layout in args.layout:
+        try:
+            index, failed = run_layout(layout, index, gpus, topology, args, sink)
+            failures += failed
+        except ValueError as e:
+            print(f"{YELLOW}Skipping {layout}: {e}{NC}")
+
+    print(f"\n{BLUE}=== Multi-instance Complete! ({failures} failed) ==={NC}")
+    print(f"{GREEN}Results saved to: {output_file}{NC}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,745 @@
+#!/usr/bin/env python3
+"""
+Parameter-sweep runner for llama-bench
+
+Expands a JSON grid spec into one llama-bench job per grid point and runs
+jobs that do not share hardware at the same time: GPU jobs get their own
+CUDA_VISIBLE_DEVICES, CPU-only jobs are pinned to their own NUMA nodes.
+Every llama-bench record is appended (tagged with node and test section) to
+benchmark_results_sweep_<timestamp>.jsonl as soon as llama-bench prints it,
+and fsync'd, so the file doubles as the sweep's journal: `--resume <file>`
+skips every test point (setup x test x instance) already in it and re-runs
+only the missing tests, e.g. after a Slurm time limit. Each test gets its
+own timeout from the runtime of the same setup in earlier journals (capped
+by --timeout, which is also the limit when nothing is known yet).
+analyze_results.py ingests the file. Each job also samples hardware
+telemetry into benchmark_results_sweep_<timestamp>.telemetry/test_<n>.npz.
+
+Spec format (see sweeps/*.json):
+    {
+      "model": "~/models/Qwen3-8B/qwen3-8b-q5_k_m.gguf",
+      "repetitions": 5,
+      "sweeps": [
+        {"grid": {"ngl": [0], "threads": [16, 32, 64]}},
+        {"grid": {"ngl": [99], "ts": ["1", "1/1", "1/1/1/1"], "flash_attn": [0, 1]}},
+        {"cpu_topology": {"placements": ["compact", "per_node"]}, "grid": {"n_prompt": [512]}}
+      ]
+    }
+
+A "model" grid key runs the same grid over several GGUF files (a model matrix):
+    {"grid": {"model": ["~/models/Qwen3-8B/qwen3-8b-q5_k_m.gguf", "~/models/Qwen3-4B/...gguf"], "ngl": [99]}}
+
+Grid values may use llama-bench range syntax ("first-last", "first-last+step",
+"first-last*mult", e.g. "ubatch": ["128-2048*2"]); each value becomes its own job.
+
+A "cpu_topology" sweep reads the NUMA layout and generates CPU-only runs per
+placement: the scripts' default (-t <all cores>), compact / scatter thread counts with -C masks, --numa distribute,
+isolate and numactl, and one concurrent instance per NUMA node (per_node).
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+ANALYSIS_DIR = Path(__file__).resolve().parent.parent / "measurements/aaron"
+sys.path.insert(0, str(ANALYSIS_DIR))
+
+from bench_stats import relative_ci_width
+from llama_bench_ingest import test_label
+from telemetry import INTERVAL, make_sampler, parse_cpulist
+
+MODEL_PATH = Path.home() / "models/Qwen3-8B/qwen3-8b-q5_k_m.gguf"
+LLAMA_BENCH = Path.home() / "llama.cpp/build/bin/llama-bench"
+OUTPUT_DIR = Path.home() / "perf-analysis-modeling-project/measurements/aaron"
+TIMEOUT = 600           # per-test ceiling, and the limit for tests with no runtime history
+TIMEOUT_FACTOR = 3.0    # expected runtime x this = a test's timeout
+MIN_TIMEOUT = 60
+LOAD_SECONDS = 60       # added to the first test of each llama-bench call for model loading
+WATCHDOG_POLL = 0.5
+
+# Grid keys that pick llama-bench tests rather than the setup they run on
+TEST_KEYS = ('n_prompt', 'n_gen', 'pg')
+
+# grid key -> llama-bench flag
+GRID_FLAGS = {
+    'threads': '-t',
+    'ngl': '-ngl',
+    'ts': '-ts',
+    'split_mode': '-sm',
+    'batch': '-b',
+    'ubatch': '-ub',
+    'flash_attn': '-fa',
+    'cache_type_k': '-ctk',
+    'cache_type_v': '-ctv',
+    'no_kv_offload': '-nkvo',
+    'n_prompt': '-p',
+    'n_gen': '-n',
+    'pg': '-pg',
+    'depth': '-d',
+    'numa': '--numa',
+    'cpu_mask': '-C',
+    'cpu_strict': '--cpu-strict',
+    'poll': '--poll',
+}
+
+RANGE_PATTERN = re.compile(r'^(\d+)-(\d+)(?:([+*])(\d+))?$')
+
+# CPU-only placements generated by a {"cpu_topology": {...}} sweep
+PLACEMENTS = ['default', 'compact', 'scatter', 'distribute', 'isolate', 'numactl', 'per_node']
+
+GREEN = '\033[0;32m'
+BLUE = '\033[0;34m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+NC = '\033[0m'
+
+def split_weights(ts):
+    # llama-bench separates split weights with '/' (',' would start a new value)
+    return [float(v) for v in str(ts).replace(',', '/').split('/') if v]
+
+def expand_range(value):
+    # llama-bench range syntax: 'first-last', 'first-last+step' or 'first-last*mult'
+    match = RANGE_PATTERN.match(value) if isinstance(value, str) else None
+    if not match:
+        return [value]
+    first, last, op, amount = int(match.group(1)), int(match.group(2)), match.group(3) or '+', int(match.group(4) or 1)
+    if (op == '+' and amount < 1) or (op == '*' and (amount < 2 or first < 1)):
+        raise ValueError(f"Range never reaches its end: {value}")
+    values = []
+    while first <= last:
+        values.append(first)
+        first = first + amount if op == '+' else first * amount
+    return values
+
+def expand_grid(grid):
+    keys = list(grid)
+    axes = [[v for item in (grid[k] if isinstance(grid[k], list) else [grid[k]]) for v in expand_range(item)]
+            for k in keys]
+    for values in itertools.product(*axes):
+        yield {k: v for k, v in zip(keys, values) if v is not None}
+
+def job_label(params):
+    # Model paths are long; the file stem (qwen3-8b-q5_k_m) names the GGUF
+    return " ".join(f"{k}={Path(str(v)).stem if k == 'model' else v}" for k, v in params.items())
+
+def job_tests(params):
+    """The tests one llama-bench call runs for these grid params, in llama-bench's order."""
+    depth = int(params.get('depth', 0))
+    n_prompt, n_gen = int(params.get('n_prompt', 512)), int(params.get('n_gen', 128))
+    tests = []
+    if n_prompt:
+        tests.append({'n_prompt': n_prompt, 'n_gen': 0, 'n_depth': depth})
+    if n_gen:
+        tests.append({'n_prompt': 0, 'n_gen': n_gen, 'n_depth': depth})
+    if params.get('pg'):
+        pp, tg = (int(v) for v in str(params['pg']).split(','))
+        tests.append({'n_prompt': pp, 'n_gen': tg, 'n_depth': depth})
+    return tests
+
+def setup_key(job, model):
+    """Stable id of what a job runs on, minus which tests: journal records match it across runs of a spec."""
+    setup = {k: v for k, v in job['params'].items() if k not in TEST_KEYS}
+    setup['model'] = os.path.expanduser(str(setup.get('model', model)))
+    for field in ('placement', 'numa_bind', 'instances'):
+        setup[field] = job.get(field)
+    return hashlib.sha1(json.dumps(setup, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+def cpu_mask(cpus):
+    return hex(sum(1 << c for c in cpus))
+
+def default_thread_counts(cores_per_node, n_nodes):
+    counts = [1 << i for i in range(cores_per_node.bit_length()) if 1 << i < cores_per_node]
+    return counts + [cores_per_node * k for k in range(1, n_nodes + 1)]
+
+def topology_placements(topology, placements=PLACEMENTS, thread_counts=None):
+    """(placement, params, numa_bind, instances) for CPU-only runs over the NUMA layout.
+
+    topology maps NUMA node -> physical cores (SMT siblings dropped).
+    """
+    nodes = sorted(topology)
+    per_node = min(len(topology[n]) for n in nodes)
+    total = per_node * len(nodes)
+    compact = [c for n in nodes for c in topology[n][:per_node]]
+    scatter = [topology[n][i] for i in range(per_node) for n in nodes]
+    thread_counts = [t for t in thread_counts or default_thread_counts(per_node, len(nodes)) if t <= total]
+
+    for placement in placements:
+        if placement == 'default':
+            # What benchmark_qwen3.sh runs: every core, no --numa, no mask
+            yield placement, {'threads': total}, [], None
+        elif placement == 'compact':
+            # Fill node 0 first; memory bound to the nodes the threads land on
+            for t in thread_counts:
+                spanned = [n for n in nodes if set(topology[n]) & set(compact[:t])]
+                yield placement, {'threads': t, 'cpu_mask': cpu_mask(compact[:t]), 'cpu_strict': 1}, spanned, None
+        elif placement == 'scatter':
+            for t in thread_counts:
+                yield placement, {'threads': t, 'cpu_mask': cpu_mask(scatter[:t]), 'cpu_strict': 1,
+                                  'numa': 'distribute'}, [], None
+        elif placement == 'distribute':
+            yield placement, {'threads': total, 'numa': 'distribute'}, [], None
+        elif placement == 'isolate':
+            yield placement, {'threads': per_node, 'numa': 'isolate'}, nodes[:1], None
+        elif placement == 'numactl':
+            for k in range(1, len(nodes) + 1):
+                yield placement, {'threads': per_node * k, 'numa': 'numactl'}, nodes[:k], None
+        elif placement == 'per_node':
+            yield placement, {'threads': per_node, 'numa': 'numactl'}, [], [[n] for n in nodes]
+        else:
+            raise ValueError(f"Unknown placement: {placement}")
+
+def make_jobs(spec, cores_per_numa_node, topology=None):
+    jobs = []
+    for sweep in spec.get('sweeps') or [{'grid': spec['grid']}]:
+        if 'cpu_topology' in sweep:
+            # Placement jobs own the whole machine so their numbers are comparable
+            options = sweep['cpu_topology']
+            for placement, placement_params, numa_bind, instances in topology_placements(
+                    topology, options.get('placements', PLACEMENTS), options.get('threads')):
+                for params in expand_grid(sweep.get('grid', {})):
+                    job_params = {'ngl': 0, **placement_params}
+                    job_params.update((k, v) for k, v in params.items() if k not in job_params)
+                    job = {'params': job_params, 'gpus': 0,
+                           'numa_nodes': len(topology), 'placement': placement, 'numa_bind': numa_bind}
+                    if instances:
+                        job['instances'] = instances
+                    jobs.append(job)
+            continue
+        for params in expand_grid(sweep['grid']):
+            job = {'params': params, 'gpus': 0, 'numa_nodes': 0}
+            ngl = int(params.get('ngl', 99))
+            if ngl < 99:
+                # CPU-only and partially offloaded runs keep their CPU threads busy
+                threads = int(params.get('threads', cores_per_numa_node))
+                job['numa_nodes'] = sweep.get('numa_nodes') or math.ceil(threads / cores_per_numa_node)
+            if ngl > 0:
+                weights = split_weights(params['ts']) if 'ts' in params else [1]
+                job['gpus'] = sweep.get('gpus') or sum(1 for w in weights if w > 0)
+            jobs.append(job)
+    for job in jobs:
+        unknown = sorted(k for k in job['params'] if k not in GRID_FLAGS and k != 'model')
+        if unknown:
+            raise ValueError(f"Unknown grid parameter(s) {', '.join(unknown)} in {job_label(job['params'])}")
+    for index, job in enumerate(jobs, 1):
+        job['index'] = index
+        placement = f"placement={job['placement']} " if 'placement' in job else ""
+        job['section'] = f"Test {index}: {placement}{job_label(job['params'])}"
+    return jobs
+
+def detect_gpus():
+    visible = os.environ.get('CUDA_VISIBLE_DEVICES')
+    if visible is not None:
+        return [d for d in visible.split(',') if d.strip()]
+    try:
+        out = subprocess.run(['nvidia-smi', '--list-gpus'], capture_output=True, text=True, timeout=30)
+        return [str(i) for i, line in enumerate(out.stdout.splitlines()) if line.startswith('GPU')]
+    except (OSError, subprocess.SubprocessError):
+        return []
+
+def detect_numa_nodes(sysfs_root='/sys/devices/system/node'):
+    nodes = {}
+    for node_dir in sorted(Path(sysfs_root).glob('node[0-9]*')):
+        cpulist = (node_dir / 'cpulist').read_text().strip()
+        nodes[int(node_dir.name[4:])] = cpulist
+    return nodes or {0: f"0-{(os.cpu_count() or 1) - 1}"}
+
+def detect_topology(numa_nodes, sysfs_root='/sys/devices/system/node'):
+    """NUMA node -> physical cores, keeping the first thread of each SMT sibling set."""
+    cpu_dir = Path(sysfs_root).parent / 'cpu'
+    topology = {}
+    for node, cpulist in numa_nodes.items():
+        cores = []
+        for cpu in parse_cpulist(cpulist):
+            siblings = cpu_dir / f"cpu{cpu}/topology/thread_siblings_list"
+            if siblings.exists() and min(parse_cpulist(siblings.read_text().strip())) != cpu:
+                continue
+            cores.append(cpu)
+        topology[node] = cores
+    return topology
+
+def count_cpus(cpulist):
+    total = 0
+    for part in cpulist.split(','):
+        lo, _, hi = part.partition('-')
+        total += int(hi or lo) - int(lo) + 1
+    return total
+
+class ResourcePool:
+    """Hands out free GPUs and NUMA nodes; a job starts only when all of its share is free.
+
+    Full-offload GPU jobs hold no NUMA node but still run their host threads
+    unpinned, so they never run alongside a job that holds NUMA nodes: its CPU
+    numbers would carry their load.
+    """
+
+    def __init__(self, gpus, numa_nodes):
+        self.free_gpus = list(gpus)
+        self.free_numa = list(numa_nodes)
+        self.total_gpus = len(gpus)
+        self.total_numa = len(numa_nodes)
+        self.running = {'pinned': 0, 'unpinned': 0}
+
+    def fits_ever(self, job):
+        return job['gpus'] <= self.total_gpus and job['numa_nodes'] <= self.total_numa
+
+    def try_acquire(self, job):
+        if job['gpus'] > len(self.free_gpus) or job['numa_nodes'] > len(self.free_numa):
+            return None
+        kind = 'pinned' if job['numa_nodes'] else 'unpinned'
+        if self.running['unpinned' if kind == 'pinned' else 'pinned']:
+            return None
+        gpus, self.free_gpus = self.free_gpus[:job['gpus']], self.free_gpus[job['gpus']:]
+        numa, self.free_numa = self.free_numa[:job['numa_nodes']], self.free_numa[job['numa_nodes']:]
+        self.running[kind] += 1
+        return {'gpus': gpus, 'numa_nodes': numa, 'kind': kind}
+
+    def release(self, allocation):
+        self.free_gpus = sorted(self.free_gpus + allocation['gpus'], key=str)
+        self.free_numa = sorted(self.free_numa + allocation['numa_nodes'])
+        self.running[allocation['kind']] -= 1
+
+def build_command(job, allocation, args, repetitions, numa_bind=None):
+    params = dict(job['params'])
+    env = dict(os.environ)
+    cmd = []
+
+    env['CUDA_VISIBLE_DEVICES'] = ",".join(allocation['gpus'])
+    if allocation['gpus'] and 'ts' in params:
+        # Renumber the split onto the devices this job was given
+        weights = [w for w in split_weights(params['ts']) if w > 0]
+        params['ts'] = "/".join(f"{w:g}" for w in weights)
+    if numa_bind is None:
+        numa_bind = job.get('numa_bind', allocation['numa_nodes'])
+    if numa_bind and args.numactl:
+        nodes = ",".join(str(n) for n in numa_bind)
+        cmd += [args.numactl, f"--cpunodebind={nodes}", f"--membind={nodes}"]
+    elif numa_bind and 'cpu_mask' not in params:
+        # No numactl: pin the threads to the job's nodes with llama-bench's own mask (memory stays unbound)
+        params['cpu_mask'] = cpu_mask([c for n in numa_bind for c in parse_cpulist(args.numa_cpus[n])])
+        params['cpu_strict'] = 1
+
+    model = os.path.expanduser(str(params.pop('model', args.model)))
+    cmd += [str(args.llama_bench), '-m', model, '-r', str(repetitions), '-o', 'jsonl']
+    for key, value in params.items():
+        if key not in GRID_FLAGS:
+            raise ValueError(f"Unknown grid parameter: {key}")
+        cmd += [GRID_FLAGS[key], str(value)]
+    return cmd, env
+
+class Watchdog:
+    """Kills a process once the test it is on runs past its limit; arm() starts the next test's clock."""
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.limit = None
+        self.deadline = math.inf
+        self.fired = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def arm(self, seconds):
+        self.limit = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def _run(self):
+        while not self.done.wait(WATCHDOG_POLL):
+            if time.monotonic() > self.deadline:
+                self.fired = self.limit
+                self.proc.kill()
+                return
+
+    def stop(self):
+        self.done.set()
+        self.thread.join()
+
+def stream_llama_bench(cmd, env, timeouts, on_record):
+    """Run llama-bench -o jsonl, handing each record to on_record as soon as it is printed.
+
+    timeouts[k] bounds test k; returns (exit code, last stderr line, error). Each record gets
+    wall_start/wall_end (unix seconds): when the previous test (or the process) finished and
+    when this one was printed. llama-bench's own test_time has 1 s resolution and is stamped
+    before warmup and prefill, so telemetry is lined up with these instead.
+    """
+    with tempfile.TemporaryFile(mode='w+') as stderr:
+        try:
+            proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        except OSError as e:
+            return None, '', str(e)
+        watchdog = Watchdog(proc)
+        watchdog.arm(timeouts[0])
+        n = 0
+        last = time.time()
+        for line in proc.stdout:
+            if line.startswith('{'):
+                record = json.loads(line)
+                record['wall_start'], record['wall_end'] = last, time.time()
+                last = record['wall_end']
+                on_record(record)
+                n += 1
+                watchdog.arm(timeouts[min(n, len(timeouts) - 1)])
+        proc.wait()
+        watchdog.stop()
+        stderr.seek(0)
+        tail = (stderr.read().strip().splitlines() or ['no output'])[-1]
+    if watchdog.fired:
+        return proc.returncode, tail, f"test {n + 1} timed out after {watchdog.fired:.0f}s"
+    return proc.returncode, tail, None
+
+def run_llama_bench(job, allocation, args, repetitions, sink):
+    # Per-NUMA-node instance jobs start one llama-bench per node at the same time
+    binds = job.get('instances') or [None]
+    commands = [build_command(job, allocation, args, repetitions, bind) for bind in binds]
+    tests = job_tests(job['params'])
+    timeouts = [args.runtimes.timeout(job, test, repetitions, first=(k == 0)) for k, test in enumerate(tests)]
+
+    records = []
+    def run(instance, cmd, env):
+        instance_records = []
+        def on_record(record):
+            record['test_section'] = job['section']
+            record['node'] = args.node
+            record['setup_key'] = job['setup_key']
+            if 'placement' in job:
+                record['placement'] = job['placement']
+            if job.get('instances'):
+                record['instance'] = instance
+            if job.get('telemetry'):
+                record['telemetry'] = f"{args.telemetry_dir.name}/{job['telemetry']}"
+            sink.write([record])
+            args.runtimes.observe(record)
+            instance_records.append(record)
+            records.append(record)
+        return stream_llama_bench(cmd, env, timeouts or [args.timeout], on_record), instance_records
+
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        outcomes = list(executor.map(lambda c: run(c[0], *c[1]), enumerate(commands)))
+
+    for (returncode, tail, error), instance_records in outcomes:
+        if error:
+            return records, error
+        if returncode != 0 or not instance_records:
+            return records, f"exit code {returncode}: {tail}"
+    return records, None
+
+def telemetry_name(job, telemetry_dir=None):
+    """test_<n>.npz, or test_<n>.<k>.npz when a resumed sweep measures the job again."""
+    name, k = f"test_{job['index']}.npz", 1
+    while telemetry_dir and (telemetry_dir / name).exists():
+        k += 1
+        name = f"test_{job['index']}.{k}.npz"
+    return name
+
+def start_telemetry(allocation, args):
+    if not args.telemetry_dir:
+        return None
+    numa_nodes = allocation['numa_nodes'] or sorted(args.numa_cpus)
+    cpus = sorted(c for n in numa_nodes for c in parse_cpulist(args.numa_cpus[n]))
+    sampler = make_sampler(allocation['gpus'], cpus, numa_nodes, args.telemetry_interval,
+                           nvidia_smi=args.nvidia_smi, root=args.telemetry_root)
+    return sampler.start()
+
+def run_job(job, allocation, args, sink):
+    job['telemetry'] = telemetry_name(job, args.telemetry_dir) if args.telemetry_dir else None
+    sampler = start_telemetry(allocation, args)
+    try:
+        return run_job_batches(job, allocation, args, sink)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            sampler.save(args.telemetry_dir / job['telemetry'])
+
+def run_job_batches(job, allocation, args, sink):
+    if not args.target_ci:
+        records, error = run_llama_bench(job, allocation, args, args.repetitions, sink)
+        return job, error, len(records)
+
+    # Adaptive repetitions: keep adding batches until every test's CI is narrow enough
+    samples = {}
+    n_records = 0
+    repetitions = 0
+    while repetitions < args.max_repetitions:
+        batch = min(args.repetitions, args.max_repetitions - repetitions)
+        records, error = run_llama_bench(job, allocation, args, batch, sink)
+        n_records += len(records)
+        if error:
+            return job, error, n_records
+        repetitions += batch
+        for record in records:
+            samples.setdefault(test_label(record), []).extend(record.get('samples_ts', []))
+        widths = [relative_ci_width(values) for values in samples.values()]
+        if widths and max(widths) <= args.target_ci:
+            break
+    job['repetitions'] = repetitions
+    return job, None, n_records
+
+class JsonlSink:
+    """Append-only JSONL journal: records are written and fsync'd one by one as llama-bench prints them."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        repair_journal(path)
+        if not path.exists():
+            path.touch()
+            # Make the new directory entry durable too
+            fd = os.open(path.parent, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def write(self, records):
+        if not records:
+            return
+        with self.lock, open(self.path, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+def repair_journal(path):
+    """Drop a half-written last line left by a kill mid-write, so the file stays valid JSONL."""
+    if not path.exists():
+        return
+    data = path.read_bytes()
+    if data and not data.endswith(b'\n'):
+        with open(path, 'r+b') as f:
+            f.truncate(data.rfind(b'\n') + 1)
+
+def read_journal(path):
+    records = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith('{'):
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+def completed_points(records):
+    """{(setup key, test label): instances measured} from journal records."""
+    done = {}
+    for record in records:
+        if record.get('setup_key'):
+            done.setdefault((record['setup_key'], test_label(record)), set()).add(record.get('instance', 0))
+    return done
+
+def remaining_job(job, done):
+    """The job restricted to tests not yet in the journal (-p 0 / -n 0 drop a test); None if all are."""
+    n_instances = len(job.get('instances') or [None])
+    missing = [t for t in job_tests(job['params'])
+               if len(done.get((job['setup_key'], test_label(t)), ())) < n_instances]
+    if len(missing) == len(job_tests(job['params'])):
+        return job
+    if not missing:
+        return None
+    params = dict(job['params'], n_prompt=0, n_gen=0)
+    params.pop('pg', None)
+    for test in missing:
+        if test['n_prompt'] and test['n_gen']:
+            params['pg'] = f"{test['n_prompt']},{test['n_gen']}"
+        elif test['n_gen']:
+            params['n_gen'] = test['n_gen']
+        else:
+            params['n_prompt'] = test['n_prompt']
+    return dict(job, params=params)
+
+class RuntimeEstimator:
+    """Per-test timeouts from the nanoseconds per token earlier runs of the same setup took on this node."""
+
+    def __init__(self, node, ceiling=TIMEOUT, factor=TIMEOUT_FACTOR):
+        self.node = node
+        self.ceiling = ceiling
+        self.factor = factor
+        self.ns_per_token = {}
+        self.lock = threading.Lock()
+
+    def observe(self, record):
+        if record.get('node') != self.node or not record.get('setup_key') or not record.get('samples_ns'):
+            return
+        n_prompt, n_gen = record.get('n_prompt', 0), record.get('n_gen', 0)
+        if n_prompt and n_gen:
+            return
+        kind, tokens = ('tg', n_gen) if n_gen else ('pp', n_prompt)
+        ns = sorted(record['samples_ns'])[len(record['samples_ns']) // 2] / tokens
+        with self.lock:
+            key = (record['setup_key'], kind)
+            # Keep the slowest rate seen so a lucky run never shortens the timeout
+            self.ns_per_token[key] = max(ns, self.ns_per_token.get(key, 0))
+
+    def expected_seconds(self, job, test, repetitions):
+        """Warmup + repetitions of the test, each refilling the KV cache to its depth; None if a rate is unknown."""
+        with self.lock:
+            pp = self.ns_per_token.get((job['setup_key'], 'pp'))
+            tg = self.ns_per_token.get((job['setup_key'], 'tg'))
+        prompt = test['n_prompt'] + test['n_depth']
+        if (prompt and pp is None) or (test['n_gen'] and tg is None):
+            return None
+        per_run = prompt * (pp or 0) + test['n_gen'] * (tg or 0)
+        return per_run * (repetitions + 1) / 1e9
+
+    def timeout(self, job, test, repetitions, first=False):
+        expected = self.expected_seconds(job, test, repetitions)
+        if expected is None:
+            return self.ceiling
+        limit = self.factor * expected + (LOAD_SECONDS if first else 0)
+        return min(self.ceiling, max(MIN_TIMEOUT, limit))
+
+def run_sweep(jobs, pool, args, sink, done=None):
+    pending = []
+    for job in jobs:
+        remaining = remaining_job(job, done or {})
+        if remaining is None:
+            print(f"{BLUE}↷ Test {job['index']} already in the journal{NC}")
+        elif not pool.fits_ever(job):
+            print(f"{YELLOW}Skipping {job['section']}: needs {job['gpus']} GPU(s) / "
+                  f"{job['numa_nodes']} NUMA node(s){NC}")
+        else:
+            if remaining is not job:
+                print(f"{BLUE}↷ Test {job['index']}: resuming with "
+                      f"{', '.join(test_label(t) for t in job_tests(remaining['params']))}{NC}")
+            pending.append(remaining)
+
+    failures = 0
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, pool.total_gpus + pool.total_numa)) as executor:
+        while pending or running:
+            # First-fit: later jobs may start while an earlier, larger job waits
+            for job in list(pending):
+                allocation = pool.try_acquire(job)
+                if allocation is None:
+                    continue
+                pending.remove(job)
+                where = f"GPU {','.join(allocation['gpus'])}" if allocation['gpus'] else \
+                    f"NUMA {','.join(str(n) for n in allocation['numa_nodes'])}"
+                print(f"{GREEN}[{job['index']}/{len(jobs)}] {job_label(job['params'])} on {where}{NC}")
+                running[executor.submit(run_job, job, allocation, args, sink)] = allocation
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                pool.release(running.pop(future))
+                job, error, n_records = future.result()
+                if error:
+                    failures += 1
+                    print(f"{RED}✗ Test {job['index']} failed: {error}{NC}")
+                else:
+                    reps = f", {job['repetitions']} repetitions" if 'repetitions' in job else ""
+                    print(f"{GREEN}✓ Test {job['index']} completed ({n_records} records{reps}){NC}")
+    return failures
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a llama-bench parameter sweep")
+    parser.add_argument('spec', type=Path, help="JSON grid spec")
+    parser.add_argument('--model', type=Path, help=f"GGUF model (default: spec 'model' or {MODEL_PATH})")
+    parser.add_argument('--llama-bench', type=Path, default=LLAMA_BENCH,
+                        help="llama-bench binary, or fake_llama_bench.py for dry runs (default: %(default)s)")
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR, help="default: %(default)s")
+    parser.add_argument('--gpus', help="comma-separated GPU ids to schedule on (default: detected)")
+    parser.add_argument('--numa-sysfs', default='/sys/devices/system/node',
+                        help="NUMA topology root (default: %(default)s)")
+    parser.add_argument('--repetitions', type=int,
+                        help="llama-bench -r, or the batch size with --target-ci (default: spec or 5)")
+    parser.add_argument('--target-ci', type=float,
+                        help="stop repeating a job once every test's 95%% CI is narrower than this "
+                             "fraction of its mean (e.g. 0.02)")
+    parser.add_argument('--max-repetitions', type=int, default=30,
+                        help="repetition cap per job with --target-ci (default: %(default)s)")
+    parser.add_argument('--timeout', type=int, default=TIMEOUT,
+                        help="per-test timeout ceiling in seconds, used as-is until the setup has a runtime "
+                             "history (default: %(default)s)")
+    parser.add_argument('--timeout-factor', type=float, default=TIMEOUT_FACTOR,
+                        help="per-test timeout = this x the setup's expected runtime (default: %(default)s)")
+    parser.add_argument('--resume', type=Path,
+                        help="results .jsonl of an interrupted sweep: append to it and skip tests already in it")
+    parser.add_argument('--node', default=socket.gethostname(), help="node name recorded with results")
+    parser.add_argument('--telemetry-interval', type=float, default=INTERVAL,
+                        help="seconds between telemetry samples per job, 0 to disable (default: %(default)s)")
+    parser.add_argument('--nvidia-smi', default='nvidia-smi',
+                        help="nvidia-smi binary, or fake_nvidia_smi.py for dry runs (default: %(default)s)")
+    parser.add_argument('--telemetry-root', default='/',
+                        help="root holding proc/ and sys/ for CPU telemetry (default: %(default)s)")
+    args = parser.parse_args(argv)
+    args.numactl = shutil.which('numactl')
+    if args.llama_bench.exists():
+        args.llama_bench = args.llama_bench.resolve()
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    spec = json.loads(args.spec.read_text())
+    args.model = Path(os.path.expanduser(str(args.model or spec.get('model', MODEL_PATH))))
+    args.repetitions = args.repetitions or spec.get('repetitions', 5)
+
+    gpus = args.gpus.split(',') if args.gpus else detect_gpus()
+    numa_nodes = detect_numa_nodes(args.numa_sysfs)
+    cores_per_node = min(count_cpus(c) for c in numa_nodes.values())
+    try:
+        jobs = make_jobs(spec, cores_per_node, detect_topology(numa_nodes, args.numa_sysfs))
+    except ValueError as e:
+        print(f"{RED}{args.spec}: {e}{NC}")
+        return 1
+
+    for job in jobs:
+        job['setup_key'] = setup_key(job, args.model)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    if args.resume:
+        output_file = args.resume
+    else:
+        output_file = args.output_dir / f"benchmark_results_sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    sink = JsonlSink(output_file)
+    journal = read_journal(output_file)
+    other_nodes = {r.get('node') for r in journal} - {args.node}
+    if other_nodes:
+        print(f"{RED}{output_file.name} was recorded on {', '.join(sorted(map(str, other_nodes)))}; "
+              f"resume it there (or pass --node) so one file holds one node{NC}")
+        return 1
+    done = completed_points(journal)
+
+    # Expected runtimes come from every earlier sweep journal in the output directory
+    args.runtimes = RuntimeEstimator(args.node, args.timeout, args.timeout_factor)
+    histories = [p for p in sorted(args.output_dir.glob("benchmark_results_sweep_*.jsonl"))
+                 if p.resolve() != output_file.resolve()]
+    for record in journal + [r for path in histories for r in read_journal(path)]:
+        args.runtimes.observe(record)
+
+    args.telemetry_dir = output_file.with_suffix('.telemetry') if args.telemetry_interval > 0 else None
+    args.numa_cpus = numa_nodes
+
+    print(f"{BLUE}=== llama-bench sweep: {len(jobs)} job(s) ==={NC}")
+    print(f"GPUs: {', '.join(gpus) or 'none'} | NUMA nodes: {len(numa_nodes)} x {cores_per_node} cores")
+    print(f"Results stream to: {output_file}")
+    if not args.numactl and any(job['numa_nodes'] for job in jobs):
+        print(f"{YELLOW}numactl not found: CPU jobs are pinned with -C masks, their memory is not NUMA-bound{NC}")
+    if done:
+        print(f"Resuming: {sum(len(v) for v in done.values())} test point(s) already measured")
+    if args.telemetry_dir:
+        print(f"Telemetry every {args.telemetry_interval}s to: {args.telemetry_dir}/")
+    print()
+
+    failures = run_sweep(jobs, ResourcePool(gpus, sorted(numa_nodes)), args, sink, done)
+
+    print(f"\n{BLUE}=== Sweep Complete! ({failures} failed) ==={NC}")
+    print(f"{GREEN}Results saved to: {output_file}{NC}")
+    if failures:
+        print(f"{YELLOW}Re-run the failed tests with: --resume {output_file}{NC}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,37 @@
 #!/usr/bin/env python3
 
+import argparse
+import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+from bench_stats import CONFIDENCE, configs_mean_ci, configs_ratio_ci, format_ci
+from cpu_placement import print_cpu_placement
+from fleet_efficiency import fleet_rows, print_fleet_efficiency
+from instance_scaling import print_instance_scaling
+from kv_tradeoff import kv_rows, print_kv_tradeoff, tradeoff_groups
+from model_matrix import model_groups, model_rows, print_model_matrix
+from perf_model import roofline_fraction
+from profiling_ingest import PROFILING_DIR, cpu_breakdown, gpu_breakdown, load_profiles, print_breakdown
+from llama_bench_ingest import LLAMA_BENCH_SUFFIXES, build_configuration, load_llama_bench, sidecar_path
+from report_parser import classify_section, parse_benchmark_file
+from results_cache import CACHE_FILENAME, ResultsCache
+from results_index import ResultsIndex
+from scaling_model import TESTS as SCALING_TESTS, print_scaling_analysis, scaling_analysis
+from serving_latency import load_serving_runs, print_serving_latency
+from shape_scaling import print_shape_scaling, shape_grids, shape_rows
+from telemetry import print_telemetry_dips
+from results_store import STORE_FILENAME, load_store, write_store
+
 BENCHMARK_DIR = Path.home() / "perf-analysis-modeling-project/measurements/aaron"
 OUTPUT_FILE = BENCHMARK_DIR / f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
 
+# Without --ci, multi/single prompt ratios closer to 1 than this are reported as no difference
+SCALING_MARGIN = 0.05
+
 class Tee:
     def __init__(self, filename):
         self.terminal = sys.stdout
@@ -23,134 +48,224 @@ class Tee:
     def close(self):
         self.log.close()
 
-def parse_benchmark_file(filepath):
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    results = {
-        'filepath': str(filepath),
-        'filename': filepath.name,
-        'node': None,
-        'gpu_type': None,
-        'gpu_count': None,
-        'configurations': []
-    }
-    
-    current_config = None
-    in_results_table = False
-    
-    for i, line in enumerate(lines):
-        # Extract metadata
-        if '**Node:**' in line:
-            results['node'] = line.split('**Node:**')[1].strip()
-        elif '**GPUs per Node:**' in line:
-            results['gpu_count'] = int(line.split('**GPUs per Node:**')[1].strip())
-        elif 'Device 0:' in line and 'NVIDIA' in line:
-            parts = line.split('NVIDIA')[1].split(',')[0].strip()
-            results['gpu_type'] = f"NVIDIA {parts}"
-        
-        # Detect test sections - FIX: Only match "## Test N:" pattern
-        if line.startswith('## Test ') and ':' in line:
+def describe_run(record):
+    # Name for records that were not written under a "## Test N:" section
+    if record.get('n_gpu_layers', 0) == 0 or not record.get('gpu_info'):
+        return "CPU-Only"
+    name = f"ngl {record['n_gpu_layers']}"
+    split = record.get('tensor_split') or []
+    if any(split):
+        name += " ts " + ",".join(f"{v:g}" for v in split)
+    return name
+
+def parse_llama_bench_output(filepath, results=None):
+    """Build configurations from llama-bench json/jsonl/csv output.
+    
+    When results (from the markdown report) is given, its configurations are
+    replaced and its node/GPU metadata and per-test commands are kept.
+    """
+    filepath = Path(filepath)
+    records = load_llama_bench(filepath)
+    commands = {}
+    
+    if results is not None:
+        commands = {c['test_num']: c for c in results['configurations'] if c.get('command')}
+    else:
+        first = records[0] if records else {}
+        # Sweeps often start with an ngl=0 job that saw no GPU, so look past the first record
+        gpu_lists = [[g.strip() for g in r['gpu_info'].split(',') if g.strip()]
+                     for r in records if (r.get('gpu_info') or '').strip()]
+        results = {
+            'filepath': str(filepath),
+            'filename': filepath.name,
+            'node': first.get('node'),
+            'gpu_type': gpu_lists[0][0] if gpu_lists else None,
+            'gpu_count': max(len(gpus) for gpus in gpu_lists) if gpu_lists else None,
+            'model': first.get('model_type'),
+            'cpu_model': first.get('cpu_info'),
+            'configurations': []
+        }
+    
+    sections = {}
+    for record in records:
+        sections.setdefault(record.get('test_section') or describe_run(record), []).append(record)
+    
+    configurations = []
+    for index, (section, section_records) in enumerate(sections.items(), 1):
+        test_num = index
+        title = section
+        if section.startswith('Test ') and ':' in section:
             try:
-                test_num_str = line.split('Test')[1].split(':')[0].strip()
-                test_num = int(test_num_str)
-            except (ValueError, IndexError):
-                continue  # Skip if not a valid test number
-            
-            # Save previous config
-            if current_config and (current_config['pp512'] or current_config['tg128']):
-                avg_pp = sum(current_config['pp512']) / len(current_config['pp512']) if current_config['pp512'] else 0
-                avg_tg = sum(current_config['tg128']) / len(current_config['tg128']) if current_config['tg128'] else 0
-                results['configurations'].append({
-                    'name': current_config['name'],
-                    'is_cpu_only': current_config['is_cpu'],
-                    'pp512': avg_pp,
-                    'tg128': avg_tg,
-                    'test_num': current_config['test_num']
-                })
-            
-            # Start new config
-            config_name = line.split(':', 1)[1].strip()
-            
-            # Determine config type - Check Quad BEFORE Dual
-            is_cpu = False
-            clean_name = "Unknown"
-            
-            if 'CPU-Only' in config_name:
-                clean_name = "CPU-Only"
-                is_cpu = True
-            elif 'Partial' in config_name:
-                clean_name = "GPU Partial"
-            elif 'Full' in config_name:
-                clean_name = "GPU Full"
-            elif 'Single GPU' in config_name:
-                clean_name = "Single GPU"
-            elif 'Quad GPU' in config_name:  # Check Quad FIRST
-                if 'Balanced' in config_name:
-                    clean_name = "Quad GPU (Balanced)"
-                elif 'Custom' in config_name:
-                    clean_name = "Quad GPU (Custom)"
-                else:
-                    clean_name = "Quad GPU"
-            elif 'Dual GPU' in config_name:  # Check Dual SECOND
-                clean_name = "Dual GPU"
-            
-            current_config = {
-                'name': clean_name,
-                'is_cpu': is_cpu,
-                'pp512': [],
-                'tg128': [],
-                'test_num': test_num
-            }
-            in_results_table = False
-        
-        # Check for CUDA init failed
-        elif current_config and 'failed to initialize CUDA' in line:
-            current_config['is_cpu'] = True
-            current_config['name'] = "CPU-Only"
+                test_num = int(section.split('Test')[1].split(':')[0].strip())
+                title = section.split(':', 1)[1].strip()
+            except ValueError:
+                pass
         
-        # Detect results table
-        elif '| model' in line and 'test' in line and 't/s' in line:
-            in_results_table = True
-        elif in_results_table and '| qwen3 8B' in line:
-            parts = [p.strip() for p in line.split('|')]
-            if len(parts) >= 7:
-                try:
-                    for j, part in enumerate(parts):
-                        if 'pp512' in part:
-                            tokens_per_sec = float(parts[j+1].split('±')[0].strip())
-                            current_config['pp512'].append(tokens_per_sec)
-                        elif 'tg128' in part:
-                            tokens_per_sec = float(parts[j+1].split('±')[0].strip())
-                            current_config['tg128'].append(tokens_per_sec)
-                except (ValueError, IndexError):
-                    pass
-    
-    # Save last config
-    if current_config and (current_config['pp512'] or current_config['tg128']):
-        avg_pp = sum(current_config['pp512']) / len(current_config['pp512']) if current_config['pp512'] else 0
-        avg_tg = sum(current_config['tg128']) / len(current_config['tg128']) if current_config['tg128'] else 0
-        results['configurations'].append({
-            'name': current_config['name'],
-            'is_cpu_only': current_config['is_cpu'],
-            'pp512': avg_pp,
-            'tg128': avg_tg,
-            'test_num': current_config['test_num']
-        })
+        name, is_cpu = classify_section(title)
+        if not section_records[0].get('gpu_info'):
+            # Same rule as "failed to initialize CUDA" in the markdown parser
+            name = "CPU-Only" if name != "Unknown" else title
+            is_cpu = True
+        elif name == "Unknown":
+            name = title
+        config = build_configuration(name, test_num, section_records, is_cpu)
+        if test_num in commands:
+            config['command'], config['params'] = commands[test_num]['command'], commands[test_num]['params']
+        configurations.append(config)
     
+    results['configurations'] = configurations
+    return results
+
+def run_timestamp(filepath):
+    # benchmark scripts stamp file names with $(date +%Y%m%d_%H%M%S)
+    match = re.search(r'(\d{8}_\d{6})', filepath.name)
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').isoformat()
+    return datetime.fromtimestamp(filepath.stat().st_mtime).isoformat(timespec='seconds')
+
+def load_report(filepath):
+    filepath = Path(filepath)
+    if filepath.suffix != '.md':
+        results = parse_llama_bench_output(filepath)
+    else:
+        results = parse_benchmark_file(filepath)
+        if sidecar_path(filepath).exists():
+            # Prefer the machine-readable output: it keeps stddev and raw samples
+            parse_llama_bench_output(sidecar_path(filepath), results)
+    results['timestamp'] = run_timestamp(filepath)
     return results
 
-def main():
-    tee = Tee(OUTPUT_FILE)
+def find_reports(benchmark_dir):
+    reports = sorted(benchmark_dir.glob("benchmark_results*.md"))
+    md_stems = {f.stem for f in reports}
+    for suffix in LLAMA_BENCH_SUFFIXES:
+        reports += [f for f in benchmark_dir.glob(f"benchmark_results*{suffix}") if f.stem not in md_stems]
+    return sorted(reports)
+
+def _parse_worker(filepath):
+    # Runs in a pool process; errors travel back so main can report them per file
+    try:
+        return filepath, load_report(filepath), None
+    except Exception as e:
+        return filepath, None, e
+
+def parse_benchmark_files(benchmark_files, workers=None):
+    """Yield (filepath, results, error) in input order, parsing files in a process pool."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(benchmark_files) <= 1:
+        for filepath in benchmark_files:
+            yield _parse_worker(filepath)
+        return
+    
+    chunksize = max(1, len(benchmark_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_parse_worker, benchmark_files, chunksize=chunksize)
+
+def load_results(benchmark_files, workers=None, cache=None):
+    """Yield (filepath, results, error, cached) in input order, parsing only what the cache lacks."""
+    if cache is None:
+        for filepath, results, error in parse_benchmark_files(benchmark_files, workers):
+            yield filepath, results, error, False
+        return
+    
+    cached, stale, _ = cache.plan(benchmark_files)
+    parsed = {}
+    for filepath, results, error in parse_benchmark_files(stale, workers):
+        if error is None:
+            cache.store(filepath, results)
+        parsed[filepath] = (results, error)
+    cached_results = cache.load(cached)
+    
+    for filepath in benchmark_files:
+        if filepath in parsed:
+            results, error = parsed[filepath]
+            yield filepath, results, error, False
+        else:
+            yield filepath, cached_results[str(filepath)], None, True
+
+def format_range(low, high):
+    if abs(high - low) < 0.0005:
+        return f"{low * 100:.1f}%"
+    return f"{low * 100:.1f}-{high * 100:.1f}%"
+
+def config_width(entries):
+    # Sweep config names ("ngl=99 threads=64 ts=5/5/3/3") outgrow the classic 19 columns
+    return max([19] + [len(e['name']) for e in entries])
+
+def print_confidence_intervals(index, cpu_baseline):
+    width = config_width(index)
+    print("\n" + "="*70)
+    print(f"CONFIDENCE INTERVALS ({CONFIDENCE:.0%}: bootstrap on raw samples, t over -r repetitions otherwise)")
+    print("="*70)
+    print()
+    print(f"| Node      | {'Config':{width}s} | Prompt (pp512) t/s          | Generation (tg128) t/s   |")
+    print(f"|-----------|{'-' * (width + 2)}|-----------------------------|--------------------------|")
+    
+    for entry in index:
+        pp = format_ci(*configs_mean_ci([entry['config']], 'pp512'))
+        tg = format_ci(*configs_mean_ci([entry['config']], 'tg128'))
+        print(f"| {entry['node']:9s} | {entry['name']:{width}s} | {pp:27s} | {tg:24s} |")
+    
+    if not cpu_baseline:
+        return
+    
+    print()
+    print(f"| Node      | {'Config':{width}s} | Prompt Speedup              | Generation Speedup       |")
+    print(f"|-----------|{'-' * (width + 2)}|-----------------------------|--------------------------|")
+    for entry in index.where(is_cpu=False):
+        pp = format_ci(*configs_ratio_ci([entry['config']], [cpu_baseline], 'pp512'), 'x')
+        tg = format_ci(*configs_ratio_ci([entry['config']], [cpu_baseline], 'tg128'), 'x')
+        print(f"| {entry['node']:9s} | {entry['name']:{width}s} | {pp:27s} | {tg:24s} |")
+
+def print_profile_breakdown(profile_dir, index, cpu_baseline):
+    print("\n" + "="*70)
+    print("PROFILE BREAKDOWN")
+    print("="*70)
+    print(f"\nProfiles: {profile_dir}")
+    tables = load_profiles(profile_dir)
+    
+    # Spread the measured pp512 time per token over the profiled op mix
+    single_gpu = [e['config']['pp512'] for e in index
+                  if ('Single GPU' in e['name'] or 'GPU Full' in e['name']) and e['config']['pp512']]
+    gpu_ms = 1000 / (sum(single_gpu) / len(single_gpu)) if single_gpu else None
+    cpu_ms = 1000 / cpu_baseline['pp512'] if cpu_baseline and cpu_baseline['pp512'] else None
+    
+    if tables.get('cuda_gpu_kern_sum'):
+        print_breakdown("GPU kernel time by op (vs single-GPU pp512)", gpu_breakdown(tables), 'ns', gpu_ms, "  ")
+    if tables.get('pprof'):
+        print_breakdown("CPU samples by op (vs CPU-only pp512)", cpu_breakdown(tables), 'samples', cpu_ms, "  ")
+    if not tables.get('cuda_gpu_kern_sum') and not tables.get('pprof'):
+        print("\n⚠️  No kernel or pprof tables found")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze llama-bench benchmark reports")
+    parser.add_argument('--dir', type=Path, default=BENCHMARK_DIR,
+                        help="directory holding benchmark_results*.md/.jsonl/.json/.csv (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="parser processes (default: %(default)s, 1 = serial)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"re-parse every report instead of using {CACHE_FILENAME}")
+    parser.add_argument('--ci', action='store_true',
+                        help="report bootstrap confidence intervals for throughput and speedups")
+    parser.add_argument('--profile', type=Path, nargs='?', const=PROFILING_DIR,
+                        help="break down nsys/pprof profiles by op (default dir: %(const)s)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    benchmark_dir = args.dir
+    output_file = benchmark_dir / OUTPUT_FILE.name
+    
+    tee = Tee(output_file)
     sys.stdout = tee
     
     print("="*70)
     print("LLAMA.CPP BENCHMARK ANALYSIS")
     print("="*70)
     print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"\nScanning directory: {BENCHMARK_DIR}")
+    print(f"\nScanning directory: {benchmark_dir}")
     
-    benchmark_files = sorted(BENCHMARK_DIR.glob("benchmark_results*.md"))
+    benchmark_files = find_reports(benchmark_dir)
     
     if not benchmark_files:
         print(f"\n❌ No benchmark files found")
@@ -160,16 +275,19 @@ def main():
     
     print(f"Found {len(benchmark_files)} benchmark file(s)")
     
+    cache = None if args.no_cache else ResultsCache(benchmark_dir / CACHE_FILENAME)
+    
     results_list = []
-    for filepath in benchmark_files:
+    for filepath, results, error, cached in load_results(benchmark_files, args.workers, cache):
         print(f"  - {filepath.name}")
-        try:
-            results = parse_benchmark_file(filepath)
-            if results['configurations']:
-                results_list.append(results)
-                print(f"    → Parsed {len(results['configurations'])} configurations")
-        except Exception as e:
-            print(f"    ⚠ Error: {e}")
+        if error is not None:
+            print(f"    ⚠ Error: {error}")
+        elif results['configurations']:
+            results_list.append(results)
+            print(f"    → Parsed {len(results['configurations'])} configurations{' (cached)' if cached else ''}")
+    
+    if cache is not None:
+        cache.close()
     
     if not results_list:
         print("\n❌ No valid results found")
@@ -177,27 +295,24 @@ def main():
         sys.stdout = tee.terminal
         return
     
+    store_file = write_store(results_list, benchmark_dir / STORE_FILENAME)
+    index = ResultsIndex(results_list)
+    
     print("\n" + "="*70)
     print("DETAILED RESULTS BY CONFIGURATION")
     print("="*70)
     
     # Find CPU baseline
-    cpu_baseline = None
-    cpu_node = None
-    
-    for result in results_list:
-        for config in result['configurations']:
-            if config['is_cpu_only']:
-                cpu_baseline = config
-                cpu_node = result['node']
-                print(f"\n🖥️  CPU-Only Baseline ({result['node']}):")
-                print(f"   Prompt Processing: {config['pp512']:.2f} t/s")
-                print(f"   Text Generation:   {config['tg128']:.2f} t/s")
-                break
-        if cpu_baseline:
-            break
+    baseline = min((e for e in index.where(is_cpu=True) if e['config']['pp512'] and e['config']['tg128']),
+                   key=lambda e: (e['report'], e['position']), default=None)
+    cpu_baseline = baseline['config'] if baseline else None
+    cpu_node = baseline['result']['node'] if baseline else None
     
-    if not cpu_baseline:
+    if cpu_baseline:
+        print(f"\n🖥️  CPU-Only Baseline ({cpu_node}):")
+        print(f"   Prompt Processing: {cpu_baseline['pp512']:.2f} t/s")
+        print(f"   Text Generation:   {cpu_baseline['tg128']:.2f} t/s")
+    else:
         print("\n⚠️  No CPU baseline found!")
     
     # Print GPU configurations
@@ -205,34 +320,36 @@ def main():
     print("GPU CONFIGURATIONS")
     print("-"*70)
     
-    for result in results_list:
-        has_gpu = any(not c['is_cpu_only'] for c in result['configurations'])
-        if has_gpu:
+    for entries in index.group_by('file').values():
+        result = entries[0]['result']
+        gpu_entries = [e for e in entries if not e['is_cpu']]
+        if gpu_entries:
             print(f"\n📍 Node: {result['node']}")
             print(f"   GPU: {result['gpu_type'] or 'Unknown'}")
             print(f"   GPU Count: {result['gpu_count'] or 'N/A'}")
+            models = sorted({e['model'] for e in entries})
+            print(f"   Model{'s' if len(models) > 1 else ''}: {', '.join(models)}")
             print()
             
-            for config in sorted(result['configurations'], key=lambda x: x.get('test_num', 0)):
-                if not config['is_cpu_only']:
-                    print(f"   {config['name']:25s} | pp512: {config['pp512']:8.2f} t/s | tg128: {config['tg128']:6.2f} t/s")
+            for e in gpu_entries:
+                print(f"   {e['name']:25s} | pp512: {e['config']['pp512']:8.2f} t/s | tg128: {e['config']['tg128']:6.2f} t/s")
     
     print("\n" + "="*70)
     print("COMPREHENSIVE COMPARISON TABLE")
     print("="*70)
     print()
-    print("| Node      | GPU Type     | Config              | Prompt (pp512) | Generation (tg128) |")
-    print("|-----------|--------------|---------------------|----------------|-------------------|")
-    
-    for result in results_list:
-        for config in sorted(result['configurations'], key=lambda x: x.get('test_num', 0)):
-            node = result['node'] or 'Unknown'
-            gpu_type = result['gpu_type'] or 'CPU'
-            config_name = config['name']
-            pp512 = config['pp512']
-            tg128 = config['tg128']
-            
-            print(f"| {node:9s} | {gpu_type:12s} | {config_name:19s} | {pp512:14.2f} | {tg128:17.2f} |")
+    width = config_width(index)
+    print(f"| Node      | GPU Type     | {'Config':{width}s} | Prompt (pp512) | Generation (tg128) | pp % Roofline | tg % Roofline |")
+    print(f"|-----------|--------------|{'-' * (width + 2)}|----------------|-------------------|---------------|---------------|")
+    
+    for entry in index:
+        config = entry['config']
+        pp_roof, tg_roof = roofline_fraction(entry['result'], config)
+        pp_roof = f"{pp_roof*100:12.1f}%" if pp_roof is not None else f"{'n/a':>13s}"
+        tg_roof = f"{tg_roof*100:12.1f}%" if tg_roof is not None else f"{'n/a':>13s}"
+        
+        print(f"| {entry['node']:9s} | {entry['gpu_type'] or 'CPU':12s} | {entry['name']:{width}s} | {config['pp512']:14.2f} | "
+              f"{config['tg128']:17.2f} | {pp_roof} | {tg_roof} |")
     
     if cpu_baseline:
         print("\n" + "="*70)
@@ -243,30 +360,85 @@ def main():
         print(f"  Text Generation:   {cpu_baseline['tg128']:.2f} t/s")
         print("\nGPU Speedups:")
         print()
-        print("| Node      | GPU Type     | Config              | Prompt Speedup | Generation Speedup |")
-        print("|-----------|--------------|---------------------|----------------|-------------------|")
+        print(f"| Node      | GPU Type     | {'Config':{width}s} | Prompt Speedup | Generation Speedup |")
+        print(f"|-----------|--------------|{'-' * (width + 2)}|----------------|-------------------|")
         
-        for result in results_list:
-            for config in sorted(result['configurations'], key=lambda x: x.get('test_num', 0)):
-                if not config['is_cpu_only']:
-                    pp_speedup = config['pp512'] / cpu_baseline['pp512']
-                    tg_speedup = config['tg128'] / cpu_baseline['tg128']
-                    
-                    node = result['node'] or 'Unknown'
-                    gpu_type = result['gpu_type'] or 'Unknown'
-                    config_name = config['name']
-                    
-                    print(f"| {node:9s} | {gpu_type:12s} | {config_name:19s} | {pp_speedup:14.2f}x | {tg_speedup:17.2f}x |")
+        for entry in index.where(is_cpu=False):
+            pp_speedup = entry['config']['pp512'] / cpu_baseline['pp512']
+            tg_speedup = entry['config']['tg128'] / cpu_baseline['tg128']
+            
+            print(f"| {entry['node']:9s} | {entry['gpu_type'] or 'Unknown':12s} | {entry['name']:{width}s} | "
+                  f"{pp_speedup:14.2f}x | {tg_speedup:17.2f}x |")
+    
+    if args.ci:
+        print_confidence_intervals(index, cpu_baseline)
+    
+    if args.profile:
+        print_profile_breakdown(args.profile, index, cpu_baseline)
+    
+    if index.has_run_field('placement'):
+        print("\n" + "="*70)
+        print("CPU PLACEMENT")
+        print("="*70)
+        print_cpu_placement(results_list)
+    
+    if index.has_run_field('layout'):
+        print("\n" + "="*70)
+        print("MULTI-INSTANCE THROUGHPUT")
+        print("="*70)
+        print_instance_scaling(results_list)
+    
+    if shape_grids(shape_rows(results_list)):
+        print("\n" + "="*70)
+        print("CONTEXT DEPTH / UBATCH SCALING")
+        print("="*70)
+        print_shape_scaling(results_list)
+    
+    if tradeoff_groups(kv_rows(results_list)):
+        print("\n" + "="*70)
+        print("KV CACHE / FLASH-ATTENTION TRADE-OFF")
+        print("="*70)
+        print_kv_tradeoff(results_list)
+    
+    if model_groups(model_rows(results_list)):
+        print("\n" + "="*70)
+        print("MODEL MATRIX (SIZE-NORMALIZED THROUGHPUT)")
+        print("="*70)
+        print_model_matrix(results_list)
+    
+    # Fits every full-offload GPU run by its device split, whatever the config is called
+    if any(scaling_analysis(results_list, test) for test in SCALING_TESTS):
+        print("\n" + "="*70)
+        print("MULTI-GPU SCALING MODEL")
+        print("="*70)
+        print_scaling_analysis(results_list)
+    
+    if index.has_run_field('telemetry'):
+        print("\n" + "="*70)
+        print("THROUGHPUT DIPS VS TELEMETRY")
+        print("="*70)
+        print()
+        print_telemetry_dips(results_list)
+    
+    serving_runs = load_serving_runs(benchmark_dir)
+    if serving_runs:
+        print("\n" + "="*70)
+        print("SERVING LATENCY")
+        print("="*70)
+        print_serving_latency(serving_runs)
+    
+    store = load_store(store_file)
+    if fleet_rows(store):
+        print("\n" + "="*70)
+        print("FLEET EFFICIENCY (PER GPU / WATT / GB VRAM / NODE-HOUR)")
+        print("="*70)
+        print_fleet_efficiency(store)
     
     print("\n" + "="*70)
     print("KEY FINDINGS")
     print("="*70)
     
-    gpu_configs = []
-    for result in results_list:
-        for config in result['configurations']:
-            if not config['is_cpu_only']:
-                gpu_configs.append((result, config))
+    gpu_configs = [(e['result'], e['config']) for e in index.where(is_cpu=False)]
     
     if gpu_configs:
         best_pp = max(gpu_configs, key=lambda x: x[1]['pp512'])
@@ -289,29 +461,46 @@ def main():
         single_gpu = [x for x in gpu_configs if 'Single GPU' in x[1]['name'] or 'GPU Full' in x[1]['name']]
         multi_gpu = [x for x in gpu_configs if 'Dual GPU' in x[1]['name'] or 'Quad GPU' in x[1]['name']]
         
-        if single_gpu and multi_gpu:
+        # Only compare runs on the same node and GPU type; pooling L40S with A30 measures hardware, not scaling
+        scaling_groups = []
+        for key in sorted({(x[0]['node'], x[0]['gpu_type']) for x in gpu_configs}):
+            single = [x[1] for x in single_gpu if (x[0]['node'], x[0]['gpu_type']) == key]
+            multi = [x[1] for x in multi_gpu if (x[0]['node'], x[0]['gpu_type']) == key]
+            if single and multi:
+                scaling_groups.append((key, single, multi))
+        
+        if scaling_groups:
             print(f"\n3. Multi-GPU Scaling Analysis:")
-            single_avg = sum(x[1]['pp512'] for x in single_gpu) / len(single_gpu)
-            multi_avg = sum(x[1]['pp512'] for x in multi_gpu) / len(multi_gpu)
-            
-            print(f"   Single GPU avg: {single_avg:.2f} t/s (prompt)")
-            print(f"   Multi GPU avg:  {multi_avg:.2f} t/s (prompt)")
-            
-            if multi_avg < single_avg:
-                loss = ((single_avg - multi_avg) / single_avg * 100)
-                print(f"   ⚠️  Multi-GPU shows NEGATIVE scaling: {loss:.1f}% performance loss")
-                print(f"   💡 Recommendation: Use single GPU for this model size")
-            else:
-                gain = ((multi_avg - single_avg) / single_avg * 100)
-                print(f"   ✅ Multi-GPU shows positive scaling: {gain:.1f}% performance gain")
+            for (node, gpu_type), single, multi in scaling_groups:
+                single_avg = sum(c['pp512'] for c in single) / len(single)
+                multi_avg = sum(c['pp512'] for c in multi) / len(multi)
+                ratio, lo, hi = configs_ratio_ci(multi, single, 'pp512')
+                
+                print(f"   {node} ({gpu_type}):")
+                print(f"   Single GPU avg: {single_avg:.2f} t/s (prompt)")
+                print(f"   Multi GPU avg:  {multi_avg:.2f} t/s (prompt)")
+                print(f"   Multi/Single ratio: {format_ci(ratio, lo, hi, 'x')} ({CONFIDENCE:.0%} CI)")
+                if not args.ci and ratio is not None:
+                    # Without --ci, also require a clear margin before calling a direction
+                    if abs(ratio - 1) < SCALING_MARGIN:
+                        lo = hi = 1.0
+                    elif lo is None:
+                        lo = hi = ratio
+                if lo is None:
+                    print(f"   ❔ Not enough repetitions to call the scaling direction")
+                elif hi < 1:
+                    print(f"   ⚠️  Multi-GPU shows NEGATIVE scaling: {format_range(1 - hi, 1 - lo)} performance loss")
+                    print(f"   💡 Recommendation: Use single GPU for this model size")
+                elif lo > 1:
+                    print(f"   ✅ Multi-GPU shows positive scaling: {format_range(lo - 1, hi - 1)} performance gain")
+                elif args.ci:
+                    print(f"   ➖ No significant difference between single and multi-GPU")
+                else:
+                    print(f"   ➖ No clear difference between single and multi-GPU (CI spans 1x or within {SCALING_MARGIN:.0%})")
         
-        gpu_types = {}
-        for result, config in gpu_configs:
-            gpu_type = result['gpu_type']
-            if gpu_type:
-                if gpu_type not in gpu_types:
-                    gpu_types[gpu_type] = []
-                gpu_types[gpu_type].append(config['pp512'])
+        gpu_types = {gpu_type: [e['config']['pp512'] for e in entries if not e['is_cpu']]
+                     for gpu_type, entries in index.group_by('gpu_type').items() if gpu_type}
+        gpu_types = {gpu_type: values for gpu_type, values in gpu_types.items() if values}
         
         if len(gpu_types) > 1:
             print(f"\n4. Hardware Comparison:")
@@ -322,11 +511,12 @@ def main():
     print("\n" + "="*70)
     print("ANALYSIS COMPLETE")
     print("="*70)
-    print(f"\n✅ Analysis saved to: {OUTPUT_FILE}")
+    print(f"\n✅ Analysis saved to: {output_file}")
+    print(f"✅ Results store saved to: {store_file}")
     
     tee.close()
     sys.stdout = tee.terminal
-    print(f"\n✅ Analysis saved to: {OUTPUT_FILE}")
+    print(f"\n✅ Analysis saved to: {output_file}")
 
 if __name__ == "__main__":
     main()
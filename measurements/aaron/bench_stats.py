@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Bootstrap confidence intervals for llama-bench throughput and speedups
+
+Resampling is vectorized: all bootstrap replicates are drawn as one
+(n_boot, n) index matrix instead of a Python loop. Markdown reports only
+keep "mean ± stddev" per row, so those get a Student t interval over the
+row's -r repetitions instead of a bootstrap.
+"""
+
+import math
+
+import numpy as np
+
+from llama_bench_ingest import test_label
+
+N_BOOT = 10000
+CONFIDENCE = 0.95
+# llama-bench -r default; used when only "mean ± stddev" rows are available
+DEFAULT_REPETITIONS = 5
+
+# Two-sided 95% Student t quantiles by degrees of freedom (the largest listed df <= actual is used)
+T_QUANTILES = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+               10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042, 40: 2.021, 60: 2.000,
+               120: 1.980}
+
+# Reproducible across runs, but every call gets its own stream
+_SEEDS = np.random.SeedSequence(0)
+
+def _rng(rng):
+    return rng if rng is not None else np.random.default_rng(_SEEDS.spawn(1)[0])
+
+def t_quantile(df):
+    return T_QUANTILES[max(k for k in T_QUANTILES if k <= df)] if df < 1000 else 1.960
+
+def bootstrap_means(samples, n_boot=N_BOOT, rng=None):
+    samples = np.asarray(samples, dtype=float)
+    idx = _rng(rng).integers(0, len(samples), size=(n_boot, len(samples)))
+    return samples[idx].mean(axis=1)
+
+def percentile_ci(replicates, confidence=CONFIDENCE):
+    alpha = (1 - confidence) / 2
+    lo, hi = np.quantile(replicates, [alpha, 1 - alpha])
+    return float(lo), float(hi)
+
+def bootstrap_mean_ci(samples, n_boot=N_BOOT, confidence=CONFIDENCE, rng=None):
+    """Return (mean, lo, hi); lo/hi are None with fewer than two samples."""
+    samples = np.asarray(samples, dtype=float)
+    if len(samples) == 0:
+        return None, None, None
+    if len(samples) < 2:
+        return float(samples[0]), None, None
+    lo, hi = percentile_ci(bootstrap_means(samples, n_boot, rng), confidence)
+    return float(samples.mean()), lo, hi
+
+def bootstrap_ratio_ci(numerator, denominator, n_boot=N_BOOT, confidence=CONFIDENCE, rng=None):
+    """CI for mean(numerator) / mean(denominator), resampling both groups independently."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    if len(numerator) == 0 or len(denominator) == 0:
+        return None, None, None
+    ratio = float(numerator.mean() / denominator.mean())
+    if len(numerator) < 2 or len(denominator) < 2:
+        return ratio, None, None
+    rng = _rng(rng)
+    replicates = bootstrap_means(numerator, n_boot, rng) / bootstrap_means(denominator, n_boot, rng)
+    lo, hi = percentile_ci(replicates, confidence)
+    return ratio, lo, hi
+
+def relative_ci_width(samples, n_boot=N_BOOT, confidence=CONFIDENCE, rng=None):
+    mean, lo, hi = bootstrap_mean_ci(samples, n_boot, confidence, rng)
+    if lo is None or not mean:
+        return float('inf')
+    return (hi - lo) / mean
+
+def config_samples(config, test):
+    """Per-repetition t/s for one test, from llama-bench's samples_ts; empty for markdown-only rows."""
+    raw = [v for run in config.get('runs', []) if test_label(run) == test
+           for v in run.get('samples_ts', [])]
+    return np.asarray(raw, dtype=float)
+
+def config_repetitions(config):
+    try:
+        return int(config.get('params', {}).get('-r') or DEFAULT_REPETITIONS)
+    except ValueError:
+        return DEFAULT_REPETITIONS
+
+def pool_summaries(rows):
+    """(mean, stddev, n) of the union of groups given as (mean, stddev, n) each."""
+    rows = [(m, sd, n) for m, sd, n in rows if n > 0]
+    total = sum(n for _, _, n in rows)
+    if not total:
+        return None
+    mean = sum(m * n for m, _, n in rows) / total
+    ss = sum((n - 1) * sd ** 2 + n * (m - mean) ** 2 for m, sd, n in rows)
+    return mean, math.sqrt(ss / (total - 1)) if total > 1 else 0.0, total
+
+def config_summary(config, test):
+    """(mean, stddev, n) over repetitions: the raw samples, or each markdown row as its -r repetitions."""
+    raw = config_samples(config, test)
+    if raw.size:
+        return float(raw.mean()), float(raw.std(ddof=1)) if raw.size > 1 else 0.0, raw.size
+    means = config.get('samples', {}).get(test, [])
+    stddevs = config.get('stddevs', {}).get(test, [0.0] * len(means))
+    r = config_repetitions(config)
+    return pool_summaries([(m, sd, r) for m, sd in zip(means, stddevs)])
+
+def summary_mean_ci(summary, confidence=CONFIDENCE):
+    """Student t interval (95% only) for a (mean, stddev, n) summary."""
+    if summary is None:
+        return None, None, None
+    mean, sd, n = summary
+    if n < 2:
+        return mean, None, None
+    half = t_quantile(n - 1) * sd / math.sqrt(n)
+    return mean, mean - half, mean + half
+
+def summary_ratio_ci(numerator, denominator, confidence=CONFIDENCE):
+    """Interval for mean ratio from two summaries: delta method on the log scale, t with the smaller df."""
+    if numerator is None or denominator is None or not denominator[0]:
+        return None, None, None
+    (m1, sd1, n1), (m2, sd2, n2) = numerator, denominator
+    ratio = m1 / m2
+    if min(n1, n2) < 2 or m1 <= 0:
+        return ratio, None, None
+    rel_se = math.sqrt((sd1 / m1) ** 2 / n1 + (sd2 / m2) ** 2 / n2)
+    half = t_quantile(min(n1, n2) - 1) * rel_se
+    return ratio, ratio * math.exp(-half), ratio * math.exp(half)
+
+def configs_mean_ci(configs, test):
+    """(mean, lo, hi) for one test pooled over configs: bootstrap on raw samples, else a t interval."""
+    samples = [config_samples(c, test) for c in configs]
+    if all(s.size for s in samples):
+        return bootstrap_mean_ci(np.concatenate(samples))
+    return summary_mean_ci(pool_summaries([s for s in (config_summary(c, test) for c in configs) if s]))
+
+def configs_ratio_ci(numerators, denominators, test):
+    """(ratio, lo, hi) of pooled means, numerator configs over denominator configs."""
+    num = [config_samples(c, test) for c in numerators]
+    den = [config_samples(c, test) for c in denominators]
+    if all(s.size for s in num + den):
+        return bootstrap_ratio_ci(np.concatenate(num), np.concatenate(den))
+    pooled = [pool_summaries([s for s in (config_summary(c, test) for c in group) if s])
+              for group in (numerators, denominators)]
+    return summary_ratio_ci(*pooled)
+
+def format_ci(mean, lo, hi, unit=''):
+    if mean is None:
+        return "n/a"
+    if lo is None:
+        return f"{mean:.2f}{unit} (n<2)"
+    return f"{mean:.2f}{unit} [{lo:.2f}, {hi:.2f}]"
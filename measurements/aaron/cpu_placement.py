@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+CPU placement analysis for sweep.py "cpu_topology" runs
+
+Each placement (default, compact, scatter, distribute, isolate, numactl,
+per_node) is reduced to total tokens/sec, cores used and tokens/sec per
+core. The compact thread counts give the scaling curve, and the best
+placement per test is recommended by total throughput and per-core
+efficiency.
+"""
+
+from llama_bench_ingest import test_label
+
+TESTS = ['pp512', 'tg128']
+
+def placement_rows(results_list, tests=TESTS):
+    """One row per (node, placement run, test); per_node instances are summed."""
+    rows = []
+    for result in results_list:
+        for config in result['configurations']:
+            runs = [r for r in config.get('runs') or [] if r.get('placement')]
+            if not runs:
+                continue
+            for test in tests:
+                per_instance = {}
+                for run in runs:
+                    if test_label(run) == test:
+                        per_instance.setdefault(run.get('instance', 0), []).append(run['avg_ts'])
+                if not per_instance:
+                    continue
+                threads = runs[0].get('n_threads', 0)
+                cores = threads * len(per_instance)
+                tps = sum(sum(v) / len(v) for v in per_instance.values())
+                rows.append({
+                    'node': result['node'] or 'Unknown',
+                    'config': config['name'],
+                    'placement': runs[0]['placement'],
+                    'threads': threads,
+                    'instances': len(per_instance),
+                    'cores': cores,
+                    'test': test,
+                    'tps': tps,
+                    'tps_per_core': tps / cores if cores else 0.0,
+                })
+    return rows
+
+def scaling_curve(rows):
+    """(cores, t/s, efficiency vs the smallest compact run) for the compact placement."""
+    compact = sorted((r for r in rows if r['placement'] == 'compact'), key=lambda r: r['cores'])
+    if not compact:
+        return []
+    base = compact[0]['tps_per_core']
+    return [(r['cores'], r['tps'], r['tps_per_core'] / base if base else 0.0) for r in compact]
+
+def recommend(rows):
+    """(best by total t/s, best by t/s per core)."""
+    if not rows:
+        return None, None
+    return max(rows, key=lambda r: r['tps']), max(rows, key=lambda r: r['tps_per_core'])
+
+def describe(row):
+    instances = f" x {row['instances']} instances" if row['instances'] > 1 else ""
+    return f"{row['placement']} ({row['threads']} threads{instances})"
+
+def print_cpu_placement(results_list, tests=TESTS, indent="   "):
+    rows = placement_rows(results_list, tests)
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['node'], row['test']), []).append(row)
+
+    for (node, test), group in sorted(groups.items()):
+        print(f"\n{indent}{node} ({test}):")
+        print(f"{indent}| Placement  | Threads | Instances | Cores | t/s       | t/s per core |")
+        print(f"{indent}|------------|---------|-----------|-------|-----------|--------------|")
+        for row in sorted(group, key=lambda r: (r['placement'], r['cores'])):
+            print(f"{indent}| {row['placement']:10s} | {row['threads']:7d} | {row['instances']:9d} | "
+                  f"{row['cores']:5d} | {row['tps']:9.2f} | {row['tps_per_core']:12.3f} |")
+
+        curve = scaling_curve(group)
+        if len(curve) > 1:
+            print(f"{indent}Scaling (compact): " +
+                  ", ".join(f"{cores}c {tps:.1f} t/s ({eff*100:.0f}%)" for cores, tps, eff in curve))
+
+        best_total, best_core = recommend(group)
+        print(f"{indent}💡 Best throughput: {describe(best_total)} → {best_total['tps']:.2f} t/s")
+        if best_core is not best_total:
+            print(f"{indent}   Best per core:   {describe(best_core)} → {best_core['tps_per_core']:.3f} t/s/core")
+        default = [r for r in group if r['placement'] == 'default']
+        if default and best_total is not default[0]:
+            gain = (best_total['tps'] / default[0]['tps'] - 1) * 100
+            print(f"{indent}   {gain:+.1f}% vs the default -t {default[0]['threads']} run")
+    return rows
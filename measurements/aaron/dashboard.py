@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Self-contained HTML dashboard over every benchmark report
+
+Writes one offline HTML file (no server, no network) with every repetition
+embedded column by column: strings are dictionary encoded, timestamps are
+epoch seconds. Reports load through the same parse cache as
+analyze_results.py; llama-bench JSON output contributes each repetition's
+samples_ts, markdown-only reports their per-run means. The page filters by
+node, GPU type, model, config, test and date, summarizes the matching
+groups and drills down from a group to its per-repetition samples and the
+hardware telemetry recorded for that test. Telemetry histories and long
+sample timelines are downsampled with Largest-Triangle-Three-Buckets (LTTB)
+so hundreds of thousands of points still load quickly.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from analyze_results import BENCHMARK_DIR, find_reports, load_results
+from llama_bench_ingest import run_setup, test_label
+from results_cache import CACHE_FILENAME, ResultsCache
+from telemetry import load_telemetry, metric_name
+
+DASHBOARD_FILENAME = "dashboard.html"
+MAX_POINTS = 2000        # points per telemetry series / drill-down timeline after LTTB
+COLUMNS = ['file', 'timestamp', 'node', 'gpu_type', 'model', 'config', 'setup', 'test', 'test_num',
+           'run', 'repetition', 'tps']
+STRING_COLUMNS = {'file', 'node', 'gpu_type', 'model', 'config', 'setup', 'test'}
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: keep threshold points that preserve the series' shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    every = (n - 2) / (threshold - 2)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if end < next_end:
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        # Point in this bucket forming the largest triangle with the last kept point and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+def sample_rows(results_list):
+    """One row per repetition (per run mean for markdown-only reports), in COLUMNS order."""
+    rows = []
+    for result in results_list:
+        stamp = result.get('timestamp')
+        seconds = int(datetime.fromisoformat(stamp).timestamp()) if stamp else 0
+        for config in result['configurations']:
+            base = (result['filename'], seconds, result['node'] or 'Unknown', result['gpu_type'] or '',
+                    config.get('model') or result.get('model') or '', config['name'])
+            runs = config.get('runs') or []
+            for test, means in config['samples'].items():
+                matching = [r for r in runs if test_label(r) == test]
+                if len(matching) != len(means):
+                    matching = [{}] * len(means)
+                for k, (mean, run) in enumerate(zip(means, matching)):
+                    setup = run_setup(run) if run else config['name']
+                    for rep, tps in enumerate(run.get('samples_ts') or [mean]):
+                        rows.append(base + (setup, test, config.get('test_num', 0), k, rep, tps))
+    return rows
+
+def encode_strings(values):
+    """Dictionary-encode a string column: {'dict': [unique], 'codes': [index per row]}."""
+    uniques, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return {'dict': uniques.tolist(), 'codes': codes.ravel().tolist()}
+
+def encode_columns(rows):
+    columns = {}
+    for i, name in enumerate(COLUMNS):
+        values = [row[i] for row in rows]
+        if name in STRING_COLUMNS:
+            columns[name] = encode_strings(values)
+        elif name == 'tps':
+            columns[name] = np.round(np.asarray(values, dtype=float), 3).tolist()
+        else:
+            columns[name] = [int(v) for v in values]
+    return columns
+
+def telemetry_series(path, max_points):
+    """{metric: [[t...], [v...]]} with per-core/per-node columns averaged and each series LTTB-downsampled."""
+    telemetry = load_telemetry(path)
+    times, values = telemetry['time'], telemetry['values']
+    if len(times) == 0:
+        return {}
+    groups = {}
+    for i, column in enumerate(telemetry['columns']):
+        groups.setdefault(metric_name(column), []).append(i)
+    series = {}
+    with np.errstate(all='ignore'):
+        for name, idx in sorted(groups.items()):
+            if name.endswith('throttle'):
+                continue
+            cells = values[:, idx]
+            y = np.nansum(cells, axis=1) / np.isfinite(cells).sum(axis=1)
+            finite = np.isfinite(y)
+            if not finite.any():
+                continue
+            x, y = lttb(times[finite] - times[0], y[finite], max_points)
+            series[name] = [np.round(x, 2).tolist(), np.round(y, 3).tolist()]
+    return series
+
+def collect_telemetry(benchmark_dir, files, max_points):
+    """{'<report file>#<test_num>': series} for the sweep telemetry next to each report."""
+    telemetry = {}
+    for name in files:
+        directory = benchmark_dir / f"{Path(name).stem}.telemetry"
+        for path in sorted(directory.glob("test_*.npz")):
+            try:
+                test_num = int(path.stem.split('_')[1])
+                series = telemetry_series(path, max_points)
+            except (ValueError, KeyError, OSError):
+                continue
+            if series:
+                telemetry[f"{name}#{test_num}"] = series
+    return telemetry
+
+def build_dashboard(results_list, benchmark_dir, max_points=MAX_POINTS):
+    rows = sample_rows(results_list)
+    columns = encode_columns(rows)
+    payload = {
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'rows': len(rows),
+        'max_points': max_points,
+        'columns': columns,
+        'telemetry': collect_telemetry(benchmark_dir, columns['file']['dict'], max_points),
+    }
+    # Keep "</script>" inside string data from closing the embedding tag
+    data = json.dumps(payload, separators=(',', ':')).replace('</', '<\\/')
+    return HTML_TEMPLATE.replace('__DATA__', data), len(rows)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write an offline HTML dashboard of all benchmark reports")
+    parser.add_argument('--dir', type=Path, default=BENCHMARK_DIR,
+                        help="directory holding benchmark_results* and *.telemetry/ (default: %(default)s)")
+    parser.add_argument('--output', type=Path, help=f"HTML file (default: <dir>/figures/{DASHBOARD_FILENAME})")
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS,
+                        help="points kept per telemetry series and timeline (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="parser processes (default: %(default)s, 1 = serial)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    reports = find_reports(args.dir)
+    if not reports:
+        print(f"✗ No benchmark files found in {args.dir}")
+        return 1
+
+    cache = ResultsCache(args.dir / CACHE_FILENAME)
+    results_list = []
+    for filepath, results, error, _ in load_results(reports, args.workers, cache):
+        if error is not None:
+            print(f"  ⚠ {filepath.name}: {error}")
+        elif results['configurations']:
+            results_list.append(results)
+    cache.close()
+
+    output = args.output or args.dir / "figures" / DASHBOARD_FILENAME
+    output.parent.mkdir(parents=True, exist_ok=True)
+    html, n_samples = build_dashboard(results_list, args.dir, args.max_points)
+    output.write_text(html, encoding='utf-8')
+    print(f"✓ Dashboard: {output} ({len(results_list)} reports, {n_samples} samples, {len(html) / 1e6:.1f} MB)")
+    return 0
+
+HTML_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>llama.cpp Benchmark Dashboard</title>
+<style>
+  body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; margin: 0; color: #222; background: #f4f5f7; }
+  header { background: #2E86AB; color: white; padding: 12px 20px; }
+  header h1 { margin: 0; font-size: 20px; }
+  header span { font-size: 12px; opacity: 0.85; }
+  main { padding: 12px 20px; }
+  .filters { display: flex; flex-wrap: wrap; gap: 12px; background: white; padding: 10px; border-radius: 6px; }
+  .filters label { font-size: 12px; font-weight: bold; display: flex; flex-direction: column; gap: 4px; }
+  .filters select { min-width: 140px; height: 90px; font-size: 12px; }
+  .filters input { font-size: 12px; }
+  .panel { background: white; margin-top: 12px; padding: 10px; border-radius: 6px; }
+  .panel h2 { font-size: 15px; margin: 0 0 8px 0; }
+  table { border-collapse: collapse; width: 100%; font-size: 12px; }
+  th, td { padding: 4px 8px; border-bottom: 1px solid #e3e3e3; text-align: left; white-space: nowrap; }
+  th { background: #fafafa; cursor: pointer; user-select: none; }
+  td.num, th.num { text-align: right; font-variant-numeric: tabular-nums; }
+  tbody tr.group:hover { background: #eef6fb; cursor: pointer; }
+  tbody tr.selected { background: #d6ebf5; }
+  canvas { width: 100%; height: 320px; border: 1px solid #e3e3e3; border-radius: 4px; }
+  .note { font-size: 12px; color: #666; }
+  .scroll { max-height: 360px; overflow: auto; }
+  button { font-size: 12px; margin: 0 4px 4px 0; }
+</style>
+</head>
+<body>
+<header><h1>llama.cpp Benchmark Dashboard</h1><span id="meta"></span></header>
+<main>
+  <div class="filters" id="filters"></div>
+  <div class="panel">
+    <h2>Summary <span class="note" id="summary-note"></span></h2>
+    <div class="scroll"><table id="summary"></table></div>
+  </div>
+  <div class="panel" id="drill" hidden>
+    <h2 id="drill-title"></h2>
+    <canvas id="timeline"></canvas>
+    <p class="note" id="timeline-note"></p>
+    <div id="telemetry-controls"></div>
+    <canvas id="telemetry" hidden></canvas>
+    <div class="scroll"><table id="samples"></table></div>
+  </div>
+</main>
+<script type="application/json" id="data">__DATA__</script>
+<script>
+"use strict";
+const D = JSON.parse(document.getElementById('data').textContent);
+const C = D.columns;
+const N = D.rows;
+const COLORS = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#6A994E', '#8B5A3C'];
+const FILTERS = [['node', 'Node'], ['gpu_type', 'GPU type'], ['model', 'Model'], ['config', 'Config'], ['test', 'Test']];
+const GROUP_KEY = ['node', 'gpu_type', 'model', 'config', 'test'];
+let groups = [], sortKey = 'key', sortDir = 1, selected = null;
+
+function str(name, i) { const c = C[name]; return c ? c.dict[c.codes[i]] : ''; }
+function fmtDate(s) { return s ? new Date(s * 1000).toISOString().slice(0, 16).replace('T', ' ') : '-'; }
+function esc(s) { return String(s).replace(/[&<>"]/g, ch => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[ch])); }
+
+function buildFilters() {
+  const box = document.getElementById('filters');
+  for (const [name, label] of FILTERS) {
+    if (!C[name]) continue;
+    const options = C[name].dict.map((v, k) => `<option value="${k}">${esc(v || '(none)')}</option>`).join('');
+    box.insertAdjacentHTML('beforeend', `<label>${label}<select multiple id="f-${name}">${options}</select></label>`);
+  }
+  let first = Infinity, last = 0;
+  for (const s of C.timestamp) if (s > 0) { first = Math.min(first, s); last = Math.max(last, s); }
+  const day = s => new Date(s * 1000).toISOString().slice(0, 10);
+  const lo = last ? day(first) : '', hi = last ? day(last) : '';
+  box.insertAdjacentHTML('beforeend',
+    `<label>From<input type="date" id="f-from" value="${lo}"></label><label>To<input type="date" id="f-to" value="${hi}"></label>` +
+    `<label>&nbsp;<button id="f-reset">Reset filters</button></label>`);
+  box.addEventListener('change', update);
+  document.getElementById('f-reset').addEventListener('click', () => {
+    box.querySelectorAll('select').forEach(s => [...s.options].forEach(o => o.selected = false));
+    document.getElementById('f-from').value = lo; document.getElementById('f-to').value = hi;
+    update();
+  });
+}
+
+function filteredRows() {
+  const allowed = {};
+  for (const [name] of FILTERS) {
+    const el = document.getElementById('f-' + name);
+    const picked = el ? [...el.selectedOptions].map(o => +o.value) : [];
+    if (picked.length) allowed[name] = new Set(picked);
+  }
+  const from = document.getElementById('f-from').value, to = document.getElementById('f-to').value;
+  const lo = from ? Date.parse(from) / 1000 : -Infinity, hi = to ? Date.parse(to) / 1000 + 86400 : Infinity;
+  const rows = [];
+  outer: for (let i = 0; i < N; i++) {
+    for (const name in allowed) if (!allowed[name].has(C[name].codes[i])) continue outer;
+    const t = C.timestamp[i];
+    if (t && (t < lo || t >= hi)) continue;
+    rows.push(i);
+  }
+  return rows;
+}
+
+function summarize(rows) {
+  const map = new Map();
+  for (const i of rows) {
+    const key = GROUP_KEY.map(k => C[k] ? C[k].codes[i] : 0).join('|');
+    let g = map.get(key);
+    if (!g) {
+      g = {key: GROUP_KEY.map(k => str(k, i)).join(' | '), fields: Object.fromEntries(GROUP_KEY.map(k => [k, str(k, i)])),
+           rows: [], files: new Set(), sum: 0, sq: 0, min: Infinity, max: -Infinity, latest: 0};
+      map.set(key, g);
+    }
+    const v = C.tps[i];
+    g.rows.push(i); g.files.add(C.file.codes[i]); g.sum += v; g.sq += v * v;
+    g.min = Math.min(g.min, v); g.max = Math.max(g.max, v); g.latest = Math.max(g.latest, C.timestamp[i]);
+  }
+  return [...map.values()].map(g => {
+    const n = g.rows.length, mean = g.sum / n;
+    return Object.assign(g, {n, runs: g.files.size, mean, std: n > 1 ? Math.sqrt(Math.max(0, (g.sq - n * mean * mean) / (n - 1))) : 0});
+  });
+}
+
+function renderSummary() {
+  const cols = [['node', 'Node'], ['gpu_type', 'GPU'], ['model', 'Model'], ['config', 'Config'], ['test', 'Test'],
+                ['runs', 'Reports', 1], ['n', 'Samples', 1], ['mean', 'Mean t/s', 1], ['std', 'Stddev', 1],
+                ['min', 'Min', 1], ['max', 'Max', 1], ['latest', 'Latest']];
+  const value = (g, k) => k in g.fields ? g.fields[k] : g[k];
+  groups.sort((a, b) => {
+    const x = sortKey === 'key' ? a.key : value(a, sortKey), y = sortKey === 'key' ? b.key : value(b, sortKey);
+    return (x < y ? -1 : x > y ? 1 : 0) * sortDir;
+  });
+  const head = '<thead><tr>' + cols.map(([k, label, num]) => `<th data-k="${k}" class="${num ? 'num' : ''}">${label}</th>`).join('') + '</tr></thead>';
+  const body = groups.map((g, idx) => `<tr class="group${g === selected ? ' selected' : ''}" data-idx="${idx}">` + cols.map(([k, , num]) => {
+    const v = value(g, k);
+    if (k === 'latest') return `<td>${fmtDate(v)}</td>`;
+    return num ? `<td class="num">${Number.isInteger(v) ? v : v.toFixed(2)}</td>` : `<td>${esc(v)}</td>`;
+  }).join('') + '</tr>').join('');
+  const table = document.getElementById('summary');
+  table.innerHTML = head + '<tbody>' + body + '</tbody>';
+  table.querySelectorAll('th').forEach(th => th.addEventListener('click', () => {
+    sortDir = sortKey === th.dataset.k ? -sortDir : 1; sortKey = th.dataset.k; renderSummary();
+  }));
+  table.querySelectorAll('tr.group').forEach(tr => tr.addEventListener('click', () => drill(groups[+tr.dataset.idx])));
+}
+
+function update() {
+  const rows = filteredRows();
+  groups = summarize(rows);
+  document.getElementById('summary-note').textContent = `${groups.length} groups, ${rows.length} of ${N} samples`;
+  if (selected && !groups.some(g => g.key === selected.key)) { selected = null; document.getElementById('drill').hidden = true; }
+  else if (selected) selected = groups.find(g => g.key === selected.key);
+  renderSummary();
+  if (selected) drill(selected);
+}
+
+// Largest-Triangle-Three-Buckets, same as dashboard.lttb on the Python side
+function lttb(xs, ys, threshold) {
+  const n = xs.length;
+  if (threshold >= n || threshold < 3) return [xs, ys];
+  const every = (n - 2) / (threshold - 2), ox = [xs[0]], oy = [ys[0]];
+  let a = 0;
+  for (let i = 0; i < threshold - 2; i++) {
+    const start = Math.floor(i * every) + 1, end = Math.floor((i + 1) * every) + 1;
+    const nextEnd = Math.min(Math.floor((i + 2) * every) + 1, n);
+    let ax = xs[n - 1], ay = ys[n - 1];
+    if (end < nextEnd) {
+      ax = 0; ay = 0;
+      for (let j = end; j < nextEnd; j++) { ax += xs[j]; ay += ys[j]; }
+      ax /= nextEnd - end; ay /= nextEnd - end;
+    }
+    let best = start, area = -1;
+    for (let j = start; j < end; j++) {
+      const s = Math.abs((xs[a] - ax) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (ay - ys[a]));
+      if (s > area) { area = s; best = j; }
+    }
+    ox.push(xs[best]); oy.push(ys[best]); a = best;
+  }
+  ox.push(xs[n - 1]); oy.push(ys[n - 1]);
+  return [ox, oy];
+}
+
+function drawChart(canvas, series, xLabel, yLabel, xIsTime) {
+  const dpr = window.devicePixelRatio || 1, w = canvas.clientWidth, h = canvas.clientHeight;
+  canvas.width = w * dpr; canvas.height = h * dpr;
+  const ctx = canvas.getContext('2d');
+  ctx.scale(dpr, dpr); ctx.clearRect(0, 0, w, h);
+  const pad = {l: 64, r: 12, t: 12, b: 40};
+  let x0 = Infinity, x1 = -Infinity, y0 = 0, y1 = -Infinity;
+  for (const s of series) s.x.forEach((x, k) => {
+    x0 = Math.min(x0, x); x1 = Math.max(x1, x); y0 = Math.min(y0, s.y[k]); y1 = Math.max(y1, s.y[k]);
+  });
+  if (x1 === -Infinity) return;
+  if (x0 === x1) { x0 -= 1; x1 += 1; }
+  if (y0 === y1) y1 = y0 + 1;
+  y1 *= 1.05;
+  const px = x => pad.l + (x - x0) / (x1 - x0) * (w - pad.l - pad.r);
+  const py = y => h - pad.b - (y - y0) / (y1 - y0) * (h - pad.t - pad.b);
+  ctx.strokeStyle = '#ccc'; ctx.fillStyle = '#444'; ctx.font = '11px sans-serif'; ctx.lineWidth = 1;
+  for (let k = 0; k <= 4; k++) {
+    const y = y0 + (y1 - y0) * k / 4, x = x0 + (x1 - x0) * k / 4;
+    ctx.beginPath(); ctx.moveTo(pad.l, py(y)); ctx.lineTo(w - pad.r, py(y)); ctx.stroke();
+    ctx.textAlign = 'right'; ctx.fillText(y.toPrecision(4), pad.l - 4, py(y) + 4);
+    ctx.textAlign = 'center'; ctx.fillText(xIsTime ? fmtDate(x).slice(5) : x.toPrecision(4), px(x), h - pad.b + 14);
+  }
+  ctx.fillText(xLabel, (pad.l + w - pad.r) / 2, h - 6);
+  ctx.save(); ctx.translate(12, (pad.t + h - pad.b) / 2); ctx.rotate(-Math.PI / 2); ctx.fillText(yLabel, 0, 0); ctx.restore();
+  series.forEach((s, k) => {
+    ctx.strokeStyle = ctx.fillStyle = s.color || COLORS[k % COLORS.length];
+    if (s.points) {
+      s.x.forEach((x, j) => { ctx.beginPath(); ctx.arc(px(x), py(s.y[j]), 2.5, 0, 2 * Math.PI); ctx.fill(); });
+    } else {
+      ctx.lineWidth = 2; ctx.beginPath();
+      s.x.forEach((x, j) => j ? ctx.lineTo(px(x), py(s.y[j])) : ctx.moveTo(px(x), py(s.y[j])));
+      ctx.stroke();
+    }
+  });
+  let lx = pad.l + 8;
+  series.forEach((s, k) => {
+    if (!s.label) return;
+    ctx.fillStyle = s.color || COLORS[k % COLORS.length]; ctx.textAlign = 'left';
+    ctx.fillRect(lx, pad.t + 2, 10, 10); ctx.fillStyle = '#222'; ctx.fillText(s.label, lx + 14, pad.t + 11);
+    lx += ctx.measureText(s.label).width + 30;
+  });
+}
+
+function drill(g) {
+  selected = g;
+  document.querySelectorAll('#summary tr.group').forEach(tr => tr.classList.toggle('selected', groups[+tr.dataset.idx] === g));
+  const panel = document.getElementById('drill');
+  panel.hidden = false;
+  document.getElementById('drill-title').textContent = `${g.key} - ${g.n} samples from ${g.runs} report(s)`;
+
+  // Timeline: every repetition (LTTB when long) plus the per-run mean
+  const rows = g.rows.slice().sort((a, b) => C.timestamp[a] - C.timestamp[b] || C.test_num[a] - C.test_num[b] ||
+                                      C.run[a] - C.run[b] || C.repetition[a] - C.repetition[b]);
+  const dated = rows.every(i => C.timestamp[i] > 0);
+  const xs = rows.map((i, k) => dated ? C.timestamp[i] + C.repetition[i] : k), ys = rows.map(i => C.tps[i]);
+  const [sx, sy] = lttb(xs, ys, D.max_points);
+  const perRun = new Map();
+  rows.forEach((i, k) => {
+    const key = C.file.codes[i] + '#' + C.test_num[i] + '#' + C.run[i];
+    const r = perRun.get(key) || {x: xs[k], sum: 0, n: 0};
+    r.sum += ys[k]; r.n += 1; perRun.set(key, r);
+  });
+  const means = [...perRun.values()].sort((a, b) => a.x - b.x);
+  drawChart(document.getElementById('timeline'),
+            [{x: sx, y: sy, points: true, label: 'repetitions'},
+             {x: means.map(r => r.x), y: means.map(r => r.sum / r.n), label: 'run mean'}],
+            dated ? 'run date' : 'sample', 't/s', dated);
+  document.getElementById('timeline-note').textContent =
+    sx.length < xs.length ? `${xs.length} samples downsampled to ${sx.length} with LTTB` : '';
+
+  // Telemetry recorded for the runs in this group
+  const controls = document.getElementById('telemetry-controls'), canvas = document.getElementById('telemetry');
+  const keys = [...new Set(rows.map(i => C.file.dict[C.file.codes[i]] + '#' + C.test_num[i]))].filter(k => D.telemetry[k]);
+  canvas.hidden = true;
+  controls.innerHTML = keys.length ? '<span class="note">Telemetry: </span>' + keys.map(k =>
+    `<button data-k="${esc(k)}">${esc(k.replace(/^benchmark_results_?/, ''))}</button>`).join('') + '<select id="metric"></select>' : '';
+  let current = null;
+  const showTelemetry = () => {
+    const series = D.telemetry[current], metric = document.getElementById('metric').value;
+    if (!series || !series[metric]) return;
+    canvas.hidden = false;
+    drawChart(canvas, [{x: series[metric][0], y: series[metric][1], label: metric}], 'seconds into test', metric, false);
+  };
+  controls.querySelectorAll('button').forEach(b => b.addEventListener('click', () => {
+    current = b.dataset.k;
+    const select = document.getElementById('metric'), previous = select.value;
+    select.innerHTML = Object.keys(D.telemetry[current]).map(m => `<option>${esc(m)}</option>`).join('');
+    if (D.telemetry[current][previous]) select.value = previous;
+    showTelemetry();
+  }));
+  if (keys.length) document.getElementById('metric').addEventListener('change', showTelemetry);
+
+  // Per-repetition samples
+  const limit = 1000;
+  const head = '<thead><tr><th>Run date</th><th>File</th><th>Test #</th><th>Setup</th><th class="num">Run</th>' +
+               '<th class="num">Repetition</th><th class="num">t/s</th></tr></thead>';
+  const body = rows.slice(0, limit).map(i => `<tr><td>${fmtDate(C.timestamp[i])}</td><td>${esc(str('file', i))}</td>` +
+    `<td>${C.test_num[i]}</td><td>${esc(str('setup', i))}</td><td class="num">${C.run[i]}</td><td class="num">${C.repetition[i]}</td>` +
+    `<td class="num">${C.tps[i].toFixed(2)}</td></tr>`).join('');
+  const more = rows.length > limit ? `<tr><td colspan="7" class="note">... ${rows.length - limit} more samples (narrow the filters)</td></tr>` : '';
+  document.getElementById('samples').innerHTML = head + '<tbody>' + body + more + '</tbody>';
+}
+
+document.getElementById('meta').textContent = `${N} samples - generated ${D.generated} - offline, no network needed`;
+buildFilters();
+update();
+window.addEventListener('resize', () => selected && drill(selected));
+</script>
+</body>
+</html>
+"""
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Performance regression detector over the benchmark_results* history
+
+Runs are grouped by (node, gpu_type, model, config) and test. Each group keeps
+running statistics (count, mean, M2) in an indexed SQLite history, so a new
+run is checked against every earlier run with one lookup. A change-point scan
+over each touched group catches sustained shifts the per-run check misses.
+
+Exit status is 1 when a new run regresses, so nightly jobs can gate on it.
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from analyze_results import BENCHMARK_DIR, find_reports, load_results
+from perf_model import model_identity
+from results_cache import CACHE_FILENAME, ResultsCache
+
+HISTORY_FILENAME = ".regression_history.sqlite"
+KEY_VERSION = 2       # bump when group_key changes; older histories are re-indexed
+THRESHOLD = 0.05      # flag throughput drops larger than 5%
+MIN_HISTORY = 3       # earlier runs needed before a group is judged
+Z_SCORE = 3.0         # drop must also be this many stddevs below the mean
+CHANGE_POINT_WINDOW = 200
+
+class HistoryIndex:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'key_version'").fetchone()
+        if row is None or int(row[0]) != KEY_VERSION:
+            # Points filed under another grouping would split every history - start over
+            self.conn.executescript("DROP TABLE IF EXISTS runs; DROP TABLE IF EXISTS points; DROP TABLE IF EXISTS stats;")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('key_version', ?)", (str(KEY_VERSION),))
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                file      TEXT PRIMARY KEY,
+                timestamp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS points (
+                grp       TEXT NOT NULL,
+                test      TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                file      TEXT NOT NULL,
+                tps       REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS points_by_group ON points (grp, test, timestamp);
+            CREATE TABLE IF NOT EXISTS stats (
+                grp  TEXT NOT NULL,
+                test TEXT NOT NULL,
+                n    INTEGER NOT NULL,
+                mean REAL NOT NULL,
+                m2   REAL NOT NULL,
+                PRIMARY KEY (grp, test)
+            );
+        """)
+
+    def is_indexed(self, filepath):
+        return self.conn.execute("SELECT 1 FROM runs WHERE file = ?", (str(filepath),)).fetchone() is not None
+
+    def baseline(self, grp, test):
+        row = self.conn.execute("SELECT n, mean, m2 FROM stats WHERE grp = ? AND test = ?", (grp, test)).fetchone()
+        if row is None:
+            return 0, 0.0, 0.0
+        n, mean, m2 = row
+        return n, mean, math.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+
+    def add(self, grp, test, timestamp, filepath, tps):
+        self.conn.execute("INSERT INTO points VALUES (?, ?, ?, ?, ?)", (grp, test, timestamp, str(filepath), tps))
+        n, mean, m2 = self.conn.execute("SELECT n, mean, m2 FROM stats WHERE grp = ? AND test = ?",
+                                        (grp, test)).fetchone() or (0, 0.0, 0.0)
+        # Welford update keeps mean/variance exact without rescanning points
+        n += 1
+        delta = tps - mean
+        mean += delta / n
+        m2 += delta * (tps - mean)
+        self.conn.execute("INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?)", (grp, test, n, mean, m2))
+
+    def mark_indexed(self, filepath, timestamp):
+        self.conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?)", (str(filepath), timestamp))
+
+    def series(self, grp, test, limit=CHANGE_POINT_WINDOW):
+        rows = self.conn.execute("""
+            SELECT timestamp, file, tps FROM points WHERE grp = ? AND test = ?
+            ORDER BY timestamp DESC LIMIT ?
+        """, (grp, test, limit)).fetchall()
+        return rows[::-1]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def group_key(result, config):
+    return " | ".join([result['node'] or 'Unknown', result['gpu_type'] or 'CPU',
+                       model_identity(config.get('model') or result.get('model')), config['name']])
+
+def config_tests(config):
+    for test, values in config.get('samples', {}).items():
+        if values:
+            yield test, sum(values) / len(values)
+
+def check_run(n, mean, stddev, tps, threshold=THRESHOLD, min_history=MIN_HISTORY):
+    if n < min_history or mean <= 0:
+        return None
+    drop = (mean - tps) / mean
+    if drop <= threshold:
+        return None
+    if stddev > 0 and (mean - tps) / stddev < Z_SCORE:
+        return None
+    return drop
+
+def find_change_point(values, threshold=THRESHOLD, min_segment=MIN_HISTORY):
+    """Best single mean-shift split; returns (index, drop, t) for a significant drop, else None."""
+    best = None
+    n = len(values)
+    prefix = [0.0]
+    prefix_sq = [0.0]
+    for v in values:
+        prefix.append(prefix[-1] + v)
+        prefix_sq.append(prefix_sq[-1] + v * v)
+
+    for k in range(min_segment, n - min_segment + 1):
+        n1, n2 = k, n - k
+        m1 = prefix[k] / n1
+        m2 = (prefix[n] - prefix[k]) / n2
+        var1 = max(prefix_sq[k] / n1 - m1 * m1, 0.0)
+        var2 = max((prefix_sq[n] - prefix_sq[k]) / n2 - m2 * m2, 0.0)
+        se = math.sqrt(var1 / n1 + var2 / n2)
+        drop = (m1 - m2) / m1 if m1 else 0.0
+        t = (m1 - m2) / se if se > 0 else (math.inf if m1 > m2 else 0.0)
+        if drop > threshold and t > Z_SCORE and (best is None or t > best[2]):
+            best = (k, drop, t)
+    return best
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Detect throughput regressions across benchmark history")
+    parser.add_argument('--dir', type=Path, default=BENCHMARK_DIR, help="default: %(default)s")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="relative drop that counts as a regression (default: %(default)s)")
+    parser.add_argument('--min-history', type=int, default=MIN_HISTORY,
+                        help="earlier runs required before a group is checked (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="parser processes")
+    parser.add_argument('--index-only', action='store_true',
+                        help="add new runs to the history without failing on regressions (seeding)")
+    parser.add_argument('--rebuild', action='store_true', help=f"drop {HISTORY_FILENAME} and re-index")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    history_path = args.dir / HISTORY_FILENAME
+    if args.rebuild and history_path.exists():
+        history_path.unlink()
+    history = HistoryIndex(history_path)
+
+    print("="*70)
+    print("REGRESSION CHECK")
+    print("="*70)
+
+    new_files = [f for f in find_reports(args.dir) if not history.is_indexed(f)]
+    print(f"\n{len(new_files)} new run(s) to check in {args.dir}")
+
+    cache = ResultsCache(args.dir / CACHE_FILENAME)
+    new_runs = []
+    for filepath, results, error, _ in load_results(new_files, args.workers, cache):
+        if error is not None:
+            print(f"  ⚠ {filepath.name}: {error}")
+        else:
+            new_runs.append((filepath, results))
+    cache.close()
+
+    regressions = []
+    touched = set()
+    # Oldest first, so each run is judged only against runs that came before it
+    for filepath, results in sorted(new_runs, key=lambda x: x[1].get('timestamp') or ''):
+        timestamp = results.get('timestamp') or ''
+        for config in results['configurations']:
+            grp = group_key(results, config)
+            for test, tps in config_tests(config):
+                n, mean, stddev = history.baseline(grp, test)
+                drop = check_run(n, mean, stddev, tps, args.threshold, args.min_history)
+                if drop is not None:
+                    regressions.append((filepath.name, grp, test, mean, tps, drop, n))
+                history.add(grp, test, timestamp, filepath, tps)
+                touched.add((grp, test))
+        history.mark_indexed(filepath, timestamp)
+
+    shifts = []
+    for grp, test in sorted(touched):
+        series = history.series(grp, test)
+        found = find_change_point([tps for _, _, tps in series], args.threshold, args.min_history)
+        if found:
+            k, drop, t = found
+            shifts.append((grp, test, series[k][1], series[k][0], drop, t))
+    history.close()
+
+    if regressions:
+        print("\n| Run                                      | Group / Test                                         | Baseline | New      | Drop   |")
+        print("|------------------------------------------|------------------------------------------------------|----------|----------|--------|")
+        for name, grp, test, mean, tps, drop, n in regressions:
+            print(f"| {name:40s} | {grp + ' / ' + test:52s} | {mean:8.2f} | {tps:8.2f} | {drop*100:5.1f}% |")
+    if shifts:
+        print("\nSustained shifts (change point):")
+        for grp, test, filepath, timestamp, drop, t in shifts:
+            print(f"  📉 {grp} / {test}: -{drop*100:.1f}% from {Path(filepath).name} ({timestamp}, t={t:.1f})")
+
+    if not regressions and not shifts:
+        print("\n✅ No regressions beyond {:.0%}".format(args.threshold))
+        return 0
+    print(f"\n❌ {len(regressions)} regression(s), {len(shifts)} change point(s)")
+    return 0 if args.index_only or not regressions else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
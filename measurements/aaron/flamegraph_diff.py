@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Differential flamegraph and hot-symbol diff between two CPU profiles
+
+Both profiles are folded into one call-stack trie (frames interned, one
+sample-count column per profile), so identical stacks cost one node no
+matter how many samples hit them. Inputs are streamed: folded stacks
+(`stackcollapse-*` output, "a;b;c 123"), raw `perf script` text, an
+existing flamegraph SVG (stacks rebuilt from the frame geometry; frames the
+SVG dropped as too narrow fold into their parent) or pprof text (flat
+samples only, one frame deep). .gz files are read as-is. Memory grows with
+the number of distinct stacks, not samples; --max-depth caps it further.
+
+Shares are fractions of each profile's own samples, so profiles of
+different length compare directly. The SVG is sized by the after profile
+and colored by each frame's self-share change (red grew, blue shrank).
+"""
+
+import argparse
+import gzip
+import html
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from profiling_ingest import CPU_CATEGORIES, PPROF_ROW, PPROF_TOTAL, PROFILING_DIR, category_breakdown
+
+BEFORE, AFTER = 0, 1
+
+SVG_WIDTH = 1200
+FRAME_HEIGHT = 16
+FONT_SIZE = 12
+CHAR_WIDTH = 7        # px per character at FONT_SIZE (Verdana)
+PAD = 10
+MIN_WIDTH_PX = 0.1    # frames narrower than this are not drawn (nor are their children)
+
+SVG_FRAME = re.compile(r'<title>(.*?) \(([\d,]+) samples?, [\d.]+%\)</title>\s*'
+                       r'<rect x="([\d.]+)" y="([\d.]+)" width="([\d.]+)" height="([\d.]+)"')
+FOLDED_LINE = re.compile(r'^\S.* \d+$')
+FRAME_ADDRESS = re.compile(r'<[0-9a-f]{6,}>$')
+FRAME_SUFFIX = re.compile(r'\s*(\[inline\]|\(inline\)|\[clone [^\]]*\])$')
+PERF_OFFSET = re.compile(r'\+0x[0-9a-f]+$')
+
+def strip_balanced(name, opening, closing, trailing_only):
+    """Removes (nested) opening...closing groups - only a trailing one when trailing_only."""
+    out, depth = [], 0
+    for i in range(len(name) - 1, -1, -1):
+        char = name[i]
+        if char == closing:
+            depth += 1
+        elif char == opening and depth:
+            depth -= 1
+            if trailing_only and not depth:
+                return name[:i]
+        elif not depth:
+            if trailing_only:
+                return name
+            out.append(char)
+    return name if trailing_only else ''.join(reversed(out))
+
+def short_name(name):
+    """'void ns::foo<float>(int, bar<x>) const' -> 'void ns::foo', the form pprof -text prints."""
+    name = re.sub(r'\s+const$', '', name.replace('(anonymous namespace)', ''))
+    if name.endswith(')'):
+        name = strip_balanced(name, '(', ')', trailing_only=True) or name
+    return strip_balanced(name, '<', '>', trailing_only=False).strip() or name
+
+def frame_name(raw, full_names=False):
+    """Drops addresses, [inline]/(inline), clone suffixes and (unless full_names) argument lists."""
+    name = raw.strip()
+    while True:
+        stripped = FRAME_SUFFIX.sub('', FRAME_ADDRESS.sub('', name))
+        if stripped == name:
+            break
+        name = stripped
+    return name if full_names else short_name(name)
+
+class StackTrie:
+    """Interned call-stack trie; node 0 is the root and parents are created before children."""
+
+    def __init__(self, n_profiles=2, max_depth=None):
+        self.max_depth = max_depth
+        self.frame_ids = {}
+        self.names = ['all']
+        self.children = {}          # (parent node, frame id) -> node
+        self.parent = [-1]
+        self.frame = [0]
+        self.self_counts = [[0] for _ in range(n_profiles)]
+
+    def __len__(self):
+        return len(self.parent)
+
+    def _node(self, parent, name):
+        frame = self.frame_ids.get(name)
+        if frame is None:
+            frame = self.frame_ids[name] = len(self.names)
+            self.names.append(name)
+        node = self.children.get((parent, frame))
+        if node is None:
+            node = self.children[(parent, frame)] = len(self.parent)
+            self.parent.append(parent)
+            self.frame.append(frame)
+            for counts in self.self_counts:
+                counts.append(0)
+        return node
+
+    def add(self, stack, count, profile):
+        """Adds count samples of a root-first stack; frames past max_depth count as the last kept frame."""
+        if self.max_depth:
+            stack = stack[:self.max_depth]
+        node = 0
+        for name in stack:
+            node = self._node(node, name)
+        self.self_counts[profile][node] += count
+
+    def counts(self):
+        """(self, inclusive) sample arrays shaped (nodes, profiles)."""
+        own = np.array(self.self_counts, dtype=float).T
+        inclusive = own.copy()
+        parent = self.parent
+        for node in range(len(parent) - 1, 0, -1):
+            inclusive[parent[node]] += inclusive[node]
+        return own, inclusive
+
+    def child_lists(self):
+        children = [[] for _ in self.parent]
+        for node in range(1, len(self.parent)):
+            children[self.parent[node]].append(node)
+        return children
+
+def open_profile(filepath):
+    if filepath.suffix == '.gz':
+        return gzip.open(filepath, 'rt', errors='replace')
+    return open(filepath, errors='replace')
+
+def read_folded(f):
+    for line in f:
+        stack, _, count = line.rstrip().rpartition(' ')
+        if stack and count.isdigit():
+            yield stack.split(';'), int(count)
+
+def read_perf_script(f):
+    """One stack per sample block: a header line, then indented frames leaf first."""
+    frames = []
+    for line in f:
+        if not line.strip():
+            if frames:
+                yield frames[::-1], 1
+            frames = []
+        elif line[0].isspace():
+            parts = line.split(None, 1)
+            if len(parts) == 2:
+                symbol = parts[1].rstrip()
+                if symbol.endswith(')') and ' (' in symbol:
+                    symbol = symbol.rsplit(' (', 1)[0]
+                frames.append(PERF_OFFSET.sub('', symbol))
+    if frames:
+        yield frames[::-1], 1
+
+def read_flamegraph_svg(f):
+    """Self samples per stack, rebuilt from frame rows (y) and x-extents in a flamegraph.pl SVG."""
+    frames = [(html.unescape(m.group(1)), int(m.group(2).replace(',', '')),
+               float(m.group(3)), float(m.group(4)), float(m.group(5)), float(m.group(6)))
+              for m in SVG_FRAME.finditer(f.read())]
+    if not frames:
+        return
+    root_index = max(range(len(frames)), key=lambda i: (frames[i][1], frames[i][3]))
+    root = frames[root_index]
+    row_height = root[5] + 1
+    levels = {}
+    for index, (name, count, x, y, width, _) in enumerate(frames):
+        level = round((root[3] - y) / row_height)
+        levels.setdefault(level, []).append(index)
+
+    parent = {}
+    for level, indices in levels.items():
+        below = levels.get(level - 1, [])
+        for index in indices:
+            _, count, x, _, width, _ = frames[index]
+            # x and width are rounded to 0.1 px, so neighbours can touch: take the
+            # latest-starting frame below that spans this one and has the samples for it
+            spans = [p for p in below if frames[p][1] >= count and frames[p][2] - 0.05 <= x and
+                     x + width <= frames[p][2] + frames[p][4] + 0.05]
+            parent[index] = max(spans, key=lambda p: frames[p][2]) if spans else None
+    children_samples = {}
+    for index, p in parent.items():
+        if p is not None:
+            children_samples[p] = children_samples.get(p, 0) + frames[index][1]
+
+    for index, (name, count, *_) in enumerate(frames):
+        own = count - children_samples.get(index, 0)
+        if own <= 0 or index == root_index:
+            continue
+        stack, node = [], index
+        while node is not None and node != root_index:
+            stack.append(frames[node][0])
+            node = parent.get(node)
+        yield stack[::-1], own
+
+def read_pprof_flat(f):
+    for line in f:
+        match = PPROF_ROW.match(line)
+        if match and int(match.group(1)):
+            yield [match.group(6)], int(match.group(1))
+
+def detect_format(filepath):
+    with open_profile(filepath) as f:
+        head = f.read(4096)
+    if '<svg' in head:
+        return 'svg'
+    if PPROF_TOTAL.search(head) or 'flat%' in head:
+        return 'pprof'
+    first = next((line for line in head.splitlines() if line.strip()), '')
+    return 'folded' if FOLDED_LINE.match(first) else 'perf'
+
+READERS = {
+    'folded': read_folded,
+    'perf': read_perf_script,
+    'svg': read_flamegraph_svg,
+    'pprof': read_pprof_flat,
+}
+
+def load_profile(filepath, trie, profile, full_names=False):
+    """Streams one profile into a trie column; returns (format, samples)."""
+    fmt = detect_format(filepath)
+    names = {}
+    samples = 0
+    with open_profile(filepath) as f:
+        for stack, count in READERS[fmt](f):
+            frames = []
+            for raw in stack:
+                name = names.get(raw)
+                if name is None:
+                    name = names[raw] = frame_name(raw, full_names)
+                frames.append(name)
+            trie.add(frames, count, profile)
+            samples += count
+    return fmt, samples
+
+def symbol_samples(trie, own, inclusive):
+    """(self, total) sample arrays shaped (frames, profiles); a recursive symbol counts once per stack."""
+    n_frames, n_profiles = len(trie.names), own.shape[1]
+    self_samples = np.zeros((n_frames, n_profiles))
+    total_samples = np.zeros((n_frames, n_profiles))
+    np.add.at(self_samples, trie.frame, own)
+
+    children = trie.child_lists()
+    active = [0] * n_frames
+    todo = [(child, True) for child in children[0]]
+    while todo:
+        node, entering = todo.pop()
+        frame = trie.frame[node]
+        if not entering:
+            active[frame] -= 1
+            continue
+        if not active[frame]:
+            total_samples[frame] += inclusive[node]
+        active[frame] += 1
+        todo.append((node, False))
+        todo.extend((child, True) for child in children[node])
+    return self_samples, total_samples
+
+def symbol_diff(trie, own, inclusive):
+    """Per-symbol self/total shares of each profile, largest self-share change first."""
+    totals = inclusive[0].copy()
+    totals[totals == 0] = 1
+    self_samples, total_samples = symbol_samples(trie, own, inclusive)
+    rows = []
+    for frame in range(1, len(trie.names)):
+        if not total_samples[frame].any():
+            continue
+        self_share = self_samples[frame] / totals
+        total_share = total_samples[frame] / totals
+        rows.append({
+            'name': trie.names[frame],
+            'self': self_share,
+            'total': total_share,
+            'self_samples': self_samples[frame],
+            'delta_self': self_share[AFTER] - self_share[BEFORE],
+            'delta_total': total_share[AFTER] - total_share[BEFORE],
+        })
+    rows.sort(key=lambda r: -abs(r['delta_self']))
+    return rows
+
+def category_diff(rows):
+    """[(category, before share, after share)] of self samples, largest change first."""
+    shares = []
+    for profile in (BEFORE, AFTER):
+        weighted = [{'name': r['name'], 'samples': r['self_samples'][profile]} for r in rows]
+        shares.append({c: share for c, share, _ in category_breakdown(weighted, CPU_CATEGORIES, 'samples')})
+    categories = set(shares[BEFORE]) | set(shares[AFTER])
+    diff = [(c, shares[BEFORE].get(c, 0.0), shares[AFTER].get(c, 0.0)) for c in categories]
+    return sorted(diff, key=lambda d: -abs(d[2] - d[1]))
+
+def diff_color(delta, scale):
+    """White for no change, towards red where the frame's self share grew and blue where it shrank."""
+    level = int(255 * (1 - min(abs(delta) / scale, 1))) if scale else 255
+    return f"rgb(255,{level},{level})" if delta > 0 else f"rgb({level},{level},255)"
+
+def layout_frames(trie, inclusive, size_by, min_width):
+    """[(node, depth, x, width)] for frames at least min_width px wide, children sorted by name."""
+    scale = (SVG_WIDTH - 2 * PAD) / (inclusive[0, size_by] or 1)
+    children = trie.child_lists()
+    frames = []
+    todo = [(0, 0, PAD)]
+    while todo:
+        node, depth, x = todo.pop()
+        width = inclusive[node, size_by] * scale
+        if width < min_width:
+            continue
+        frames.append((node, depth, x, width))
+        child_x = x
+        for child in sorted(children[node], key=lambda c: trie.names[trie.frame[c]]):
+            todo.append((child, depth + 1, child_x))
+            child_x += inclusive[child, size_by] * scale
+    return frames
+
+def render_diff_svg(trie, own, inclusive, output, labels, size_by=AFTER, min_width=MIN_WIDTH_PX):
+    """Writes the differential flamegraph; returns the number of frames drawn."""
+    totals = inclusive[0].copy()
+    totals[totals == 0] = 1
+    self_share, total_share = own / totals, inclusive / totals
+    delta = self_share[:, AFTER] - self_share[:, BEFORE]
+
+    frames = layout_frames(trie, inclusive, size_by, min_width)
+    scale = max((abs(delta[node]) for node, *_ in frames), default=0.0)
+    max_depth = max((depth for _, depth, _, _ in frames), default=0)
+    height = (max_depth + 1) * FRAME_HEIGHT + 3 * PAD + 2 * FONT_SIZE
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        f.write(f'<?xml version="1.0" standalone="no"?>\n'
+                f'<svg version="1.1" width="{SVG_WIDTH}" height="{height}" viewBox="0 0 {SVG_WIDTH} {height}" '
+                f'xmlns="http://www.w3.org/2000/svg">\n'
+                f'<style>text {{ font-family:Verdana; font-size:{FONT_SIZE}px; fill:rgb(0,0,0); }}</style>\n'
+                f'<rect x="0" y="0" width="{SVG_WIDTH}" height="{height}" fill="rgb(248,248,248)" />\n'
+                f'<text x="{SVG_WIDTH / 2}" y="{PAD + FONT_SIZE}" text-anchor="middle">'
+                f'{html.escape(labels[BEFORE])} → {html.escape(labels[AFTER])} '
+                f'(width: {html.escape(labels[size_by])}, red: self share grew, blue: shrank)</text>\n')
+        for node, depth, x, width in frames:
+            y = height - PAD - (depth + 1) * FRAME_HEIGHT
+            name = trie.names[trie.frame[node]]
+            title = (f"{name} (before {total_share[node, BEFORE] * 100:.2f}%, after {total_share[node, AFTER] * 100:.2f}%, "
+                     f"self {delta[node] * 100:+.2f} pp)")
+            chars = int((width - 6) / CHAR_WIDTH)
+            text = name if len(name) <= chars else (name[:chars - 2] + '..' if chars > 2 else '')
+            f.write(f'<g><title>{html.escape(title)}</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{FRAME_HEIGHT - 1}" '
+                    f'fill="{diff_color(delta[node], scale)}" rx="2" ry="2" />'
+                    f'<text x="{x + 3:.1f}" y="{y + FONT_SIZE}">{html.escape(text)}</text></g>\n')
+        f.write('</svg>\n')
+    return len(frames)
+
+def print_symbol_diff(rows, top, labels, indent=""):
+    print(f"\n{indent}Top {top} symbols by self-share change ({labels[BEFORE]} → {labels[AFTER]}):")
+    print(f"{indent}| Symbol                                             | Self before | Self after | Δ self   | Total before | Total after | Δ total  |")
+    print(f"{indent}|----------------------------------------------------|-------------|------------|----------|--------------|-------------|----------|")
+    for r in rows[:top]:
+        print(f"{indent}| {r['name'][:50]:50s} | {r['self'][BEFORE]*100:10.2f}% | {r['self'][AFTER]*100:9.2f}% | "
+              f"{r['delta_self']*100:+6.2f}pp | {r['total'][BEFORE]*100:11.2f}% | {r['total'][AFTER]*100:10.2f}% | "
+              f"{r['delta_total']*100:+6.2f}pp |")
+
+def print_category_diff(diff, indent=""):
+    print(f"\n{indent}Self samples by op:")
+    for category, before, after in diff:
+        print(f"{indent}  {category:28s} {before*100:5.1f}% → {after*100:5.1f}%  ({(after - before)*100:+5.1f} pp)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two CPU profiles: ranked symbol shares and a differential flamegraph")
+    parser.add_argument('before', type=Path, help="baseline profile (folded, perf script, flamegraph SVG or pprof text)")
+    parser.add_argument('after', type=Path, help="profile to compare against the baseline")
+    parser.add_argument('--output', type=Path,
+                        help="differential flamegraph SVG (default: profiling_data/flamegraphs/<before>_vs_<after>.svg)")
+    parser.add_argument('--top', type=int, default=20, help="symbols to list")
+    parser.add_argument('--max-depth', type=int, help="keep at most this many frames per stack (root side)")
+    parser.add_argument('--size-by', choices=['before', 'after'], default='after',
+                        help="profile that sets frame widths (%(default)s)")
+    parser.add_argument('--min-width', type=float, default=MIN_WIDTH_PX, help="narrowest frame drawn, in px")
+    parser.add_argument('--full-names', action='store_true', help="keep C++ argument lists in symbol names")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    labels = [args.before.name, args.after.name]
+    output = args.output or PROFILING_DIR / "flamegraphs" / f"{args.before.stem}_vs_{args.after.stem}.svg"
+
+    print("="*70)
+    print("PROFILE DIFF")
+    print("="*70)
+    trie = StackTrie(max_depth=args.max_depth)
+    for profile, path in ((BEFORE, args.before), (AFTER, args.after)):
+        fmt, samples = load_profile(path, trie, profile, args.full_names)
+        print(f"{'Before' if profile == BEFORE else 'After':6s}: {path} ({fmt}, {samples:,} samples)")
+        if not samples:
+            print(f"\n❌ No samples in {path}")
+            return 1
+    print(f"Trie: {len(trie):,} stack nodes, {len(trie.names) - 1:,} symbols")
+
+    own, inclusive = trie.counts()
+    rows = symbol_diff(trie, own, inclusive)
+    print_symbol_diff(rows, args.top, labels)
+    print_category_diff(category_diff(rows))
+    if rows:
+        top = rows[0]
+        print(f"\n💡 Largest shift: {top['name']} {top['self'][BEFORE]*100:.1f}% → {top['self'][AFTER]*100:.1f}% "
+              f"of self samples ({top['delta_self']*100:+.1f} pp)")
+
+    drawn = render_diff_svg(trie, own, inclusive, output, labels,
+                            BEFORE if args.size_by == 'before' else AFTER, args.min_width)
+    print(f"\n✅ Differential flamegraph ({drawn:,} frames): {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Fleet efficiency: which node type to run a workload on
+
+Every pp512/tg128 repetition in the results store (the full history) is
+grouped by model, node type (hardware + node family, e.g. A30 on orcaga*),
+config and GPUs used, and normalized per GPU, per watt, per GB of VRAM and
+per node-hour. Power is the telemetry's measured GPU board power when the
+job sampled it, else TDP x GPUs used; CPU-only runs and partial offloads
+count the CPU socket TDP as well. A node-hour holds as many replicas as the
+node has GPUs for the config (one for CPU-only), assuming replicas do not
+slow each other down - the MULTI-INSTANCE section measures that.
+
+Node types are then ranked per workload mix by requests per node-hour, with
+requests per kWh alongside: a request takes prompt/pp t/s + generated/tg t/s
+seconds on one replica.
+"""
+
+import argparse
+import math
+import re
+from pathlib import Path
+
+import numpy as np
+
+from perf_model import MODELS, hardware_spec, identify_model, model_identity
+from results_store import STORE_FILENAME, load_store
+
+BENCHMARK_DIR = Path.home() / "perf-analysis-modeling-project/measurements/aaron"
+
+PP_TEST, TG_TEST = 'pp512', 'tg128'
+
+# Workload mix -> (prompt tokens, generated tokens) per request
+MIXES = {
+    'pp-heavy': (2000, 200),    # RAG / summarization: long prompt, short answer
+    'tg-heavy': (200, 1000),    # chat / code: short prompt, long answer
+}
+
+def node_family(node):
+    """'orcaga22' -> 'orcaga*'."""
+    return re.sub(r'\d+$', '*', node or 'Unknown')
+
+def cpu_name(cpu_model):
+    """'AMD EPYC 9534 64-Core Processor' -> 'EPYC 9534'."""
+    match = re.search(r'(EPYC|Xeon)\s+(?:\w+\s+)?\d{3,5}\w*', cpu_model or '')
+    return match.group(0) if match else (cpu_model or 'CPU')
+
+def node_type(node, gpu_type, cpu_model, is_cpu):
+    if is_cpu:
+        return f"{cpu_name(cpu_model)} CPU-only ({node_family(node)})"
+    return f"{(gpu_type or 'GPU').replace('NVIDIA ', '')} ({node_family(node)})"
+
+def node_gpu_counts(records):
+    """Per row: the most GPUs any report from its node listed (single-GPU jobs report 1)."""
+    nodes, inverse = np.unique(records['node'], return_inverse=True)
+    inverse = inverse.ravel()
+    most = np.zeros(len(nodes), dtype=np.int64)
+    np.maximum.at(most, inverse, records['gpu_count'].astype(np.int64))
+    return most[inverse]
+
+def fleet_rows(records):
+    """One row per (model, node type, config, GPUs used) with mean pp/tg t/s, power and replicas."""
+    if 'power_w' not in records.dtype.names:
+        return []
+    records = records[np.isin(records['test'], [PP_TEST, TG_TEST]) & (records['concurrency'] <= 1)]
+    if not len(records):
+        return []
+
+    # Node types from the few distinct (node, gpu, cpu, CPU-only) combinations, then broadcast to rows
+    hosts, host_idx = np.unique(records[['node', 'gpu_type', 'cpu_model', 'is_cpu']], return_inverse=True)
+    types = np.array([node_type(str(h['node']), str(h['gpu_type']), str(h['cpu_model']), bool(h['is_cpu']))
+                      for h in hosts])
+    row_types = types[host_idx.ravel()]
+
+    # Reports name one GGUF several ways; group on the normalized identity
+    models, model_idx = np.unique(records['model'], return_inverse=True)
+    row_models = np.array([model_identity(str(m)) for m in models])[model_idx.ravel()]
+
+    keys = np.rec.fromarrays([row_models, row_types, records['config'], records['n_gpus']],
+                             names='model,type,config,n_gpus')
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    n_groups = len(first)
+
+    node_gpus = node_gpu_counts(records)
+    n_gpus = records['n_gpus'].astype(np.int64)
+    replicas = np.where(records['is_cpu'], 1, np.maximum(node_gpus // np.maximum(n_gpus, 1), 1))
+    group_replicas = np.full(n_groups, np.iinfo(np.int64).max)
+    np.minimum.at(group_replicas, inverse, replicas)
+
+    def group_mean(values, mask):
+        sums = np.bincount(inverse[mask], weights=values[mask], minlength=n_groups)
+        counts = np.bincount(inverse[mask], minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    tps = records['tps']
+    power = records['power_w'].astype(np.float64)
+    is_pp, is_tg = records['test'] == PP_TEST, records['test'] == TG_TEST
+    pp, tg = group_mean(tps, is_pp), group_mean(tps, is_tg)
+    pp_power = group_mean(power, is_pp & np.isfinite(power))
+    tg_power = group_mean(power, is_tg & np.isfinite(power))
+
+    rows = []
+    for group in np.argsort(first, kind='stable'):
+        row = records[first[group]]
+        rows.append(fleet_row(row, keys[first[group]]['type'], int(group_replicas[group]),
+                              pp[group], tg[group], pp_power[group], tg_power[group]))
+    return rows
+
+def fleet_row(row, type_name, replicas, pp, tg, pp_power, tg_power):
+    is_cpu, n_gpus = bool(row['is_cpu']), int(row['n_gpus'])
+    gpu = None if is_cpu else hardware_spec(str(row['gpu_type']))
+    cpu = hardware_spec(str(row['cpu_model']))
+    model, _ = identify_model(str(row['model']))
+    # The CPU only draws full power when it runs layers; for unknown models only -ngl 99 counts as all of them
+    n_layers = MODELS[model]['n_layers'] if model else 99
+    if is_cpu or int(row['n_gpu_layers']) < n_layers:
+        cpu_watts = cpu['tdp'] if cpu else math.nan
+    else:
+        cpu_watts = 0
+    tdp = (gpu['tdp'] * n_gpus if gpu else math.nan) if not is_cpu else 0
+    return {
+        'model': model_identity(str(row['model'])),
+        'type': str(type_name),
+        'config': str(row['config']),
+        'is_cpu': is_cpu,
+        'n_gpus': n_gpus,
+        'replicas': replicas,
+        'vram_gb': gpu['memory_gb'] * n_gpus if gpu else math.nan,
+        'pp': float(pp),
+        'tg': float(tg),
+        'pp_watts': cpu_watts + (tdp if math.isnan(pp_power) else float(pp_power)),
+        'tg_watts': cpu_watts + (tdp if math.isnan(tg_power) else float(tg_power)),
+        'measured': not (math.isnan(pp_power) and math.isnan(tg_power)),
+    }
+
+def normalize(row):
+    """Adds per-GPU, per-watt (tokens/J), per-GB-VRAM and per-node-hour rates for pp and tg."""
+    for test in ('pp', 'tg'):
+        tps = row[test]
+        row[f'{test}_per_gpu'] = tps / row['n_gpus'] if row['n_gpus'] else math.nan
+        row[f'{test}_per_watt'] = tps / row[f'{test}_watts'] if row[f'{test}_watts'] else math.nan
+        row[f'{test}_per_gb'] = tps / row['vram_gb']
+        row[f'{test}_node_hour'] = tps * row['replicas'] * 3600
+    return row
+
+def mix_cost(row, prompt, generated):
+    """(requests per node-hour, requests per kWh, seconds per request) on one node of this type."""
+    if not (row['pp'] > 0 and row['tg'] > 0):
+        return None
+    pp_time, tg_time = prompt / row['pp'], generated / row['tg']
+    seconds = pp_time + tg_time
+    joules = pp_time * row['pp_watts'] + tg_time * row['tg_watts']
+    per_kwh = 3.6e6 / joules if joules > 0 else math.nan
+    return row['replicas'] * 3600 / seconds, per_kwh, seconds
+
+def rank_node_types(rows, prompt, generated):
+    """Best config per node type by requests per node-hour, best node type first."""
+    best = {}
+    for row in rows:
+        cost = mix_cost(row, prompt, generated)
+        if cost and (row['type'] not in best or cost[0] > best[row['type']][1][0]):
+            best[row['type']] = (row, cost)
+    return sorted(best.values(), key=lambda item: -item[1][0])
+
+def model_groups(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row['model'], []).append(normalize(row))
+    return groups
+
+def _fmt(value, width, precision=2):
+    return f"{value:{width}.{precision}f}" if not math.isnan(value) else f"{'n/a':>{width}s}"
+
+def print_fleet_efficiency(records, mixes=MIXES, indent="   "):
+    groups = model_groups(fleet_rows(records))
+    for model, rows in groups.items():
+        rows.sort(key=lambda r: (r['type'], r['n_gpus'], r['config']))
+        # Sweep config names differ only at the end, so the column fits the longest one
+        width = max([19] + [len(r['config']) for r in rows])
+        print(f"\n{indent}{model}:")
+        print(f"{indent}| Node type                    | {'Config':{width}s} | GPUs | Per node | pp t/s/GPU | tg t/s/GPU | "
+              f"pp tok/J | tg tok/J | tg t/s/GB | pp Mtok/node-h | tg Mtok/node-h | Power |")
+        print(f"{indent}|------------------------------|{'-' * (width + 2)}|------|----------|------------|------------|"
+              f"----------|----------|-----------|----------------|----------------|-------|")
+        for r in rows:
+            print(f"{indent}| {r['type']:28s} | {r['config']:{width}s} | {r['n_gpus']:4d} | {r['replicas']:8d} | "
+                  f"{_fmt(r['pp_per_gpu'], 10)} | {_fmt(r['tg_per_gpu'], 10)} | {_fmt(r['pp_per_watt'], 8)} | "
+                  f"{_fmt(r['tg_per_watt'], 8)} | {_fmt(r['tg_per_gb'], 9)} | {_fmt(r['pp_node_hour'] / 1e6, 14)} | "
+                  f"{_fmt(r['tg_node_hour'] / 1e6, 14)} | {'meas.' if r['measured'] else 'TDP':5s} |")
+
+        for mix, (prompt, generated) in mixes.items():
+            ranked = rank_node_types(rows, prompt, generated)
+            if not ranked:
+                continue
+            print(f"\n{indent}{mix} ({prompt} prompt + {generated} generated tokens per request):")
+            print(f"{indent}| Rank | Node type                    | {'Best config':{width}s} | GPUs | req/node-hour | req/kWh | s/request |")
+            print(f"{indent}|------|------------------------------|{'-' * (width + 2)}|------|---------------|---------|-----------|")
+            for rank, (r, (per_hour, per_kwh, seconds)) in enumerate(ranked, 1):
+                print(f"{indent}| {rank:4d} | {r['type']:28s} | {r['config']:{width}s} | {r['n_gpus']:4d} | "
+                      f"{per_hour:13.0f} | {_fmt(per_kwh, 7, 0)} | {seconds:9.2f} |")
+            if len(ranked) > 1:
+                (top, top_cost), (second, second_cost) = ranked[0], ranked[1]
+                print(f"{indent}💡 {mix}: {top['type']} serves {top_cost[0] / second_cost[0]:.2f}x the requests per "
+                      f"node-hour of {second['type']}")
+                efficient = max(ranked, key=lambda item: item[1][1] if not math.isnan(item[1][1]) else -1)
+                if efficient[0]['type'] != top['type']:
+                    print(f"{indent}   most requests per kWh: {efficient[0]['type']} ({efficient[1][1]:.0f})")
+    return groups
+
+def parse_mix(text):
+    """'chat=300:800' -> ('chat', (300, 800))."""
+    name, _, tokens = text.partition('=')
+    prompt, _, generated = tokens.partition(':')
+    try:
+        return name, (int(prompt), int(generated))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected name=PROMPT:GENERATED, got {text!r}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Rank node types by throughput per GPU, watt, GB of VRAM and node-hour")
+    parser.add_argument('--dir', type=Path, default=BENCHMARK_DIR,
+                        help=f"directory holding {STORE_FILENAME} (written by analyze_results.py)")
+    parser.add_argument('--mix', type=parse_mix, action='append',
+                        help="workload mix name=PROMPT:GENERATED tokens per request (repeatable; "
+                             "default: " + ", ".join(f"{k}={p}:{g}" for k, (p, g) in MIXES.items()) + ")")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    store_file = args.dir / STORE_FILENAME
+    if not store_file.exists():
+        print(f"❌ No results store at {store_file} - run analyze_results.py first")
+        return
+    print("="*70)
+    print("FLEET EFFICIENCY")
+    print("="*70)
+    if not print_fleet_efficiency(load_store(store_file), dict(args.mix) if args.mix else MIXES):
+        print("\n⚠️  No pp512/tg128 results with GPU/power fields in the store (re-run analyze_results.py)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Multi-instance throughput analysis for multi_instance.py runs
+
+Every layout (1x4gpu, 4x1gpu, 4xnuma, ...) is reduced to per-instance and
+aggregate tokens/sec at its full replica count. The layout's solo run gives
+the interference slowdown, 1 - concurrent/solo per instance. The best
+layout per test is the one with the highest aggregate, which answers
+"one 4-GPU server or four 1-GPU replicas?" for a node.
+"""
+
+from llama_bench_ingest import test_label
+
+TESTS = ['pp512', 'tg128']
+
+def instance_rows(results_list, tests=TESTS):
+    """One row per (node, layout, test) from runs tagged with a layout."""
+    groups = {}
+    for result in results_list:
+        for config in result['configurations']:
+            for run in config.get('runs') or []:
+                if not run.get('layout') or test_label(run) not in tests:
+                    continue
+                key = (result['node'] or run.get('node') or 'Unknown', run['layout'], test_label(run))
+                by_instance = groups.setdefault(key, {}).setdefault(run.get('concurrency') or 1, {})
+                by_instance.setdefault(run.get('instance', 0), []).append(run['avg_ts'])
+
+    rows = []
+    for (node, layout, test), passes in groups.items():
+        concurrency = max(passes)
+        means = [sum(v) / len(v) for v in passes[concurrency].values()]
+        per_instance = sum(means) / len(means)
+        solo = passes.get(1)
+        solo_tps = sum(sum(v) / len(v) for v in solo.values()) / len(solo) if solo else None
+        rows.append({
+            'node': node,
+            'layout': layout,
+            'test': test,
+            'instances': concurrency,
+            'per_instance': per_instance,
+            'aggregate': sum(means),
+            'solo': solo_tps,
+            'interference': 1 - per_instance / solo_tps if solo_tps and concurrency > 1 else None,
+        })
+    return rows
+
+def best_layout(rows):
+    """(best row by aggregate t/s, [(other row, best/other ratio)])."""
+    if not rows:
+        return None, []
+    best = max(rows, key=lambda r: r['aggregate'])
+    others = [(r, best['aggregate'] / r['aggregate']) for r in rows
+              if r is not best and r['aggregate'] > 0]
+    return best, sorted(others, key=lambda item: item[1])
+
+def print_instance_scaling(results_list, tests=TESTS, indent="   "):
+    rows = instance_rows(results_list, tests)
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['node'], row['test']), []).append(row)
+
+    for (node, test), group in sorted(groups.items()):
+        print(f"\n{indent}{node} ({test}):")
+        print(f"{indent}| Layout     | Instances | Per-instance t/s | Aggregate t/s | Solo t/s  | Interference |")
+        print(f"{indent}|------------|-----------|------------------|---------------|-----------|--------------|")
+        for row in sorted(group, key=lambda r: (r['instances'], r['layout'])):
+            solo = f"{row['solo']:9.2f}" if row['solo'] else f"{'-':>9s}"
+            slowdown = f"{row['interference']*100:+11.1f}%" if row['interference'] is not None else f"{'-':>12s}"
+            print(f"{indent}| {row['layout']:10s} | {row['instances']:9d} | {row['per_instance']:16.2f} | "
+                  f"{row['aggregate']:13.2f} | {solo} | {slowdown} |")
+
+        best, others = best_layout(group)
+        print(f"{indent}💡 Best aggregate: {best['layout']} → {best['aggregate']:.2f} t/s")
+        for other, ratio in others:
+            print(f"{indent}   {ratio:.2f}× {other['layout']} ({other['aggregate']:.2f} t/s)")
+    return rows
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+KV-cache type x flash-attention x KV offload trade-offs
+
+Runs that differ only in -ctk/-ctv, -fa and -nkvo are compared at each test
+shape and KV depth. KV-cache size comes from the model's layers, KV heads
+and head_dim (perf_model.kv_cache_bytes) at the test's context length;
+-nkvo keeps the cache in host RAM, so its GPU footprint is zero. Variants
+that no other variant beats on both t/s and GPU KV memory form the Pareto
+front, and the free A30 memory after weights gives contexts per GPU.
+"""
+
+import math
+
+from llama_bench_ingest import parse_test_label, run_setup, test_label, test_shape
+from perf_model import MODELS, device_shares, hardware_spec, identify_model, kv_cache_bytes, weight_bytes
+
+RESERVED_BYTES = 1.5 * 2**30   # CUDA context + compute buffers kept free per GPU
+DEFAULT_GPU = 'A30'
+
+def kv_rows(results_list):
+    """One flat row per llama-bench run with the fields the trade-off needs."""
+    rows = []
+    for result in results_list:
+        for config in result['configurations']:
+            for run in config.get('runs') or []:
+                label = test_label(run)
+                rows.append({
+                    'node': result['node'] or 'Unknown',
+                    'gpu_type': result.get('gpu_type') or '',
+                    'model': run.get('model_type') or config.get('model') or result.get('model') or '',
+                    'base': run_setup(run, kv=False),
+                    'shape': test_shape(label),
+                    'test': label,
+                    'type_k': run.get('type_k') or 'f16',
+                    'type_v': run.get('type_v') or 'f16',
+                    'flash_attn': bool(run.get('flash_attn')),
+                    'no_kv_offload': bool(run.get('no_kv_offload')),
+                    'n_gpu_layers': run.get('n_gpu_layers', 0),
+                    'split': [w for w in run.get('tensor_split') or [] if w > 0],
+                    'tps': run['avg_ts'],
+                })
+    return rows
+
+def variant_name(v):
+    name = f"{v['type_k']}/{v['type_v']}"
+    if v['flash_attn']:
+        name += " fa"
+    if v['no_kv_offload']:
+        name += " nkvo"
+    return name
+
+def kv_footprint(row):
+    """(total KV bytes, GPU-resident KV bytes, contexts that fit per GPU or None) for one variant.
+
+    All None for a model or quantization perf_model does not know.
+    """
+    model, quant = identify_model(row['model'])
+    if model is None or quant is None:
+        return None, None, None
+    n_prompt, n_gen, depth = parse_test_label(row['test'])
+    kv_bytes = kv_cache_bytes(model, depth + n_prompt + n_gen, row['type_k'], row['type_v'])
+    if row['no_kv_offload'] or not row['n_gpu_layers']:
+        return kv_bytes, 0.0, None
+
+    _, gpu_shares = device_shares(row['n_gpu_layers'], row['split'] or [1], MODELS[model]['n_layers'])
+    gpu = hardware_spec(row['gpu_type']) or hardware_spec(DEFAULT_GPU)
+    worst = max(gpu_shares)
+    free = gpu['memory_gb'] * 1e9 - weight_bytes(model, quant) * worst - RESERVED_BYTES
+    contexts = max(0, math.floor(free / (kv_bytes * worst))) if kv_bytes else None
+    return kv_bytes, kv_bytes * sum(gpu_shares), contexts
+
+def pareto_front(variants):
+    """Variants not beaten on both t/s (higher) and GPU KV bytes (lower) by another."""
+    front = []
+    for v in variants:
+        dominated = any(o['tps'] >= v['tps'] and o['gpu_kv'] <= v['gpu_kv'] and
+                        (o['tps'] > v['tps'] or o['gpu_kv'] < v['gpu_kv']) for o in variants)
+        if not dominated:
+            front.append(v)
+    return sorted(front, key=lambda v: v['gpu_kv'])
+
+def tradeoff_groups(rows):
+    """{(node, model, base setup, test): [variant]} for tests run with more than one KV variant."""
+    groups = {}
+    for row in rows:
+        key = (row['node'], row['model'], row['base'], row['test'])
+        variant = (row['type_k'], row['type_v'], row['flash_attn'], row['no_kv_offload'])
+        groups.setdefault(key, {}).setdefault(variant, []).append(row)
+
+    tradeoffs = {}
+    for key, variants in groups.items():
+        if len(variants) < 2:
+            continue
+        entries = []
+        for runs in variants.values():
+            entry = dict(runs[0], tps=sum(r['tps'] for r in runs) / len(runs))
+            entry['kv'], entry['gpu_kv'], entry['contexts'] = kv_footprint(entry)
+            entries.append(entry)
+        front = pareto_front([e for e in entries if e['gpu_kv'] is not None])
+        for entry in entries:
+            entry['pareto'] = any(entry is f for f in front)
+        tradeoffs[key] = sorted(entries, key=lambda e: (e['gpu_kv'] is None, e['gpu_kv'] or 0, -e['tps']))
+    return tradeoffs
+
+def print_kv_tradeoff(results_list, indent="   "):
+    tradeoffs = tradeoff_groups(kv_rows(results_list))
+    for (node, model, base, test), entries in sorted(tradeoffs.items(), key=lambda item: (
+            item[0][:3], test_shape(item[0][3]), parse_test_label(item[0][3])[2])):
+        reference = next((e for e in entries if variant_name(e) == 'f16/f16'), None)
+        print(f"\n{indent}{node} | {model} | {base} | {test}:")
+        print(f"{indent}| KV cache          | KV GiB | GPU KV GiB | Contexts/GPU | t/s       | vs f16  | Pareto |")
+        print(f"{indent}|-------------------|--------|------------|--------------|-----------|---------|--------|")
+        for e in entries:
+            if e['kv'] is None:
+                kv, gpu_kv, contexts = f"{'n/a':>6s}", f"{'n/a':>10s}", f"{'n/a':>12s}"
+            else:
+                kv, gpu_kv = f"{e['kv'] / 2**30:6.2f}", f"{e['gpu_kv'] / 2**30:10.2f}"
+                contexts = f"{e['contexts']:12d}" if e['contexts'] is not None else f"{'host RAM' if e['no_kv_offload'] else '-':>12s}"
+            vs = f"{(e['tps'] / reference['tps'] - 1) * 100:+6.1f}%" if reference and reference['tps'] else f"{'-':>7s}"
+            print(f"{indent}| {variant_name(e):17s} | {kv} | {gpu_kv} | "
+                  f"{contexts} | {e['tps']:9.2f} | {vs} | {'★' if e['pareto'] else '':^6s} |")
+
+        fastest = max(entries, key=lambda e: e['tps'])
+        on_gpu = [e for e in entries if e['pareto'] and e['contexts']]
+        most = max(on_gpu, key=lambda e: (e['contexts'], e['tps'])) if on_gpu else None
+        print(f"{indent}💡 Fastest: {variant_name(fastest)} ({fastest['tps']:.2f} t/s)")
+        if most and most is not fastest:
+            print(f"{indent}   Most contexts on the front: {variant_name(most)} → {most['contexts']} per GPU "
+                  f"at {most['tps'] / fastest['tps'] * 100:.0f}% of the fastest t/s")
+    return tradeoffs
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for llama-bench machine-readable output (-o/-oe json, jsonl, csv)
+
+Records keep every field the analysis needs (test shape, offload and split
+settings, avg/stddev t/s and the raw per-repetition samples) for any model.
+"""
+
+import csv
+import json
+import re
+from pathlib import Path
+
+LLAMA_BENCH_SUFFIXES = ('.json', '.jsonl', '.csv')
+
+# llama-bench test names: pp512, tg128, pp512+tg128, any of them with " @ d4096"
+TEST_PATTERN = re.compile(r'^(?:pp(\d+)(?:\+tg(\d+))?|tg(\d+))(?: @ d(\d+))?$')
+
+# Units of the markdown table's size ("5.44 GiB") and params ("8.19 B", "596.05 M") columns
+MD_UNITS = {'GiB': 2**30, 'MiB': 2**20, 'KiB': 2**10, 'T': 1e12, 'B': 1e9, 'M': 1e6, 'K': 1e3}
+
+def _int(value):
+    return int(value) if value not in (None, '') else 0
+
+def _float(value):
+    return float(value) if value not in (None, '') else 0.0
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+def _list(value):
+    # JSON gives a list; CSV flattens it to "[1, 2, 3]" or "1 2 3"
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        return value.strip('[]').replace(',', ' ').split()
+    return value
+
+def _int_list(value):
+    return [int(float(v)) for v in _list(value)]
+
+def _float_list(value):
+    return [float(v) for v in _list(value)]
+
+def _split(value):
+    if isinstance(value, (list, tuple)):
+        return [float(v) for v in value]
+    return [float(v) for v in str(value or '0').replace(',', '/').split('/') if v]
+
+# field -> converter; anything else llama-bench emits is dropped
+RECORD_FIELDS = {
+    'test_section': str,
+    'node': str,
+    'model_type': str,
+    'model_filename': str,
+    'model_size': _int,
+    'model_n_params': _int,
+    'backends': str,
+    'cpu_info': str,
+    'gpu_info': str,
+    'n_threads': _int,
+    'cpu_mask': str,
+    'n_batch': _int,
+    'n_ubatch': _int,
+    'type_k': str,
+    'type_v': str,
+    'n_gpu_layers': _int,
+    'split_mode': str,
+    'main_gpu': _int,
+    'devices': str,
+    'no_kv_offload': _bool,
+    'flash_attn': _bool,
+    'tensor_split': _split,
+    'n_prompt': _int,
+    'n_gen': _int,
+    'n_depth': _int,
+    'avg_ts': _float,
+    'stddev_ts': _float,
+    'samples_ns': _int_list,
+    'samples_ts': _float_list,
+    'test_time': str,
+    'wall_start': _float,
+    'wall_end': _float,
+    'telemetry': str,
+    'placement': str,
+    'instance': _int,
+    'layout': str,
+    'concurrency': _int,
+}
+
+def sidecar_path(report_path):
+    # benchmark_qwen3*.sh write llama-bench -oe jsonl next to the markdown report
+    return Path(report_path).with_suffix('.jsonl')
+
+def normalize_record(raw):
+    return {field: convert(raw[field]) for field, convert in RECORD_FIELDS.items() if field in raw}
+
+def iter_raw_records(filepath):
+    filepath = Path(filepath)
+    with open(filepath, 'r', newline='') as f:
+        if filepath.suffix == '.json':
+            yield from json.load(f)
+        elif filepath.suffix == '.jsonl':
+            for line in f:
+                if line.startswith('{'):
+                    yield json.loads(line)
+        elif filepath.suffix == '.csv':
+            yield from csv.DictReader(f)
+        else:
+            raise ValueError(f"Unsupported llama-bench output: {filepath.name}")
+
+def load_llama_bench(filepath):
+    return [normalize_record(raw) for raw in iter_raw_records(filepath)]
+
+def parse_md_quantity(text):
+    """'5.44 GiB' -> bytes, '8.19 B' -> parameter count; 0 when unparseable."""
+    value, _, unit = (text or '').strip().partition(' ')
+    try:
+        return int(round(float(value) * MD_UNITS.get(unit.strip(), 1)))
+    except ValueError:
+        return 0
+
+def test_label(record):
+    n_prompt, n_gen = record.get('n_prompt', 0), record.get('n_gen', 0)
+    if n_prompt and n_gen:
+        label = f"pp{n_prompt}+tg{n_gen}"
+    elif n_gen:
+        label = f"tg{n_gen}"
+    else:
+        label = f"pp{n_prompt}"
+    if record.get('n_depth'):
+        label += f" @ d{record['n_depth']}"
+    return label
+
+def parse_test_label(label):
+    """'pp512+tg128 @ d4096' -> (512, 128, 4096); None for anything else."""
+    match = TEST_PATTERN.match(label.strip())
+    if not match:
+        return None
+    pp, pg_tg, tg, depth = (int(v) if v else 0 for v in match.groups())
+    return pp, pg_tg or tg, depth
+
+def test_shape(label):
+    """Test name without its depth: 'tg128 @ d4096' -> 'tg128'."""
+    return label.split(' @ ')[0]
+
+def run_setup(record, kv=True):
+    """Short description of a run's settings other than test shape, depth and batch sizes.
+
+    kv=False leaves out the KV-cache knobs (flash-attn, cache types, -nkvo).
+    """
+    parts = [f"ngl {record.get('n_gpu_layers', 0)}"]
+    split = record.get('tensor_split') or []
+    if any(split):
+        parts.append("ts " + "/".join(f"{v:g}" for v in split))
+    if kv:
+        parts.append(kv_label(record))
+    parts.append(f"t {record.get('n_threads', 0)}")
+    return " ".join(p for p in parts if p)
+
+def kv_label(record):
+    """'fa kv q8_0/q8_0 nkvo' for the KV-cache knobs that differ from llama-bench defaults."""
+    parts = ["fa"] if record.get('flash_attn') else []
+    types = (record.get('type_k') or 'f16', record.get('type_v') or 'f16')
+    if types != ('f16', 'f16'):
+        parts.append(f"kv {types[0]}/{types[1]}")
+    if record.get('no_kv_offload'):
+        parts.append("nkvo")
+    return " ".join(parts)
+
+def build_configuration(name, test_num, records, is_cpu):
+    samples, stddevs = {}, {}
+    for record in records:
+        samples.setdefault(test_label(record), []).append(record['avg_ts'])
+        stddevs.setdefault(test_label(record), []).append(record.get('stddev_ts', 0.0))
+
+    def mean(values):
+        return sum(values) / len(values) if values else 0
+
+    return {
+        'name': name,
+        'is_cpu_only': is_cpu,
+        'pp512': mean(samples.get('pp512', [])),
+        'tg128': mean(samples.get('tg128', [])),
+        'test_num': test_num,
+        'model': records[0].get('model_type') if records else None,
+        'model_size': records[0].get('model_size', 0) if records else 0,
+        'model_n_params': records[0].get('model_n_params', 0) if records else 0,
+        'samples': samples,
+        'stddevs': stddevs,
+        'runs': records,
+    }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Model matrix: one setup across several GGUF files (model sizes x quants)
+
+Model name, quant, weight size and parameter count come from the llama-bench
+output itself (model_type / model_size / model_n_params, or the markdown
+table's model, size and params columns). Throughput is normalized by model
+size: tg t/s x weight GB is the weight bytes streamed per second and pp t/s x
+B params the parameters applied per second (x2 = GFLOP/s). Both stay flat
+while the device is the bottleneck, so t/s for another quant or size is
+roughly that rate / its GB (tg) or B params (pp); where they drop, per-token
+overheads rather than model size set the speed.
+"""
+
+import re
+
+from llama_bench_ingest import run_setup
+from perf_model import MODELS, identify_model, parse_quant, weight_bytes
+
+SIZE_BOUND_SPREAD = 1.25   # max/min normalized rate below this: t/s scales with model size
+
+def model_name(model_type):
+    """'qwen3 4B Q4_K - Medium' -> 'qwen3 4B'; 'Qwen3-8B (Q5_K_M quantization)' -> 'Qwen3-8B'."""
+    match = re.match(r'^(.*?\d+(?:\.\d+)?\s*[BM])\b', model_type or '')
+    return match.group(1) if match else (model_type or 'Unknown')
+
+def model_rows(results_list):
+    """One row per (node, model, setup) with pp512/tg128 and the GGUF's size and parameter count."""
+    groups = {}
+    for result in results_list:
+        node = result['node'] or 'Unknown'
+        for config in result['configurations']:
+            if not (config.get('pp512') or config.get('tg128')):
+                continue
+            runs = config.get('runs') or []
+            model_type = config.get('model') or result.get('model') or ''
+            key = (node, model_type, run_setup(runs[0]) if runs else config['name'])
+            entry = groups.setdefault(key, {'size': config.get('model_size', 0),
+                                            'params': config.get('model_n_params', 0), 'pp': [], 'tg': []})
+            if config.get('pp512'):
+                entry['pp'].append(config['pp512'])
+            if config.get('tg128'):
+                entry['tg'].append(config['tg128'])
+    return [matrix_row(node, model_type, setup, e['size'], e['params'], e['pp'], e['tg'])
+            for (node, model_type, setup), e in groups.items()]
+
+def matrix_row(node, model_type, setup, size, params, pp, tg):
+    if not size or not params:
+        # Reports without size/params columns: fall back to the known architecture, if it is one
+        model, quant = identify_model(model_type)
+        if not size and model and quant:
+            size = weight_bytes(model, quant)
+        if not params and model:
+            params = MODELS[model]['params']
+    # 0 = unknown: the rates that need it print n/a and stay out of the size-scaling verdicts
+    return {
+        'node': node,
+        'model_type': model_type,
+        'name': model_name(model_type),
+        'quant': parse_quant(model_type) or '-',
+        'setup': setup,
+        'size_gb': (size or 0) / 1e9,
+        'params_b': (params or 0) / 1e9,
+        'pp': sum(pp) / len(pp) if pp else 0.0,
+        'tg': sum(tg) / len(tg) if tg else 0.0,
+    }
+
+def normalize(row):
+    """Adds B params applied per second in pp and weight GB streamed per second in tg."""
+    row['pp_bparams'] = row['pp'] * row['params_b']
+    row['tg_gbps'] = row['tg'] * row['size_gb']
+    return row
+
+def model_groups(rows):
+    """{(node, setup): rows largest model first} for setups run with more than one model."""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['node'], row['setup']), []).append(normalize(row))
+    return {key: sorted(group, key=lambda r: -r['size_gb'])
+            for key, group in groups.items() if len({r['model_type'] for r in group}) > 1}
+
+def print_size_scaling(rows, test, rate, unit, per, indent):
+    """One line on whether a test's size-normalized rate holds across the models."""
+    measured = [r for r in rows if r[test] and r[rate]]
+    if len(measured) < 2:
+        return
+    low, high = min(measured, key=lambda r: r[rate]), max(measured, key=lambda r: r[rate])
+    if high[rate] / low[rate] < SIZE_BOUND_SPREAD:
+        mean = sum(r[rate] for r in measured) / len(measured)
+        print(f"{indent}💡 {test}: {low[rate]:.0f}-{high[rate]:.0f} {unit} for every model → "
+              f"{test} t/s ≈ {mean:.0f} ÷ {per}")
+    else:
+        print(f"{indent}💡 {test}: {low['name']} {low['quant']} reaches {low[rate] / high[rate] * 100:.0f}% of "
+              f"{high['name']} {high['quant']}'s {unit} - per-token overheads, not model size, limit it")
+
+def print_model_matrix(results_list, indent="   "):
+    groups = model_groups(model_rows(results_list))
+    for (node, setup), rows in sorted(groups.items()):
+        print(f"\n{indent}{node} | {setup}:")
+        print(f"{indent}| Model        | Quant  | Weights GB | Params B | pp512 t/s | tg128 t/s | pp B-params/s | tg weight GB/s |")
+        print(f"{indent}|--------------|--------|------------|----------|-----------|-----------|---------------|----------------|")
+        for r in rows:
+            size = f"{r['size_gb']:10.2f}" if r['size_gb'] else f"{'n/a':>10s}"
+            params = f"{r['params_b']:8.2f}" if r['params_b'] else f"{'n/a':>8s}"
+            pp_rate = f"{r['pp_bparams']:13.1f}" if r['params_b'] else f"{'n/a':>13s}"
+            tg_rate = f"{r['tg_gbps']:14.1f}" if r['size_gb'] else f"{'n/a':>14s}"
+            print(f"{indent}| {r['name']:12s} | {r['quant']:6s} | {size} | {params} | "
+                  f"{r['pp']:9.2f} | {r['tg']:9.2f} | {pp_rate} | {tg_rate} |")
+        print_size_scaling(rows, 'tg', 'tg_gbps', "GB/s of weights", "weight GB", indent)
+        print_size_scaling(rows, 'pp', 'pp_bparams', "B params/s", "B params", indent)
+    return groups
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Roofline model for llama-bench prompt processing (pp) and text generation (tg)
+
+pp is modeled as compute-bound (2 * params FLOPs per token) and tg as
+bandwidth-bound (every weight byte read once per token). With layer split
+the devices run one after another, so per-token time is the sum over the
+CPU and each GPU of (share of layers x work / device peak).
+"""
+
+import re
+
+# Peak dense FP16 tensor FLOP/s (FP32 SIMD for CPUs), memory bandwidth (B/s),
+# board/socket power (W) and memory (GB). Matched by substring, first hit wins.
+HARDWARE = {
+    'H100 PCIe':     {'flops': 756e12, 'bandwidth': 2000e9, 'tdp': 350, 'memory_gb': 80},
+    'H100':          {'flops': 989e12, 'bandwidth': 3350e9, 'tdp': 700, 'memory_gb': 80},
+    'L40S':          {'flops': 362e12, 'bandwidth': 864e9, 'tdp': 350, 'memory_gb': 48},
+    'A30':           {'flops': 165e12, 'bandwidth': 933e9, 'tdp': 165, 'memory_gb': 24},
+    # 64 Zen 4 cores x 2.45 GHz x 32 FP32 FLOP/cycle, 12 x DDR5-4800
+    'EPYC 9534':     {'flops': 5.0e12, 'bandwidth': 460.8e9, 'tdp': 280, 'memory_gb': 0},
+}
+
+# Parameters, layers and attention shape (for KV-cache sizing)
+MODELS = {
+    'Qwen3-0.6B': {'params': 0.60e9, 'n_layers': 28, 'n_kv_heads': 8, 'head_dim': 128},
+    'Qwen3-4B':   {'params': 4.02e9, 'n_layers': 36, 'n_kv_heads': 8, 'head_dim': 128},
+    'Qwen3-8B':   {'params': 8.19e9, 'n_layers': 36, 'n_kv_heads': 8, 'head_dim': 128},
+}
+
+# Average bits per weight of common llama.cpp quantization mixes
+QUANT_BITS = {
+    'Q4_0': 4.50,
+    'Q4_K_S': 4.58,
+    'Q4_K_M': 4.85,
+    'Q5_K_S': 5.54,
+    'Q5_K_M': 5.69,
+    'Q6_K': 6.56,
+    'Q8_0': 8.50,
+    'F16': 16.0,
+}
+
+# Bits per element of llama.cpp KV-cache types (-ctk/-ctv), block scales included
+CACHE_TYPE_BITS = {
+    'f32': 32.0,
+    'f16': 16.0,
+    'bf16': 16.0,
+    'q8_0': 8.5,
+    'q5_1': 6.0,
+    'q5_0': 5.5,
+    'q4_1': 5.0,
+    'q4_0': 4.5,
+    'iq4_nl': 4.5,
+}
+
+# Offload settings of the fixed benchmark_qwen3*.sh tests, for reports without raw params
+CONFIG_OFFLOAD = {
+    'CPU-Only': (0, []),
+    'GPU Partial': (10, [1]),
+    'GPU Full': (99, [1]),
+    'Single GPU': (99, [1]),
+    'Dual GPU': (99, [1, 1]),
+    'Quad GPU': (99, [1, 1, 1, 1]),
+    'Quad GPU (Balanced)': (99, [1, 1, 1, 1]),
+    'Quad GPU (Custom)': (99, [5, 5, 3, 3]),
+}
+
+def hardware_spec(name):
+    for key, spec in HARDWARE.items():
+        if name and key in name:
+            return spec
+    return None
+
+def identify_model(text):
+    """Map a report header ("Qwen3-8B (Q5_K_M quantization)") or llama-bench
+    model_type ("qwen3 8B Q5_K - Medium") to (model key, quant key).
+
+    Either is None when not in MODELS / QUANT_BITS; callers report n/a rather
+    than model someone else's architecture.
+    """
+    text = text or ''
+    model = None
+    size = re.search(r'qwen3[\s-]*([\d.]+)\s*B', text, re.IGNORECASE)
+    if size and f"Qwen3-{size.group(1)}B" in MODELS:
+        model = f"Qwen3-{size.group(1)}B"
+    return model, parse_quant(text)
+
+def model_identity(text):
+    """'Qwen3-8B Q5_K_M' whether a report says "Qwen3-8B (Q5_K_M quantization)",
+    qwen3-8b-q5_k_m.gguf or llama-bench's "qwen3 8B Q5_K - Medium"; else the text itself."""
+    model, quant = identify_model(text)
+    if model is None:
+        return (text or '').strip() or 'Unknown'
+    return f"{model} {quant}" if quant else model
+
+def parse_quant(text):
+    """'qwen3 4B Q4_K - Medium' or 'qwen3-4b-q4_k_m.gguf' -> 'Q4_K_M'; None if not a known mix."""
+    q = re.search(r'(Q\d)_(K|0)(?:_([SML])|\s*-\s*(Small|Medium|Large))?', text or '', re.IGNORECASE)
+    if q:
+        suffix = q.group(3) or (q.group(4) or '')[:1]
+        key = f"{q.group(1)}_{q.group(2)}".upper() + (f"_{suffix.upper()}" if suffix else '')
+        return key if key in QUANT_BITS else None
+    if re.search(r'\bF16\b', text or '', re.IGNORECASE):
+        return 'F16'
+    return None
+
+def weight_bytes(model, quant):
+    return MODELS[model]['params'] * QUANT_BITS[quant] / 8
+
+def kv_cache_bytes(model, n_ctx, type_k='f16', type_v='f16'):
+    """K plus V cache for n_ctx tokens: layers x KV heads x head_dim per token for each."""
+    spec = MODELS[model]
+    elements = spec['n_layers'] * spec['n_kv_heads'] * spec['head_dim'] * n_ctx
+    return elements * (CACHE_TYPE_BITS.get(type_k, 16.0) + CACHE_TYPE_BITS.get(type_v, 16.0)) / 8
+
+def offload_settings(config):
+    """(n_gpu_layers, tensor split weights) for a parsed configuration."""
+    if config.get('is_cpu_only'):
+        return 0, []
+    runs = config.get('runs') or []
+    if runs:
+        split = [w for w in runs[0].get('tensor_split', []) if w > 0]
+        return runs[0].get('n_gpu_layers', 99), split or [1]
+    return CONFIG_OFFLOAD.get(config['name'], (99, [1]))
+
+def device_shares(n_gpu_layers, split, n_layers):
+    """Fraction of the layers held by the CPU and by each GPU."""
+    gpu_fraction = min(n_gpu_layers, n_layers) / n_layers if split else 0.0
+    total = sum(split) or 1
+    return 1.0 - gpu_fraction, [gpu_fraction * w / total for w in split]
+
+def predict_throughput(model, quant, gpu_type, cpu_type, n_gpu_layers, split):
+    """Roofline ceiling (pp t/s, tg t/s); None when hardware that runs layers is unknown."""
+    gpu = hardware_spec(gpu_type) if split else None
+    cpu = hardware_spec(cpu_type)
+    if split and gpu is None:
+        return None, None
+
+    cpu_share, gpu_shares = device_shares(n_gpu_layers, split, MODELS[model]['n_layers'])
+    if cpu_share and cpu is None:
+        return None, None
+    flops_per_token = 2 * MODELS[model]['params']
+    bytes_per_token = weight_bytes(model, quant)
+
+    pp_time = cpu_share * flops_per_token / cpu['flops'] if cpu_share else 0.0
+    tg_time = cpu_share * bytes_per_token / cpu['bandwidth'] if cpu_share else 0.0
+    for share in gpu_shares:
+        pp_time += share * flops_per_token / gpu['flops']
+        tg_time += share * bytes_per_token / gpu['bandwidth']
+    return 1 / pp_time, 1 / tg_time
+
+def roofline_fraction(result, config):
+    """Measured / predicted for (pp512, tg128) of one configuration."""
+    model, quant = identify_model(config.get('model') or result.get('model'))
+    if model is None or quant is None:
+        return None, None
+    n_gpu_layers, split = offload_settings(config)
+    if config.get('is_cpu_only'):
+        n_gpu_layers, split = 0, []
+    pp_roof, tg_roof = predict_throughput(model, quant, result.get('gpu_type'), result.get('cpu_model'),
+                                          n_gpu_layers, split)
+    if pp_roof is None:
+        return None, None
+    return config['pp512'] / pp_roof, config['tg128'] / tg_roof
+
+def arithmetic_intensity(model, quant, tokens_per_pass):
+    """FLOPs per weight byte when tokens_per_pass tokens share one read of the weights."""
+    return 2 * MODELS[model]['params'] * tokens_per_pass / weight_bytes(model, quant)
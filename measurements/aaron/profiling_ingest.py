@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Profiling-data ingest - nsys stats text, nsys SQLite exports and pprof text
+
+Every report becomes a table (list of row dicts) keyed by the report name,
+e.g. 'cuda_gpu_kern_sum' -> [{'time_pct', 'total_time_ns', 'instances',
+'avg_ns', 'med_ns', 'min_ns', 'max_ns', 'stddev_ns', 'name'}, ...] and
+'pprof' -> [{'flat', 'flat_pct', 'sum_pct', 'cum', 'cum_pct', 'name'}, ...].
+Rows are then bucketed into op categories (matmul, softmax, rms_norm, ...).
+"""
+
+import argparse
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROFILING_DIR = Path(__file__).resolve().parent.parent / "profiling_data"
+
+# First match wins; patterns are searched in the kernel / symbol name
+GPU_CATEGORIES = [
+    ('matmul (mmq)', r'mul_mat_q|mul_mat_vec_q|quantize_mmq'),
+    ('matmul (cuBLAS)', r'gemm|k_compute_batched_ptrs'),
+    ('softmax', r'soft_max'),
+    ('rms_norm', r'rms_norm'),
+    ('rope', r'rope'),
+    ('activation', r'unary_gated|silu|gelu'),
+    ('elementwise', r'bin_bcast|scale|add'),
+    ('copy / convert', r'cpy|convert|set_rows|get_rows|dup'),
+]
+CPU_CATEGORIES = [
+    ('sgemm (OpenBLAS)', r'^sgemm_'),
+    ('ggml_gemm / gemv (repacked)', r'ggml_gem[mv]_'),
+    ('tinyBLAS', r'tinyBLAS|llamafile_sgemm'),
+    ('vec_dot', r'ggml_vec_dot'),
+    ('do_spin / barriers', r'do_spin|barrier|futex|sched_yield'),
+    ('quantize / dequantize', r'quantize|dequantize|fp32_to_fp16|repack_'),
+    ('softmax', r'soft_max'),
+    ('rms_norm', r'rms_norm'),
+    ('rope', r'rope'),
+    ('memset / memcpy', r'memset|memmove|memcpy'),
+]
+OTHER = 'other'
+
+REPORT_HEADER = re.compile(r'^\s*\*\* (.+?) \((\w+)\):\s*$')
+PPROF_TOTAL = re.compile(r'^Total: \d+ samples', re.MULTILINE)
+PPROF_ROW = re.compile(r'^\s*(\d+)\s+([\d.]+)%\s+([\d.]+)%\s+(\d+)\s+([\d.]+)%\s+(.+?)\s*$')
+
+def column_key(header):
+    key = header.strip().lower().replace('(%)', 'pct').replace('(', '').replace(')', '')
+    return re.sub(r'\W+', '_', key).strip('_')
+
+def to_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+def column_spans(rule):
+    """Column (start, end) spans from the '--------  -----' rule under a header."""
+    spans = [m.span() for m in re.finditer(r'-+', rule)]
+    # The last column (Name / Operation) runs to the end of the line
+    spans[-1] = (spans[-1][0], None)
+    return spans
+
+def parse_nsys_stats(filepath):
+    """{report: rows} from `nsys stats` text output (one or many reports per file)."""
+    tables = {}
+    report, spans, keys = None, None, None
+    with open(filepath, errors='replace') as f:
+        lines = f.read().splitlines()
+    for i, line in enumerate(lines):
+        match = REPORT_HEADER.match(line)
+        if match:
+            report, spans = match.group(2), None
+            tables[report] = []
+        elif report is None:
+            continue
+        elif spans is None and line.strip() and set(line.strip()) <= {'-', ' '}:
+            spans = column_spans(line)
+            header = lines[i - 1]
+            keys = [column_key(header[start:end]) for start, end in spans]
+        elif spans is not None:
+            if not line.strip():
+                report = None
+                continue
+            cells = [line[start:end].strip() for start, end in spans]
+            tables[report].append({k: to_number(c) if k != 'name' else c for k, c in zip(keys, cells)})
+    return tables
+
+def parse_pprof(filepath):
+    """{'pprof': rows} from `pprof -text` / `google-pprof --text` output."""
+    rows = []
+    with open(filepath, errors='replace') as f:
+        for line in f:
+            match = PPROF_ROW.match(line)
+            if match:
+                rows.append({
+                    'flat': int(match.group(1)),
+                    'flat_pct': float(match.group(2)),
+                    'sum_pct': float(match.group(3)),
+                    'cum': int(match.group(4)),
+                    'cum_pct': float(match.group(5)),
+                    'name': match.group(6),
+                })
+    return {'pprof': rows}
+
+def export_sqlite(report_path):
+    """SQLite next to an .nsys-rep, exporting it with `nsys export` when needed."""
+    sqlite_path = report_path.with_suffix('.sqlite')
+    if sqlite_path.exists():
+        return sqlite_path
+    nsys = shutil.which('nsys')
+    if nsys is None:
+        raise FileNotFoundError(f"{sqlite_path.name} not found and nsys is not on PATH "
+                                f"(run: nsys export --type sqlite -o {sqlite_path} {report_path})")
+    subprocess.run([nsys, 'export', '--type', 'sqlite', '-o', str(sqlite_path), str(report_path)],
+                   check=True, capture_output=True)
+    return sqlite_path
+
+def summarize_durations(names, durations):
+    """cuda_gpu_kern_sum-shaped rows from parallel (name, duration ns) arrays."""
+    order = np.argsort(names, kind='stable')
+    names, durations = names[order], durations[order].astype(float)
+    unique, starts, counts = np.unique(names, return_index=True, return_counts=True)
+    grand_total = durations.sum() or 1.0
+    rows = []
+    for name, start, count in zip(unique, starts, counts):
+        d = durations[start:start + count]
+        rows.append({
+            'time_pct': round(float(100 * d.sum() / grand_total), 1),
+            'total_time_ns': int(d.sum()),
+            'instances': int(count),
+            'avg_ns': float(d.mean()),
+            'med_ns': float(np.median(d)),
+            'min_ns': int(d.min()),
+            'max_ns': int(d.max()),
+            'stddev_ns': float(d.std(ddof=1)) if count > 1 else 0.0,
+            'name': str(name),
+        })
+    rows.sort(key=lambda r: -r['total_time_ns'])
+    return rows
+
+def read_nsys_sqlite(filepath):
+    """Kernel and memcpy summaries straight from an nsys SQLite export.
+
+    One query per activity table pulls every (name, duration) pair; grouping
+    and percentiles happen in numpy rather than row by row in Python.
+    """
+    conn = sqlite3.connect(f"file:{filepath}?mode=ro", uri=True)
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    tables = {}
+    if 'CUPTI_ACTIVITY_KIND_KERNEL' in existing:
+        rows = conn.execute("""
+            SELECT s.value, k.end - k.start
+            FROM CUPTI_ACTIVITY_KIND_KERNEL AS k JOIN StringIds AS s ON s.id = k.demangledName
+        """).fetchall()
+        if rows:
+            names, durations = zip(*rows)
+            tables['cuda_gpu_kern_sum'] = summarize_durations(np.array(names), np.array(durations))
+    if 'CUPTI_ACTIVITY_KIND_MEMCPY' in existing:
+        rows = conn.execute("""
+            SELECT COALESCE(e.label, CAST(m.copyKind AS TEXT)), m.end - m.start
+            FROM CUPTI_ACTIVITY_KIND_MEMCPY AS m
+            LEFT JOIN ENUM_CUDA_MEMCPY_OPER AS e ON e.id = m.copyKind
+        """).fetchall() if 'ENUM_CUDA_MEMCPY_OPER' in existing else conn.execute(
+            "SELECT CAST(copyKind AS TEXT), end - start FROM CUPTI_ACTIVITY_KIND_MEMCPY").fetchall()
+        if rows:
+            names, durations = zip(*rows)
+            memops = summarize_durations(np.array(names), np.array(durations))
+            for row in memops:
+                row['count'] = row.pop('instances')
+                row['operation'] = f"[CUDA memcpy {row.pop('name')}]"
+            tables['cuda_gpu_mem_time_sum'] = memops
+    conn.close()
+    return tables
+
+def load_profile(filepath):
+    """Dispatch on file type: .nsys-rep/.sqlite, pprof text or nsys stats text."""
+    filepath = Path(filepath)
+    if filepath.suffix == '.nsys-rep':
+        return read_nsys_sqlite(export_sqlite(filepath))
+    if filepath.suffix in ('.sqlite', '.db'):
+        return read_nsys_sqlite(filepath)
+    with open(filepath, errors='replace') as f:
+        head = f.read(4096)
+    if PPROF_TOTAL.search(head) or 'flat%' in head:
+        return parse_pprof(filepath)
+    return parse_nsys_stats(filepath)
+
+def load_profiles(profile_dir):
+    """Merge every profile under profile_dir; text summaries win over re-derived SQLite tables."""
+    tables = {}
+    files = sorted(p for p in Path(profile_dir).rglob('*')
+                   if p.suffix in ('.txt', '.sqlite', '.nsys-rep') and p.is_file())
+    for filepath in files:
+        if filepath.suffix == '.nsys-rep' and 'cuda_gpu_kern_sum' in tables:
+            continue
+        try:
+            for name, rows in load_profile(filepath).items():
+                if rows and name not in tables:
+                    tables[name] = rows
+        except (OSError, sqlite3.Error, subprocess.CalledProcessError) as e:
+            print(f"  ⚠ {filepath.name}: {e}")
+    return tables
+
+def categorize(name, categories):
+    for category, pattern in categories:
+        if re.search(pattern, name):
+            return category
+    return OTHER
+
+def category_breakdown(rows, categories, weight):
+    """[(category, share of total weight, weight)] sorted by weight."""
+    totals = {}
+    for row in rows:
+        category = categorize(row['name'], categories)
+        totals[category] = totals.get(category, 0) + row[weight]
+    grand_total = sum(totals.values()) or 1
+    return sorted(((c, w / grand_total, w) for c, w in totals.items()), key=lambda x: -x[2])
+
+def gpu_breakdown(tables):
+    return category_breakdown(tables.get('cuda_gpu_kern_sum', []), GPU_CATEGORIES, 'total_time_ns')
+
+def cpu_breakdown(tables):
+    # Flat samples only: cum counts would attribute callee time to every caller
+    return category_breakdown(tables.get('pprof', []), CPU_CATEGORIES, 'flat')
+
+def print_breakdown(title, breakdown, unit, ms_per_token=None, indent=""):
+    print(f"\n{indent}{title}:")
+    for category, share, weight in breakdown:
+        line = f"{indent}  {category:28s} {share*100:5.1f}%  {weight:>14,} {unit}"
+        if ms_per_token:
+            line += f"  ≈ {share * ms_per_token:7.3f} ms/token"
+        print(line)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize nsys / pprof profiles by kernel and op category")
+    parser.add_argument('paths', nargs='*', type=Path, default=[PROFILING_DIR],
+                        help="profile files or directories (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=10, help="hottest kernels / symbols to list")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    tables = {}
+    for path in args.paths:
+        loaded = load_profiles(path) if path.is_dir() else load_profile(path)
+        for name, rows in loaded.items():
+            tables.setdefault(name, rows)
+
+    print("="*70)
+    print("PROFILE SUMMARY")
+    print("="*70)
+    kernels = tables.get('cuda_gpu_kern_sum', [])
+    if kernels:
+        print(f"\nTop {args.top} GPU kernels:")
+        print("| Time (%) | Instances | Avg (us) | Kernel                                             |")
+        print("|----------|-----------|----------|----------------------------------------------------|")
+        for row in kernels[:args.top]:
+            print(f"| {row['time_pct']:8.1f} | {row['instances']:9d} | {row['avg_ns']/1000:8.1f} | {row['name'][:50]:50s} |")
+        print_breakdown("GPU kernel time by op", gpu_breakdown(tables), 'ns')
+    symbols = tables.get('pprof', [])
+    if symbols:
+        print(f"\nTop {args.top} CPU symbols (flat samples):")
+        print("| Flat %  | Cum %   | Symbol                                             |")
+        print("|---------|---------|----------------------------------------------------|")
+        for row in sorted(symbols, key=lambda r: -r['flat'])[:args.top]:
+            print(f"| {row['flat_pct']:6.1f}% | {row['cum_pct']:6.1f}% | {row['name'][:50]:50s} |")
+        print_breakdown("CPU samples by op", cpu_breakdown(tables), 'samples')
+    if not kernels and not symbols:
+        print("\n❌ No kernel or pprof tables found")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Table-driven parser for the benchmark_qwen3*.sh markdown reports
+
+A single pass over the report matches each line against LINE_RULES: report
+metadata fills the results header, "## Test N:" opens a section, and every
+llama-bench table row becomes a run record shaped like the JSON/JSONL ones
+(llama_bench_ingest.RECORD_FIELDS). The **Command:** line the scripts write
+under each section is kept raw and as parsed flags; single-valued flags fill
+in settings the table leaves out (llama-bench only prints columns that
+differ from its defaults). Section titles map to config names through
+SECTION_RULES, and any other title is used as-is.
+"""
+
+import re
+import shlex
+from pathlib import Path
+
+from llama_bench_ingest import (RECORD_FIELDS, _bool, _split, build_configuration, parse_md_quantity,
+                                parse_test_label)
+from perf_model import CONFIG_OFFLOAD
+
+# First match wins (Quad before Dual); (pattern, config name, CPU-only)
+SECTION_RULES = [
+    (r'CPU-Only', "CPU-Only", True),
+    (r'Partial', "GPU Partial", False),
+    (r'Full', "GPU Full", False),
+    (r'Single GPU', "Single GPU", False),
+    (r'Quad GPU.*Balanced', "Quad GPU (Balanced)", False),
+    (r'Quad GPU.*Custom', "Quad GPU (Custom)", False),
+    (r'Quad GPU', "Quad GPU", False),
+    (r'Dual GPU', "Dual GPU", False),
+]
+
+# llama-bench markdown column -> (record field, converter); 'test' and 't/s' are handled separately
+MD_COLUMNS = {
+    'model': ('model_type', str),
+    'size': ('model_size', parse_md_quantity),
+    'params': ('model_n_params', parse_md_quantity),
+    'backend': ('backends', str),
+    'threads': ('n_threads', int),
+    'cpu_mask': ('cpu_mask', str),
+    'n_batch': ('n_batch', int),
+    'n_ubatch': ('n_ubatch', int),
+    'type_k': ('type_k', str),
+    'type_v': ('type_v', str),
+    'ngl': ('n_gpu_layers', int),
+    'sm': ('split_mode', str),
+    'mg': ('main_gpu', int),
+    'nkvo': ('no_kv_offload', _bool),
+    'fa': ('flash_attn', _bool),
+    'dev': ('devices', str),
+    'ts': ('tensor_split', _split),
+}
+
+# llama-bench flag -> (record field, converter)
+COMMAND_FLAGS = {
+    '-m': ('model_filename', str), '--model': ('model_filename', str),
+    '-t': ('n_threads', int), '--threads': ('n_threads', int),
+    '-C': ('cpu_mask', str), '--cpu-mask': ('cpu_mask', str),
+    '-b': ('n_batch', int), '--batch-size': ('n_batch', int),
+    '-ub': ('n_ubatch', int), '--ubatch-size': ('n_ubatch', int),
+    '-ctk': ('type_k', str), '--cache-type-k': ('type_k', str),
+    '-ctv': ('type_v', str), '--cache-type-v': ('type_v', str),
+    '-ngl': ('n_gpu_layers', int), '--n-gpu-layers': ('n_gpu_layers', int),
+    '-sm': ('split_mode', str), '--split-mode': ('split_mode', str),
+    '-mg': ('main_gpu', int), '--main-gpu': ('main_gpu', int),
+    '-nkvo': ('no_kv_offload', _bool), '--no-kv-offload': ('no_kv_offload', _bool),
+    '-fa': ('flash_attn', _bool), '--flash-attn': ('flash_attn', _bool),
+    '-dev': ('devices', str), '--device': ('devices', str),
+    '-ts': ('tensor_split', _split), '--tensor-split': ('tensor_split', _split),
+}
+
+# What llama-bench uses when a flag is not given (and the markdown table omits the column).
+# -ngl is left out: older reports drop the column even when it was set, so the
+# section's CONFIG_OFFLOAD entry stands in for it.
+LLAMA_BENCH_DEFAULTS = {
+    'n_batch': 2048,
+    'n_ubatch': 512,
+    'type_k': 'f16',
+    'type_v': 'f16',
+    'split_mode': 'layer',
+    'main_gpu': 0,
+    'no_kv_offload': False,
+    'flash_attn': False,
+    'tensor_split': [],
+}
+
+# (pattern, results field, converter) - the first occurrence in the report wins
+METADATA_RULES = [
+    (r'\*\*Node:\*\*\s*(.+?)\s*$', 'node', str),
+    (r'\*\*Model:\*\*\s*(.+?)\s*$', 'model', str),
+    (r'^Model name:\s*(.+?)\s*$', 'cpu_model', str),
+    (r'\*\*GPUs per Node:\*\*\s*(\d+)', 'gpu_count', int),
+]
+
+SECTION_HEADER = re.compile(r'^## Test (\d+):\s*(.+?)\s*$')
+COMMAND_LINE = re.compile(r'^\*\*Command:\*\*\s*`?(.+?)`?\s*$')
+DEVICE_LINE = re.compile(r'^\s*Device \d+: ([^,]+),')
+CUDA_FAILED = re.compile(r'failed to initialize CUDA')
+TABLE_HEADER = re.compile(r'^\|\s*model\s*\|.*\btest\b.*\bt/s\b')
+TABLE_ROW = re.compile(r'^\|')
+ENV_ASSIGNMENT = re.compile(r'^([A-Z_][A-Z0-9_]*)=(.*)$')
+
+def classify_section(title):
+    """(config name, CPU-only) from a section title; ("Unknown", False) when no rule matches."""
+    for pattern, name, is_cpu in SECTION_RULES:
+        if re.search(pattern, title):
+            return name, is_cpu
+    return "Unknown", False
+
+def parse_command(command):
+    """{'CUDA_VISIBLE_DEVICES': '0', '-ngl': '99', '-ts': '8,8,0,0', ...} from a shell command line."""
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        tokens = command.split()
+    params = {}
+    while tokens and ENV_ASSIGNMENT.match(tokens[0]):
+        name, value = ENV_ASSIGNMENT.match(tokens.pop(0)).groups()
+        params[name] = value
+    # Wrappers ahead of the binary (timeout 600, numactl ...) are not llama-bench flags
+    while tokens and not tokens[0].endswith('llama-bench'):
+        tokens.pop(0)
+    tokens = tokens[1:]
+    for i, token in enumerate(tokens):
+        if not token.startswith('-'):
+            continue
+        value = tokens[i + 1] if i + 1 < len(tokens) else ''
+        params[token] = '' if value.startswith('-') and not re.match(r'^-\d', value) else value
+    return params
+
+def command_fields(params):
+    """Record fields set by single-valued flags; comma lists are separate llama-bench runs, so the row decides."""
+    fields = {}
+    for flag, value in params.items():
+        if flag in COMMAND_FLAGS and value and ',' not in value:
+            field, convert = COMMAND_FLAGS[flag]
+            try:
+                fields[field] = convert(value)
+            except ValueError:
+                pass
+    return fields
+
+def row_record(section, columns, cells, node):
+    """One llama-bench markdown row as a run record; None for rows without a test and t/s."""
+    row = dict(zip(columns, cells))
+    parsed = parse_test_label(row.get('test', ''))
+    value, _, stddev = row.get('t/s', '').partition('±')
+    if not parsed:
+        return None
+    try:
+        avg_ts, stddev_ts = float(value), float(stddev or 0)
+    except ValueError:
+        return None
+
+    name, _ = section_identity(section)
+    record = dict(LLAMA_BENCH_DEFAULTS, n_gpu_layers=CONFIG_OFFLOAD.get(name, (99, None))[0])
+    record.update(command_fields(section['params']))
+    for column, cell in row.items():
+        if column in MD_COLUMNS and cell:
+            field, convert = MD_COLUMNS[column]
+            try:
+                record[field] = convert(cell)
+            except ValueError:
+                pass
+    n_prompt, n_gen, n_depth = parsed
+    record.update({
+        'test_section': f"Test {section['test_num']}: {section['title']}",
+        'node': node or '',
+        'gpu_info': '' if section['cuda_failed'] else ', '.join(section['devices']),
+        'n_prompt': n_prompt,
+        'n_gen': n_gen,
+        'n_depth': n_depth,
+        'avg_ts': avg_ts,
+        'stddev_ts': stddev_ts,
+    })
+    return {field: v for field, v in record.items() if field in RECORD_FIELDS}
+
+def _metadata(state, match, field, convert):
+    if state['results'][field] is None:
+        state['results'][field] = convert(match.group(1))
+
+def _section(state, match, *_):
+    title = match.group(2)
+    state['section'] = {'test_num': int(match.group(1)), 'title': title, 'command': None, 'params': {},
+                        'devices': [], 'cuda_failed': False, 'records': []}
+    state['sections'].append(state['section'])
+    state['columns'] = None
+
+def _command(state, match, *_):
+    if state['section']:
+        state['section']['command'] = match.group(1)
+        state['section']['params'] = parse_command(match.group(1))
+
+def _device(state, match, *_):
+    gpu = match.group(1).strip()
+    if state['results']['gpu_type'] is None:
+        state['results']['gpu_type'] = gpu
+    if state['section']:
+        state['section']['devices'].append(gpu)
+
+def _cuda_failed(state, *_):
+    if state['section']:
+        state['section']['cuda_failed'] = True
+
+def _table_header(state, match, *_):
+    state['columns'] = [c.strip() for c in match.string.strip().strip('|').split('|')]
+
+def _table_row(state, match, *_):
+    if state['section'] and state['columns']:
+        cells = [c.strip() for c in match.string.strip().strip('|').split('|')]
+        record = row_record(state['section'], state['columns'], cells, state['results']['node'])
+        if record:
+            state['section']['records'].append(record)
+
+# (pattern, handler, extra handler args) - the first matching rule handles the line
+LINE_RULES = [(re.compile(pattern), _metadata, (field, convert)) for pattern, field, convert in METADATA_RULES] + [
+    (SECTION_HEADER, _section, ()),
+    (COMMAND_LINE, _command, ()),
+    (DEVICE_LINE, _device, ()),
+    (CUDA_FAILED, _cuda_failed, ()),
+    (TABLE_HEADER, _table_header, ()),
+    (TABLE_ROW, _table_row, ()),
+]
+
+def iter_report_lines(filepath):
+    # Stream the report so long llama-bench / system-info sections never sit in memory
+    with open(filepath, 'r') as f:
+        for line in f:
+            yield line
+
+def section_identity(section):
+    """(config name, CPU-only) for a section; titles no rule knows keep their own name."""
+    if section['cuda_failed']:
+        return "CPU-Only", True
+    name, is_cpu = classify_section(section['title'])
+    return (section['title'] if name == "Unknown" else name), is_cpu
+
+def section_configuration(section):
+    name, is_cpu = section_identity(section)
+    config = build_configuration(name, section['test_num'], section['records'], is_cpu)
+    config['command'] = section['command']
+    config['params'] = section['params']
+    return config
+
+def parse_benchmark_file(filepath):
+    filepath = Path(filepath)
+    state = {
+        'results': {
+            'filepath': str(filepath),
+            'filename': filepath.name,
+            'node': None,
+            'gpu_type': None,
+            'gpu_count': None,
+            'model': None,
+            'cpu_model': None,
+            'configurations': []
+        },
+        'section': None,
+        'columns': None,
+        'sections': [],
+    }
+    for line in iter_report_lines(filepath):
+        for pattern, handler, args in LINE_RULES:
+            match = pattern.search(line)
+            if match:
+                handler(state, match, *args)
+                break
+
+    results = state['results']
+    results['configurations'] = [section_configuration(s) for s in state['sections'] if s['records']]
+    return results
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Incremental parse cache for analyze_results.py
+
+Parsed per-file results are stored in SQLite keyed by path, mtime/size and
+content hash, so a re-run only parses reports that are new or changed.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from llama_bench_ingest import sidecar_path
+
+SCHEMA_VERSION = 13
+CACHE_FILENAME = ".analysis_cache.sqlite"
+
+def report_sources(filepath):
+    # A markdown report and its llama-bench JSONL sidecar are cached as one unit
+    sources = [filepath]
+    if str(filepath).endswith('.md') and sidecar_path(filepath).exists():
+        sources.append(sidecar_path(filepath))
+    return sources
+
+def stat_key(filepath):
+    stats = [os.stat(f) for f in report_sources(filepath)]
+    return max(st.st_mtime_ns for st in stats), sum(st.st_size for st in stats)
+
+def file_digest(filepath):
+    h = hashlib.sha256()
+    for source in report_sources(filepath):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+class ResultsCache:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        cur = self.conn.cursor()
+        cur.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = cur.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or int(row[0]) != SCHEMA_VERSION:
+            # Parsed records from another schema are not trusted - start over
+            cur.execute("DROP TABLE IF EXISTS reports")
+            cur.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS reports (
+                path    TEXT PRIMARY KEY,
+                mtime   INTEGER NOT NULL,
+                size    INTEGER NOT NULL,
+                sha256  TEXT NOT NULL,
+                results TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def plan(self, benchmark_files):
+        """Split files into (cached, stale) and evict rows for files that no longer exist."""
+        known = {path: (mtime, size, digest) for path, mtime, size, digest in
+                 self.conn.execute("SELECT path, mtime, size, sha256 FROM reports")}
+        wanted = {str(f) for f in benchmark_files}
+
+        gone = [path for path in known if path not in wanted]
+        self.conn.executemany("DELETE FROM reports WHERE path = ?", [(p,) for p in gone])
+
+        cached, stale = [], []
+        for filepath in benchmark_files:
+            entry = known.get(str(filepath))
+            if entry is None:
+                stale.append(filepath)
+                continue
+            mtime, size = stat_key(filepath)
+            if (mtime, size) == entry[:2]:
+                cached.append(filepath)
+            elif file_digest(filepath) == entry[2]:
+                # Touched but not edited: refresh the stat key, keep the parse
+                self.conn.execute("UPDATE reports SET mtime = ?, size = ? WHERE path = ?",
+                                  (mtime, size, str(filepath)))
+                cached.append(filepath)
+            else:
+                stale.append(filepath)
+        self.conn.commit()
+        return cached, stale, gone
+
+    def load(self, filepaths):
+        wanted = {str(f) for f in filepaths}
+        loaded = {}
+        for path, results in self.conn.execute("SELECT path, results FROM reports"):
+            if path in wanted:
+                loaded[path] = json.loads(results)
+        return loaded
+
+    def store(self, filepath, results):
+        mtime, size = stat_key(filepath)
+        self.conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)",
+                          (str(filepath), mtime, size, file_digest(filepath), json.dumps(results)))
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+In-memory index over parsed reports for the analysis tables
+
+One pass flattens every (report, configuration) into an entry, ordered by
+report then test number, carrying the fields the tables filter and group on,
+plus the set of run fields present (placement, layout, telemetry, ...).
+Tables then ask the index for where() / group_by() instead of re-walking
+results_list; each grouping is built once and reused.
+"""
+
+class ResultsIndex:
+    def __init__(self, results_list):
+        self.entries = []
+        self.run_fields = set()
+        self._groups = {}
+        for report, result in enumerate(results_list):
+            configs = list(enumerate(result['configurations']))
+            for position, config in sorted(configs, key=lambda item: item[1].get('test_num', 0)):
+                self.entries.append({
+                    'report': report,
+                    'position': position,   # order within the report file, before sorting by test number
+                    'result': result,
+                    'config': config,
+                    'file': result['filename'],
+                    'node': result['node'] or 'Unknown',
+                    'gpu_type': result['gpu_type'],
+                    'model': config.get('model') or result.get('model') or 'Unknown',
+                    'name': config['name'],
+                    'is_cpu': config['is_cpu_only'],
+                })
+                for run in config.get('runs') or []:
+                    self.run_fields.update(field for field, value in run.items() if value)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def where(self, **conditions):
+        """Entries whose fields equal every given value, in report order."""
+        return [e for e in self.entries if all(e[k] == v for k, v in conditions.items())]
+
+    def group_by(self, *keys):
+        """{value (one key) or tuple of values: [entries]} in first-seen order."""
+        if keys not in self._groups:
+            groups = {}
+            for entry in self.entries:
+                value = entry[keys[0]] if len(keys) == 1 else tuple(entry[k] for k in keys)
+                groups.setdefault(value, []).append(entry)
+            self._groups[keys] = groups
+        return self._groups[keys]
+
+    def has_run_field(self, field):
+        return field in self.run_fields
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Columnar results store shared by analyze_results.py and visualize_results.py
+
+One row per (file, node, gpu_type, gpu_count, config, test, repetition, t/s),
+plus run timestamp, model (with weight bytes and parameter count), run setup, ubatch, KV-cache settings and the
+multi-instance layout/instance, the host CPU, the GPUs the run computed on and
+their measured power (from the job's telemetry, NaN when not sampled), saved
+as a NumPy structured array in a plain .npy so readers can memory-map it.
+"""
+
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from llama_bench_ingest import parse_test_label, run_setup, test_label, test_shape
+from model_matrix import matrix_row
+from scaling_model import gpus_used
+from telemetry import load_telemetry, run_power
+
+STORE_FILENAME = "results_store.npy"
+
+# Text columns ('U') are sized to their longest value when the store is written
+STORE_FIELDS = [
+    ('file', 'U'),
+    ('timestamp', 'datetime64[s]'),
+    ('model', 'U'),
+    ('node', 'U'),
+    ('gpu_type', 'U'),
+    ('gpu_count', 'i2'),
+    ('config', 'U'),
+    ('is_cpu', '?'),
+    ('test_num', 'i2'),
+    ('test', 'U'),
+    ('repetition', 'i4'),
+    ('tps', 'f8'),
+    ('layout', 'U'),
+    ('instance', 'i2'),
+    ('concurrency', 'i2'),
+    ('setup', 'U'),
+    ('n_ubatch', 'i4'),
+    ('base_setup', 'U'),
+    ('type_k', 'U'),
+    ('type_v', 'U'),
+    ('flash_attn', '?'),
+    ('no_kv_offload', '?'),
+    ('n_gpu_layers', 'i2'),
+    ('model_size', 'f8'),
+    ('model_params', 'f8'),
+    ('cpu_model', 'U'),
+    ('n_gpus', 'i2'),
+    ('power_w', 'f4'),
+]
+
+def store_dtype(rows):
+    """STORE_FIELDS with every text column as wide as its longest value, so nothing is cut."""
+    fields = []
+    for i, (name, kind) in enumerate(STORE_FIELDS):
+        if kind == 'U':
+            kind = f"U{max([len(row[i]) for row in rows] + [1])}"
+        fields.append((name, kind))
+    return np.dtype(fields)
+
+def measured_power(result, run, loaded):
+    """Mean GPU power over a run from its telemetry file (each file read once via `loaded`)."""
+    if not run.get('telemetry'):
+        return math.nan
+    path = Path(result['filepath']).parent / run['telemetry']
+    if path not in loaded:
+        loaded[path] = load_telemetry(path) if path.exists() else None
+    return run_power(loaded[path], run) if loaded[path] is not None else math.nan
+
+def build_records(results_list):
+    rows = []
+    loaded = {}
+    for result in results_list:
+        for config in result['configurations']:
+            for test, values in config['samples'].items():
+                # samples[test] holds one avg_ts per run, in run order
+                runs = [r for r in config.get('runs') or [] if test_label(r) == test]
+                if len(runs) != len(values):
+                    runs = [{}] * len(values)
+                for rep, (tps, run) in enumerate(zip(values, runs)):
+                    rows.append((
+                        result['filename'],
+                        np.datetime64(result.get('timestamp') or 'NaT', 's'),
+                        config.get('model') or result.get('model') or '',
+                        result['node'] or 'Unknown',
+                        result['gpu_type'] or '',
+                        result['gpu_count'] or 0,
+                        config['name'],
+                        config['is_cpu_only'],
+                        config.get('test_num', 0),
+                        test,
+                        rep,
+                        tps,
+                        run.get('layout') or '',
+                        run.get('instance', 0),
+                        run.get('concurrency', 0),
+                        run_setup(run) if run else config['name'],
+                        run.get('n_ubatch', 0),
+                        run_setup(run, kv=False) if run else config['name'],
+                        run.get('type_k') or 'f16',
+                        run.get('type_v') or 'f16',
+                        run.get('flash_attn', False),
+                        run.get('no_kv_offload', False),
+                        run.get('n_gpu_layers', 0 if config['is_cpu_only'] else 99),
+                        config.get('model_size', 0),
+                        config.get('model_n_params', 0),
+                        result.get('cpu_model') or '',
+                        gpus_used(result, config, run or None),
+                        measured_power(result, run, loaded),
+                    ))
+    records = np.array(rows, dtype=store_dtype(rows))
+    for i, (name, kind) in enumerate(STORE_FIELDS):
+        if kind == 'U':
+            assert records[name].tolist() == [row[i] for row in rows], f"store column {name} truncated"
+    return records
+
+def write_store(results_list, path):
+    records = build_records(results_list)
+    # Write-then-rename so a reader never maps a half-written file
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, records)
+    os.replace(tmp_path, path)
+    return path
+
+def load_store(path):
+    return np.load(path, mmap_mode='r')
+
+def summarize_store(records):
+    """Collapse repetitions into per-config mean t/s, keeping first-seen order."""
+    key_fields = ['file', 'node', 'gpu_type', 'config', 'test_num']
+    _, first, inverse = np.unique(records[key_fields], return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    tests, test_idx = np.unique(records['test'], return_inverse=True)
+    
+    n_groups, n_tests = len(first), len(tests)
+    flat = inverse * n_tests + test_idx.ravel()
+    sums = np.bincount(flat, weights=records['tps'], minlength=n_groups * n_tests)
+    counts = np.bincount(flat, minlength=n_groups * n_tests)
+    means = (sums / np.maximum(counts, 1)).reshape(n_groups, n_tests)
+    present = counts.reshape(n_groups, n_tests) > 0
+    
+    configs = []
+    for group in np.argsort(first, kind='stable'):
+        row = records[first[group]]
+        entry = {
+            'file': str(row['file']),
+            'node': str(row['node']),
+            'gpu_type': str(row['gpu_type']) or 'CPU',
+            'gpu_count': int(row['gpu_count']),
+            'name': str(row['config']),
+            'model': str(row['model']),
+            'cpu_model': str(row['cpu_model']),
+            'is_cpu': bool(row['is_cpu']),
+            'test_num': int(row['test_num']),
+        }
+        for t in np.flatnonzero(present[group]):
+            entry[str(tests[t])] = float(means[group, t])
+        configs.append(entry)
+    return configs
+
+def summarize_instances(records):
+    """Per (node, layout, test): replicas, per-instance and aggregate t/s at full concurrency, solo t/s."""
+    if 'layout' not in records.dtype.names:
+        return []
+    records = records[records['layout'] != '']
+    groups = {}
+    for row in records:
+        key = (str(row['node']), str(row['layout']), str(row['test']))
+        by_instance = groups.setdefault(key, {}).setdefault(int(row['concurrency']) or 1, {})
+        by_instance.setdefault(int(row['instance']), []).append(float(row['tps']))
+    
+    entries = []
+    for (node, layout, test), passes in groups.items():
+        concurrency = max(passes)
+        means = [np.mean(v) for v in passes[concurrency].values()]
+        solo = [np.mean(v) for v in passes.get(1, {}).values()]
+        entries.append({
+            'node': node,
+            'layout': layout,
+            'test': test,
+            'instances': concurrency,
+            'per_instance': float(np.mean(means)),
+            'aggregate': float(np.sum(means)),
+            'solo': float(np.mean(solo)) if solo else None,
+        })
+    return entries
+
+def summarize_shapes(records):
+    """Per (node, model, setup, test shape) with several depths or ubatches: {(depth, ubatch): mean t/s}."""
+    if 'n_ubatch' not in records.dtype.names:
+        return {}
+    cells = {}
+    for row in records:
+        parsed = parse_test_label(str(row['test']))
+        if parsed:
+            key = (str(row['node']), str(row['model']), str(row['setup']), test_shape(str(row['test'])))
+            cells.setdefault(key, {}).setdefault((parsed[2], int(row['n_ubatch'])), []).append(float(row['tps']))
+    grids = {}
+    for key, grid in cells.items():
+        if len({d for d, _ in grid}) > 1 or len({u for _, u in grid}) > 1:
+            grids[key] = {cell: float(np.mean(v)) for cell, v in grid.items()}
+    return grids
+
+def kv_store_rows(records):
+    """Rows in kv_tradeoff.kv_rows form (one per repetition), for visualize_results.py."""
+    if 'type_k' not in records.dtype.names:
+        return []
+    return [{
+        'node': str(row['node']),
+        'gpu_type': str(row['gpu_type']),
+        'model': str(row['model']),
+        'base': str(row['base_setup']),
+        'shape': test_shape(str(row['test'])),
+        'test': str(row['test']),
+        'type_k': str(row['type_k']),
+        'type_v': str(row['type_v']),
+        'flash_attn': bool(row['flash_attn']),
+        'no_kv_offload': bool(row['no_kv_offload']),
+        'n_gpu_layers': int(row['n_gpu_layers']),
+        'split': [],
+        'tps': float(row['tps']),
+    } for row in records if parse_test_label(str(row['test']))]
+
+def model_store_rows(records):
+    """Rows in model_matrix.model_rows form (mean pp512/tg128 per node, model and setup)."""
+    if 'model_size' not in records.dtype.names:
+        return []
+    groups = {}
+    for row in records:
+        if str(row['test']) in ('pp512', 'tg128'):
+            key = (str(row['node']), str(row['model']), str(row['setup']))
+            entry = groups.setdefault(key, {'size': float(row['model_size']), 'params': float(row['model_params']),
+                                            'pp512': [], 'tg128': []})
+            entry[str(row['test'])].append(float(row['tps']))
+    return [matrix_row(node, model, setup, e['size'], e['params'], e['pp512'], e['tg128'])
+            for (node, model, setup), e in groups.items()]
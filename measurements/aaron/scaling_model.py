@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Multi-GPU scaling model and tensor-split optimizer
+
+With layer split each GPU holds a contiguous block of layers, so the time per
+token is fitted as
+
+    T = a * (largest layer share) + b + c * (N - 1)
+
+where b is the serial part (what does not shrink with more GPUs), a the
+parallel part and c the transfer cost per extra GPU. Serial fraction is
+b / (a + b). Fits are per (GPU type, model); the fitted model is then
+searched over GPU counts and integer -ts splits for the next candidates.
+"""
+
+import itertools
+import json
+from bisect import bisect_right
+from functools import reduce
+from math import gcd
+
+import numpy as np
+
+from llama_bench_ingest import test_label
+from perf_model import MODELS, identify_model, offload_settings
+
+TESTS = ['pp512', 'tg128']
+MAX_WEIGHT = 4        # integer -ts weights tried per GPU
+TOP_CANDIDATES = 3
+
+def layer_assignment(split, n_layers, n_gpu_layers=99):
+    """Layers (including the output layer) per device, as llama.cpp assigns them."""
+    n_total = n_layers + 1
+    act = min(n_gpu_layers, n_total)
+    cumulative = np.cumsum(split, dtype=float)
+    cumulative /= cumulative[-1]
+    counts = [0] * len(split)
+    for il in range(act):
+        device = min(bisect_right(cumulative, il / act), len(split) - 1)
+        counts[device] += 1
+    return counts
+
+def critical_share(split, n_layers):
+    counts = layer_assignment(split, n_layers)
+    return max(counts) / (n_layers + 1), sum(1 for c in counts if c)
+
+def run_split(run, gpu_count):
+    """Tensor split of one llama-bench record; all-zero means an even split over the visible GPUs."""
+    split = list(run.get('tensor_split', []))
+    while split and split[-1] == 0:
+        split.pop()
+    if split:
+        return split
+    visible = len([g for g in run.get('gpu_info', '').split(',') if g.strip()]) or gpu_count or 1
+    return [1] * visible
+
+def gpus_used(result, config, run=None):
+    """GPUs a run computed on: 0 for CPU-only, else the non-zero entries of its tensor split."""
+    if config['is_cpu_only']:
+        return 0
+    split = run_split(run, result['gpu_count']) if run else offload_settings(config)[1]
+    return sum(1 for w in split if w > 0) or 1
+
+def observations(results_list, test):
+    """{(gpu_type, model): [(split, tps), ...]} for fully offloaded GPU configs."""
+    groups = {}
+    for result in results_list:
+        if not result['gpu_type']:
+            continue
+        for config in result['configurations']:
+            if config['is_cpu_only']:
+                continue
+            n_gpu_layers, split = offload_settings(config)
+            if n_gpu_layers < 99:
+                continue
+            model, _ = identify_model(config.get('model') or result.get('model'))
+            if model is None:
+                # The fit needs the layer count
+                continue
+            points = groups.setdefault((result['gpu_type'], model), [])
+            runs = [r for r in config.get('runs') or [] if test_label(r) == test]
+            if runs:
+                points.extend((run_split(r, result['gpu_count']), r['avg_ts']) for r in runs if r.get('avg_ts'))
+            elif config.get(test):
+                points.append((split, config[test]))
+    return groups
+
+def fit_scaling(points, n_layers):
+    """Least-squares (a, b, c) on relative time error; None without at least two GPU counts."""
+    rows = [critical_share(split, n_layers) for split, _ in points]
+    if len({n for _, n in rows}) < 2:
+        return None
+    X = np.array([[share, 1.0, n - 1] for share, n in rows])
+    y = np.array([1.0 / tps for _, tps in points])
+    # Scale rows by 1/T so every run weighs the same relative error
+    X, target = X / y[:, None], np.ones_like(y)
+    active = [0, 1, 2]
+    # Drop terms that come out negative and refit (a tiny NNLS)
+    while True:
+        coef, *_ = np.linalg.lstsq(X[:, active], target, rcond=None)
+        if (coef >= 0).all() or len(active) == 1:
+            break
+        active.pop(int(np.argmin(coef)))
+    params = np.zeros(3)
+    params[active] = np.maximum(coef, 0)
+    a, b, c = (float(v) for v in params)
+    if a + b <= 0:
+        return None
+    predicted = np.array([[share, 1.0, n - 1] for share, n in rows]) @ params
+    residual = float(np.sqrt(np.mean((predicted * np.array([tps for _, tps in points]) - 1) ** 2)))
+    return {'a': a, 'b': b, 'c': c, 'serial_fraction': b / (a + b), 'residual': residual,
+            'n_layers': n_layers}
+
+def predict(fit, split):
+    share, n = critical_share(split, fit['n_layers'])
+    return 1.0 / (fit['a'] * share + fit['b'] + fit['c'] * (n - 1))
+
+def efficiency(tps, single_tps, n):
+    """Parallel efficiency and Karp-Flatt (experimentally determined) serial fraction."""
+    speedup = tps / single_tps
+    eff = speedup / n
+    serial = (1 / speedup - 1 / n) / (1 - 1 / n) if n > 1 else None
+    return eff, serial
+
+def format_split(split):
+    return "/".join(f"{w:g}" for w in split)
+
+def candidate_splits(max_gpus, n_layers, max_weight=MAX_WEIGHT):
+    """Integer splits up to max_gpus GPUs, one per distinct layer assignment."""
+    seen = {}
+    for n in range(1, max_gpus + 1):
+        for weights in itertools.product(range(1, max_weight + 1), repeat=n):
+            g = reduce(gcd, weights)
+            weights = tuple(w // g for w in weights)
+            key = tuple(layer_assignment(weights, n_layers))
+            if key not in seen or sum(weights) < sum(seen[key]):
+                seen[key] = weights
+    return list(seen.values())
+
+def best_splits(fit, max_gpus, measured, top=TOP_CANDIDATES):
+    """Highest predicted throughput splits not already measured."""
+    measured = {tuple(layer_assignment(s, fit['n_layers'])) for s in measured}
+    # Ties (e.g. a fully serial fit) go to fewer GPUs and simpler weights
+    ranked = sorted(candidate_splits(max_gpus, fit['n_layers']),
+                    key=lambda s: (-round(predict(fit, s), 6), len(s), sum(s)))
+    best = ranked[0]
+    fresh = [s for s in ranked if tuple(layer_assignment(s, fit['n_layers'])) not in measured]
+    return best, fresh[:top]
+
+def scaling_analysis(results_list, test='pp512'):
+    """Per (gpu_type, model): fit, per-split observations and next -ts candidates."""
+    max_gpus = {}
+    for result in results_list:
+        if result['gpu_type']:
+            max_gpus[result['gpu_type']] = max(max_gpus.get(result['gpu_type'], 1), result['gpu_count'] or 1)
+
+    analyses = []
+    for (gpu_type, model), points in sorted(observations(results_list, test).items()):
+        n_layers = MODELS[model]['n_layers']
+        by_split = {}
+        for split, tps in points:
+            by_split.setdefault(tuple(layer_assignment(split, n_layers)), (split, []))[1].append(tps)
+        singles = [tps for split, tps in points if critical_share(split, n_layers)[1] == 1]
+        if not singles:
+            continue
+        single_tps = sum(singles) / len(singles)
+
+        rows = []
+        for split, values in by_split.values():
+            n = critical_share(split, n_layers)[1]
+            tps = sum(values) / len(values)
+            eff, serial = efficiency(tps, single_tps, n)
+            rows.append({'split': split, 'n_gpus': n, 'tps': tps, 'efficiency': eff, 'serial_fraction': serial})
+        rows.sort(key=lambda r: (r['n_gpus'], format_split(r['split'])))
+
+        fit = fit_scaling(points, n_layers)
+        analysis = {'gpu_type': gpu_type, 'model': model, 'test': test, 'rows': rows, 'fit': fit}
+        if fit is not None:
+            best, candidates = best_splits(fit, max_gpus.get(gpu_type, 1), [r['split'] for r in rows])
+            analysis['best'] = (best, predict(fit, best))
+            analysis['candidates'] = [(s, predict(fit, s)) for s in candidates]
+        analyses.append(analysis)
+    return analyses
+
+def print_scaling_analysis(results_list, tests=TESTS, indent="   "):
+    for test in tests:
+        for analysis in scaling_analysis(results_list, test):
+            fit = analysis['fit']
+            print(f"\n{indent}{analysis['gpu_type']} / {analysis['model']} ({test}):")
+            print(f"{indent}| GPUs | -ts        | t/s      | Efficiency | Serial (Karp-Flatt) |")
+            print(f"{indent}|------|------------|----------|------------|---------------------|")
+            for row in analysis['rows']:
+                serial = f"{row['serial_fraction']:19.3f}" if row['serial_fraction'] is not None else f"{'-':>19s}"
+                print(f"{indent}| {row['n_gpus']:4d} | {format_split(row['split']):10s} | {row['tps']:8.2f} | "
+                      f"{row['efficiency']*100:9.1f}% | {serial} |")
+            if fit is None:
+                print(f"{indent}❔ Need runs at two or more GPU counts to fit the scaling model")
+                continue
+            print(f"{indent}Model: serial fraction {fit['serial_fraction']:.3f}, "
+                  f"transfer cost {fit['c']*1000:.3f} ms/token per extra GPU, fit error {fit['residual']*100:.1f}%")
+            best, best_tps = analysis['best']
+            print(f"{indent}💡 Predicted best: {len(best)} GPU(s), -ts {format_split(best)} → {best_tps:.2f} t/s")
+            if analysis['candidates']:
+                ts = [format_split(s) for s, _ in analysis['candidates']]
+                print(f"{indent}Next -ts candidates: " +
+                      ", ".join(f"{t} ({p:.2f} t/s)" for t, (_, p) in zip(ts, analysis['candidates'])))
+                print(f"{indent}Sweep spec: " + json.dumps({'grid': {'ngl': [99], 'ts': ts}}))
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Serving-latency results from load_generator.py runs against llama-server
+
+Each serving_results_<timestamp>.jsonl line is one load step at a target
+request rate: achieved rate, output tokens/sec, error count and HDR-style
+histograms of TTFT (time to first token), TPOT (time per output token after
+the first) and end-to-end latency. The maximum sustainable rate is the
+highest rate whose p99s stay inside the run's SLO.
+"""
+
+import json
+import math
+from pathlib import Path
+
+SUB_BUCKET_BITS = 7     # 64 linear buckets per power of two: <1.6% relative error
+PERCENTILES = [50, 90, 99, 99.9]
+METRICS = ['ttft', 'tpot', 'e2e']
+MAX_ERROR_RATE = 0.01   # steps with more failed requests than this break the SLO
+SERVING_GLOB = "serving_results*.jsonl"
+
+class LatencyHistogram:
+    """Log-linear histogram of microsecond latencies, stored sparsely.
+
+    Values below 2**SUB_BUCKET_BITS us are exact; above that every power of
+    two is split into 2**(SUB_BUCKET_BITS - 1) equal buckets, like
+    HdrHistogram with ~2 significant digits.
+    """
+
+    def __init__(self, counts=None, min_us=None, max_us=0, sum_us=0):
+        self.counts = {int(i): int(c) for i, c in (counts or [])}
+        self.total = sum(self.counts.values())
+        self.min_us = min_us
+        self.max_us = max_us
+        self.sum_us = sum_us
+
+    @staticmethod
+    def bucket(value_us):
+        shift = max(0, value_us.bit_length() - SUB_BUCKET_BITS)
+        return (shift << (SUB_BUCKET_BITS - 1)) + (value_us >> shift)
+
+    @staticmethod
+    def bucket_range(index):
+        half = 1 << (SUB_BUCKET_BITS - 1)
+        shift = max(0, index // half - 1)
+        mantissa = index - (shift << (SUB_BUCKET_BITS - 1))
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds):
+        value_us = max(0, int(round(seconds * 1e6)))
+        index = self.bucket(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+        self.sum_us += value_us
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        self.sum_us += other.sum_us
+
+    def percentile(self, q):
+        """Latency in seconds at percentile q (0-100); NaN when empty."""
+        if not self.total:
+            return math.nan
+        rank = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self.bucket_range(index)
+                return min((low + high) / 2, self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    def mean(self):
+        return self.sum_us / self.total / 1e6 if self.total else math.nan
+
+    def to_dict(self):
+        return {'counts': sorted(self.counts.items()), 'min_us': self.min_us,
+                'max_us': self.max_us, 'sum_us': self.sum_us}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('counts'), data.get('min_us'), data.get('max_us', 0), data.get('sum_us', 0))
+
+def parse_slo(text):
+    """'ttft_p99=2000,tpot_p99=100' (milliseconds) -> {('ttft', 99.0): 2.0, ('tpot', 99.0): 0.1}."""
+    slo = {}
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        key, _, value = item.partition('=')
+        metric, _, pct = key.strip().partition('_p')
+        if metric not in METRICS or not pct:
+            raise ValueError(f"Unknown SLO term: {item} (expected e.g. ttft_p99=2000)")
+        slo[(metric, float(pct.replace('_', '.')))] = float(value) / 1000
+    return slo
+
+def format_slo(slo):
+    return ", ".join(f"{metric} p{pct:g} ≤ {limit*1000:g} ms" for (metric, pct), limit in slo.items())
+
+def step_histograms(step):
+    return {metric: LatencyHistogram.from_dict(step.get(metric) or {}) for metric in METRICS}
+
+def slo_violations(step, slo):
+    """Human-readable list of what broke the SLO at this step (empty when it held)."""
+    hists = step_histograms(step)
+    broken = []
+    requests = step.get('n_requests', 0)
+    if requests and step.get('n_errors', 0) / requests > MAX_ERROR_RATE:
+        broken.append(f"{step['n_errors']}/{requests} errors")
+    for (metric, pct), limit in slo.items():
+        value = hists[metric].percentile(pct)
+        if math.isnan(value) or value > limit:
+            broken.append(f"{metric} p{pct:g} {value*1000:.0f} ms")
+    return broken
+
+def max_sustainable_rate(steps, slo):
+    """Highest target rate whose step met the SLO, or None."""
+    passing = [s['target_rate'] for s in steps if not slo_violations(s, slo)]
+    return max(passing) if passing else None
+
+def load_serving_runs(benchmark_dir):
+    """{filename: [steps]} for every serving_results*.jsonl, steps sorted by rate."""
+    runs = {}
+    for path in sorted(Path(benchmark_dir).glob(SERVING_GLOB)):
+        with open(path) as f:
+            steps = [json.loads(line) for line in f if line.startswith('{')]
+        if steps:
+            runs[path.name] = sorted(steps, key=lambda s: s['target_rate'])
+    return runs
+
+def step_summary(step):
+    """Flat per-step numbers (seconds) for tables and figures."""
+    hists = step_histograms(step)
+    summary = {
+        'target_rate': step['target_rate'],
+        'achieved_rate': step.get('achieved_rate', 0.0),
+        'output_tps': step.get('output_tps', 0.0),
+        'n_requests': step.get('n_requests', 0),
+        'n_errors': step.get('n_errors', 0),
+    }
+    for metric, hist in hists.items():
+        summary[f"{metric}_mean"] = hist.mean()
+        for pct in PERCENTILES:
+            summary[f"{metric}_p{pct:g}"] = hist.percentile(pct)
+    return summary
+
+def print_serving_latency(runs, indent="   "):
+    for name, steps in runs.items():
+        first = steps[0]
+        slo = {(m, float(p)): v for m, p, v in first.get('slo') or []}
+        print(f"\n{indent}{name}: {first.get('node', 'Unknown')} → {first.get('url', '')} "
+              f"({first.get('arrival', 'poisson')}, {first.get('n_predict', 0)} tokens out)")
+        print(f"{indent}| Rate req/s | Achieved | Out t/s  | TTFT p50 | TTFT p99 | TPOT p50 | TPOT p99 | E2E p99  | Errors | SLO  |")
+        print(f"{indent}|------------|----------|----------|----------|----------|----------|----------|----------|--------|------|")
+        for step in steps:
+            s = step_summary(step)
+            ok = "✓" if slo and not slo_violations(step, slo) else "✗" if slo else "-"
+            print(f"{indent}| {s['target_rate']:10.2f} | {s['achieved_rate']:8.2f} | {s['output_tps']:8.1f} | "
+                  f"{s['ttft_p50']*1000:6.0f}ms | {s['ttft_p99']*1000:6.0f}ms | "
+                  f"{s['tpot_p50']*1000:6.1f}ms | {s['tpot_p99']*1000:6.1f}ms | {s['e2e_p99']:7.2f}s | "
+                  f"{s['n_errors']:6d} | {ok:^4s} |")
+        if slo:
+            best = max_sustainable_rate(steps, slo)
+            print(f"{indent}SLO: {format_slo(slo)}, errors ≤ {MAX_ERROR_RATE*100:g}%")
+            if best is None:
+                print(f"{indent}⚠️  No tested rate met the SLO (lowest: {', '.join(slo_violations(steps[0], slo))})")
+            else:
+                failing = [s for s in steps if s['target_rate'] > best]
+                why = f" (next {failing[0]['target_rate']:.2f} req/s: {', '.join(slo_violations(failing[0], slo))})" \
+                    if failing else ""
+                print(f"{indent}💡 Max sustainable rate: {best:.2f} req/s{why}")
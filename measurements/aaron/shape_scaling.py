@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Context-depth and ubatch scaling for arbitrary llama-bench test shapes
+
+Runs are grouped by node, model, setup (offload, split, flash-attn, KV
+types, threads) and test shape (pp512, tg128, pp512+tg128, ...), and each group's
+t/s is laid out as a KV depth x ubatch grid. Only groups that vary depth or
+ubatch are reported: how much throughput is left at the deepest context, and
+which ubatch is fastest at each depth.
+"""
+
+from llama_bench_ingest import parse_test_label, run_setup, test_label, test_shape
+
+def shape_rows(results_list):
+    """(node, model, setup, shape, depth, ubatch, t/s) for every run; markdown rows get ubatch 0 (default)."""
+    rows = []
+    for result in results_list:
+        node = result['node'] or 'Unknown'
+        for config in result['configurations']:
+            model = config.get('model') or result.get('model') or ''
+            if config.get('runs'):
+                for run in config['runs']:
+                    label = test_label(run)
+                    rows.append((node, run.get('model_type') or model, run_setup(run), test_shape(label),
+                                 run.get('n_depth', 0), run.get('n_ubatch', 0), run['avg_ts']))
+                continue
+            for label, values in config.get('samples', {}).items():
+                parsed = parse_test_label(label)
+                if parsed and values:
+                    rows.append((node, model, config['name'], test_shape(label), parsed[2], 0,
+                                 sum(values) / len(values)))
+    return rows
+
+def shape_grids(rows):
+    """{(node, model, setup, shape): {(depth, ubatch): mean t/s}} for groups with more than one depth or ubatch."""
+    groups = {}
+    for node, model, setup, shape, depth, ubatch, tps in rows:
+        groups.setdefault((node, model, setup, shape), {}).setdefault((depth, ubatch), []).append(tps)
+    grids = {}
+    for key, cells in groups.items():
+        if len({d for d, _ in cells}) > 1 or len({u for _, u in cells}) > 1:
+            grids[key] = {cell: sum(v) / len(v) for cell, v in cells.items()}
+    return grids
+
+def grid_axes(grid):
+    return sorted({d for d, _ in grid}), sorted({u for _, u in grid})
+
+def depth_retention(grid):
+    """[(ubatch, deepest depth, t/s there / t/s at the shallowest depth)] per ubatch column."""
+    depths, ubatches = grid_axes(grid)
+    retained = []
+    for ubatch in ubatches:
+        column = [(d, grid[(d, ubatch)]) for d in depths if (d, ubatch) in grid]
+        if len(column) > 1 and column[0][1]:
+            retained.append((ubatch, column[-1][0], column[-1][1] / column[0][1]))
+    return retained
+
+def best_ubatch(grid):
+    """[(depth, best ubatch, its t/s, gain over the worst ubatch)] for depths with several ubatches."""
+    depths, _ = grid_axes(grid)
+    best = []
+    for depth in depths:
+        row = sorted((tps, u) for (d, u), tps in grid.items() if d == depth)
+        if len(row) > 1 and row[0][0]:
+            best.append((depth, row[-1][1], row[-1][0], row[-1][0] / row[0][0] - 1))
+    return best
+
+def ubatch_name(ubatch):
+    return str(ubatch) if ubatch else "default"
+
+def print_shape_scaling(results_list, indent="   "):
+    grids = shape_grids(shape_rows(results_list))
+    for (node, model, setup, shape), grid in sorted(grids.items()):
+        depths, ubatches = grid_axes(grid)
+        print(f"\n{indent}{node} | {model} | {setup} | {shape} (t/s by depth x ubatch):")
+        print(f"{indent}| Depth   | " + " | ".join(f"{'ub ' + ubatch_name(u):>10s}" for u in ubatches) + " |")
+        print(f"{indent}|---------|" + "|".join("-" * 12 for _ in ubatches) + "|")
+        for depth in depths:
+            cells = [f"{grid[(depth, u)]:10.2f}" if (depth, u) in grid else f"{'-':>10s}" for u in ubatches]
+            print(f"{indent}| {depth:7d} | " + " | ".join(cells) + " |")
+
+        retained = depth_retention(grid)
+        if len(retained) == 1:
+            _, deepest, ratio = retained[0]
+            print(f"{indent}💡 d{deepest}: {ratio*100:.0f}% of d{depths[0]} throughput")
+        elif retained:
+            print(f"{indent}💡 d{depths[-1]} vs d{depths[0]} throughput: " +
+                  ", ".join(f"ub {ubatch_name(u)} {ratio*100:.0f}%" for u, _, ratio in retained))
+        for depth, ubatch, tps, gain in best_ubatch(grid):
+            print(f"{indent}   Best ubatch at d{depth}: {ubatch_name(ubatch)} → {tps:.2f} t/s "
+                  f"(+{gain*100:.0f}% vs worst)")
+    return grids
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Hardware telemetry sampled alongside llama-bench jobs
+
+A background thread polls GPU clocks/power/memory/utilization (nvidia-smi
+--query-gpu, plus PCIe rx/tx from a streaming `nvidia-smi dmon -s t`) and
+per-core CPU busy %, per-core frequency and per-NUMA-node memory use (/proc
+and /sys) into a fixed-size ring buffer. Each job's buffer is saved as .npz
+next to its results; analyze_results.py lines throughput dips up with it,
+placing repetitions back from the wall-clock time sweep.py saw each test end.
+
+Every source reads from a configurable command or root directory, so fake
+nvidia-smi scripts and fake /proc + /sys trees work the same as real ones.
+"""
+
+import argparse
+import math
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from llama_bench_ingest import test_label
+
+INTERVAL = 0.5          # seconds between samples
+CAPACITY = 4096         # samples kept per job (oldest are overwritten)
+DIP_THRESHOLD = 0.05    # repetition this far below the test's median counts as a dip
+CHANGE_THRESHOLD = 0.05 # telemetry metrics that moved less than this are not reported
+
+GPU_QUERY = [
+    ('sm_mhz', 'clocks.sm'),
+    ('mem_mhz', 'clocks.mem'),
+    ('power_w', 'power.draw'),
+    ('mem_used_mib', 'memory.used'),
+    ('util_pct', 'utilization.gpu'),
+    ('mem_util_pct', 'utilization.memory'),
+    ('temp_c', 'temperature.gpu'),
+    ('throttle', 'clocks_throttle_reasons.active'),
+]
+
+def _number(text):
+    text = text.strip()
+    try:
+        return float(int(text, 16)) if text.startswith('0x') else float(text)
+    except ValueError:
+        return math.nan
+
+class RingBuffer:
+    """Preallocated (capacity x width) float32 samples with float64 timestamps."""
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.times = np.full(capacity, np.nan)
+        self.values = np.full((capacity, width), np.nan, dtype=np.float32)
+        self.count = 0
+
+    def append(self, timestamp, row):
+        i = self.count % self.capacity
+        self.times[i] = timestamp
+        self.values[i] = row
+        self.count += 1
+
+    def snapshot(self):
+        """(times, values) oldest first."""
+        if self.count <= self.capacity:
+            return self.times[:self.count].copy(), self.values[:self.count].copy()
+        i = self.count % self.capacity
+        return np.concatenate([self.times[i:], self.times[:i]]), np.concatenate([self.values[i:], self.values[:i]])
+
+class NvidiaSmiSource:
+    """One `nvidia-smi --query-gpu` call per sample for the given GPU ids."""
+
+    def __init__(self, gpus, nvidia_smi='nvidia-smi'):
+        self.gpus = [str(g) for g in gpus]
+        self.nvidia_smi = nvidia_smi
+        self.columns = [f"gpu{g}_{name}" for g in self.gpus for name, _ in GPU_QUERY]
+
+    def start(self):
+        pass
+
+    def sample(self):
+        row = [math.nan] * len(self.columns)
+        cmd = [self.nvidia_smi, f"--query-gpu=index,{','.join(f for _, f in GPU_QUERY)}",
+               '--format=csv,noheader,nounits', '-i', ','.join(self.gpus)]
+        try:
+            out = subprocess.run(cmd, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            return row
+        for line in out.splitlines():
+            fields = line.split(',')
+            if len(fields) != len(GPU_QUERY) + 1 or fields[0].strip() not in self.gpus:
+                continue
+            base = self.gpus.index(fields[0].strip()) * len(GPU_QUERY)
+            row[base:base + len(GPU_QUERY)] = [_number(v) for v in fields[1:]]
+        return row
+
+    def stop(self):
+        pass
+
+class PcieSource:
+    """Latest PCIe rx/tx MB/s per GPU from a long-running `nvidia-smi dmon -s t`."""
+
+    def __init__(self, gpus, nvidia_smi='nvidia-smi', interval=1):
+        self.gpus = [str(g) for g in gpus]
+        self.cmd = [nvidia_smi, 'dmon', '-s', 't', '-d', str(max(1, int(interval))), '-i', ','.join(self.gpus)]
+        self.columns = [f"gpu{g}_{name}" for g in self.gpus for name in ('pcie_rx_mbps', 'pcie_tx_mbps')]
+        self.latest = {}
+        self.proc = None
+
+    def start(self):
+        try:
+            self.proc = subprocess.Popen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        except OSError:
+            return
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.proc.stdout:
+            fields = line.split()
+            if len(fields) >= 3 and not line.startswith('#') and fields[0] in self.gpus:
+                self.latest[fields[0]] = (_number(fields[1]), _number(fields[2]))
+
+    def sample(self):
+        return [v for g in self.gpus for v in self.latest.get(g, (math.nan, math.nan))]
+
+    def stop(self):
+        if self.proc is not None:
+            self.proc.terminate()
+            self.proc.wait()
+
+def parse_cpulist(cpulist):
+    cpus = []
+    for part in cpulist.split(','):
+        if part.strip():
+            lo, _, hi = part.partition('-')
+            cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+class HostSource:
+    """Per-core busy % (/proc/stat deltas), per-core MHz and per-NUMA-node used memory."""
+
+    def __init__(self, cpus=None, numa_nodes=None, root='/'):
+        self.root = Path(root)
+        node_dir = self.root / 'sys/devices/system/node'
+        if numa_nodes is None:
+            numa_nodes = sorted(int(p.name[4:]) for p in node_dir.glob('node[0-9]*'))
+        if cpus is None:
+            cpus = sorted(c for n in numa_nodes for c in parse_cpulist((node_dir / f"node{n}/cpulist").read_text())) \
+                if numa_nodes else self._stat_cpus()
+        self.cpus, self.numa_nodes = list(cpus), list(numa_nodes)
+        self.columns = ([f"cpu{c}_busy_pct" for c in self.cpus] + [f"cpu{c}_mhz" for c in self.cpus] +
+                        [f"numa{n}_used_mib" for n in self.numa_nodes])
+        self.previous = None
+
+    def _stat_cpus(self):
+        return sorted(int(line.split()[0][3:]) for line in (self.root / 'proc/stat').read_text().splitlines()
+                      if re.match(r'cpu\d+ ', line))
+
+    def start(self):
+        self.previous = self._jiffies()
+
+    def _jiffies(self):
+        jiffies = {}
+        for line in (self.root / 'proc/stat').read_text().splitlines():
+            if re.match(r'cpu\d+ ', line):
+                fields = line.split()
+                values = [int(v) for v in fields[1:]]
+                # idle + iowait count as not busy
+                jiffies[int(fields[0][3:])] = (sum(values), values[3] + (values[4] if len(values) > 4 else 0))
+        return jiffies
+
+    def _read_number(self, path, scale=1.0):
+        try:
+            return float(path.read_text().split()[0]) * scale
+        except (OSError, ValueError, IndexError):
+            return math.nan
+
+    def _node_used_mib(self, node):
+        try:
+            text = (self.root / f"sys/devices/system/node/node{node}/meminfo").read_text()
+        except OSError:
+            return math.nan
+        match = re.search(r'MemUsed:\s+(\d+) kB', text)
+        return int(match.group(1)) / 1024 if match else math.nan
+
+    def sample(self):
+        current = self._jiffies()
+        busy = []
+        for c in self.cpus:
+            total, idle = current.get(c, (0, 0))
+            prev_total, prev_idle = (self.previous or {}).get(c, (total, idle))
+            dt = total - prev_total
+            busy.append(100.0 * (dt - (idle - prev_idle)) / dt if dt > 0 else math.nan)
+        self.previous = current
+        mhz = [self._read_number(self.root / f"sys/devices/system/cpu/cpu{c}/cpufreq/scaling_cur_freq", 1e-3)
+               for c in self.cpus]
+        return busy + mhz + [self._node_used_mib(n) for n in self.numa_nodes]
+
+    def stop(self):
+        pass
+
+class TelemetrySampler:
+    """Polls every source each interval on a background thread into one ring buffer."""
+
+    def __init__(self, sources, interval=INTERVAL, capacity=CAPACITY):
+        self.sources = sources
+        self.interval = interval
+        self.columns = [c for s in sources for c in s.columns]
+        self.buffer = RingBuffer(capacity, len(self.columns))
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            row = []
+            for source in self.sources:
+                row.extend(source.sample())
+            self.buffer.append(time.time(), row)
+            if self.stopping.wait(self.interval):
+                break
+
+    def start(self):
+        for source in self.sources:
+            source.start()
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.thread.join()
+        for source in self.sources:
+            source.stop()
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        times, values = self.buffer.snapshot()
+        np.savez_compressed(path, time=times, values=values, columns=np.array(self.columns),
+                            interval=self.interval)
+        return path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def make_sampler(gpus=(), cpus=None, numa_nodes=None, interval=INTERVAL, capacity=CAPACITY,
+                 nvidia_smi='nvidia-smi', root='/'):
+    sources = [HostSource(cpus, numa_nodes, root)]
+    if gpus:
+        sources += [NvidiaSmiSource(gpus, nvidia_smi), PcieSource(gpus, nvidia_smi, interval)]
+    return TelemetrySampler(sources, interval, capacity)
+
+def load_telemetry(path):
+    with np.load(path) as data:
+        return {'time': data['time'], 'values': data['values'], 'columns': [str(c) for c in data['columns']],
+                'interval': float(data['interval'])}
+
+def metric_name(column):
+    """Per-core / per-node columns collapse into one metric (cpu12_mhz -> cpu_mhz); GPUs stay separate."""
+    return re.sub(r'^(cpu|numa)\d+_', r'\1_', column)
+
+def metric_means(telemetry, start, end):
+    """Mean of each metric over [start, end], widened to the nearest sample when the window is short."""
+    times, values = telemetry['time'], telemetry['values']
+    if len(times) == 0:
+        return {}
+    pad = telemetry['interval'] / 2
+    mask = (times >= start - pad) & (times <= end + pad)
+    if not mask.any():
+        mask = np.zeros(len(times), dtype=bool)
+        mask[np.argmin(np.abs(times - (start + end) / 2))] = True
+    window = values[mask]
+    groups = {}
+    for i, column in enumerate(telemetry['columns']):
+        groups.setdefault(metric_name(column), []).append(i)
+    means = {}
+    with np.errstate(all='ignore'):
+        for name, idx in groups.items():
+            cells = window[:, idx]
+            if name.endswith('throttle'):
+                finite = cells[np.isfinite(cells)].astype(np.int64)
+                means[name] = float(np.bitwise_or.reduce(finite)) if finite.size else math.nan
+            else:
+                means[name] = float(np.nanmean(cells)) if np.isfinite(cells).any() else math.nan
+    return means
+
+def test_start(record):
+    try:
+        return datetime.fromisoformat(record['test_time'].replace('Z', '+00:00')).timestamp()
+    except (KeyError, ValueError, AttributeError):
+        return None
+
+def test_span(record):
+    """(start, end) wall-clock bounds of a test, warmup and prefill included; None if unknown.
+
+    sweep.py stamps wall_start/wall_end as each record streams out. Older records only
+    have llama-bench's test_time (1 s resolution, before warmup), so the span is widened
+    by a second on each side to be sure it covers the timed repetitions.
+    """
+    if record.get('wall_end') is not None:
+        return record.get('wall_start', record['wall_end']), record['wall_end']
+    start = test_start(record)
+    if start is None:
+        return None
+    return start - 1, start + 1 + sum(record.get('samples_ns', [])) / 1e9
+
+def repetition_windows(record):
+    """(start, end, t/s) per repetition, walked back from when the test was printed.
+
+    Needs sweep.py's wall_end; llama-bench's test_time is too coarse and too early to place
+    single repetitions. Depth tests refill the KV cache untimed before every repetition, so
+    their gaps are unknown and they get no windows either.
+    """
+    end = record.get('wall_end')
+    if end is None or record.get('n_depth'):
+        return []
+    first = record.get('wall_start', -math.inf)
+    windows = []
+    for ns, ts in reversed(list(zip(record.get('samples_ns', []), record.get('samples_ts', [])))):
+        windows.append((max(end - ns / 1e9, first), end, ts))
+        end = max(end - ns / 1e9, first)
+    return windows[::-1]
+
+def run_power(telemetry, record):
+    """Mean GPU board power (W, summed over the job's GPUs) across a run's repetitions; nan if not sampled."""
+    windows = repetition_windows(record)
+    span = (windows[0][0], windows[-1][1]) if windows else test_span(record)
+    if span is None:
+        return math.nan
+    means = metric_means(telemetry, *span)
+    power = [v for name, v in means.items() if name.endswith('_power_w') and not math.isnan(v)]
+    return float(sum(power)) if power else math.nan
+
+def find_dips(record, threshold=DIP_THRESHOLD):
+    windows = repetition_windows(record)
+    if len(windows) < 3:
+        return []
+    median = float(np.median([ts for _, _, ts in windows]))
+    return [(k, start, end, ts, (median - ts) / median)
+            for k, (start, end, ts) in enumerate(windows) if ts < median * (1 - threshold)]
+
+def explain_dip(telemetry, start, end, span, threshold=CHANGE_THRESHOLD):
+    """Metrics that moved during the dip relative to the whole test span, largest change first."""
+    during = metric_means(telemetry, start, end)
+    baseline = metric_means(telemetry, *span)
+    changes = []
+    for name, value in during.items():
+        base = baseline.get(name, math.nan)
+        if name.endswith('throttle'):
+            if value and not math.isnan(value):
+                changes.append((name, value, base, math.inf))
+        elif base and not math.isnan(value) and not math.isnan(base) and abs(value - base) / abs(base) > threshold:
+            changes.append((name, value, base, (value - base) / abs(base)))
+    return sorted(changes, key=lambda c: -abs(c[3]))
+
+def format_change(name, value, base, change):
+    if name.endswith('throttle'):
+        return f"{name} 0x{int(value):x}"
+    return f"{name} {value:.0f} vs {base:.0f} ({change*100:+.0f}%)"
+
+def print_telemetry_dips(results_list, threshold=DIP_THRESHOLD, indent="   "):
+    """Throughput dips per repetition, with the telemetry that moved at the same time."""
+    found = False
+    loaded = {}
+    for result in results_list:
+        base_dir = Path(result['filepath']).parent
+        for config in result['configurations']:
+            for run in config.get('runs') or []:
+                if not run.get('telemetry'):
+                    continue
+                path = base_dir / run['telemetry']
+                if path not in loaded:
+                    loaded[path] = load_telemetry(path) if path.exists() else None
+                telemetry = loaded[path]
+                windows = repetition_windows(run)
+                if telemetry is None or not windows:
+                    continue
+                span = (windows[0][0], windows[-1][1])
+                for k, start, end, ts, drop in find_dips(run, threshold):
+                    found = True
+                    print(f"{indent}📉 {result['node']} / {config['name']} / {test_label(run)} rep {k + 1}: "
+                          f"{ts:.2f} t/s ({drop*100:.1f}% below median)")
+                    if end - start < 2 * telemetry['interval']:
+                        # One or two samples cannot say what happened during the repetition
+                        print(f"{indent}   too short to attribute ({(end - start) * 1000:.0f} ms, "
+                              f"sampled every {telemetry['interval']:g} s)")
+                        continue
+                    changes = explain_dip(telemetry, start, end, span)
+                    if changes:
+                        print(f"{indent}   " + "; ".join(format_change(*c) for c in changes[:4]))
+                    else:
+                        print(f"{indent}   no telemetry metric moved more than {CHANGE_THRESHOLD:.0%}")
+    if not found:
+        print(f"{indent}✅ No repetition dipped more than {threshold:.0%} below its test median")
+    return found
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sample hardware telemetry while a command runs")
+    parser.add_argument('--output', type=Path, required=True, help=".npz file to write")
+    parser.add_argument('--interval', type=float, default=INTERVAL, help="seconds between samples (default: %(default)s)")
+    parser.add_argument('--capacity', type=int, default=CAPACITY, help="ring buffer size (default: %(default)s)")
+    parser.add_argument('--gpus', default='', help="comma-separated GPU ids to poll")
+    parser.add_argument('--nvidia-smi', default='nvidia-smi', help="nvidia-smi binary or a fake")
+    parser.add_argument('--root', default='/', help="root holding proc/ and sys/ (a fake tree for testing)")
+    parser.add_argument('command', nargs=argparse.REMAINDER, help="command to run while sampling (after --)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    gpus = [g for g in args.gpus.split(',') if g.strip()]
+    sampler = make_sampler(gpus, interval=args.interval, capacity=args.capacity,
+                           nvidia_smi=args.nvidia_smi, root=args.root)
+    with sampler:
+        returncode = subprocess.call(command) if command else 0
+    sampler.save(args.output)
+    print(f"Telemetry: {sampler.buffer.count} samples x {len(sampler.columns)} metrics -> {args.output}",
+          file=sys.stderr)
+    return returncode
+
+if __name__ == "__main__":
+    sys.exit(main())
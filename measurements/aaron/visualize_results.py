@@ -1,22 +1,61 @@
 #!/usr/bin/env python3
 """
-Visualization script - reads analysis_*.md files
+Visualization script - reads the results store written by analyze_results.py
+(falls back to scraping the latest analysis_*.md when no store exists)
+
+Each figure is its own task, rendered in a process pool. A task is keyed by a
+hash of its data slice, its plotting code (with the helpers and perf_model
+constants it reaches) and the style, and a figure whose key matches the
+manifest from the last run is skipped; figures left without data are deleted. --preview renders
+quick low-dpi PNGs (no tight_layout) into <dir>/figures/preview/; the default is the
+final 300 dpi export. --dir points at the measurements directory (default under $HOME).
 """
 
-import matplotlib.pyplot as plt
-import numpy as np
+import argparse
+import hashlib
+import inspect
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from perf_model import (CONFIG_OFFLOAD, HARDWARE, MODELS, arithmetic_intensity,
+                        hardware_spec, identify_model)
+from kv_tradeoff import tradeoff_groups, variant_name
+from llama_bench_ingest import parse_test_label
+from model_matrix import model_groups
+from results_store import (STORE_FILENAME, kv_store_rows, load_store, model_store_rows, summarize_instances,
+                           summarize_shapes, summarize_store)
+from serving_latency import load_serving_runs, max_sustainable_rate, step_summary
+
 BENCHMARK_DIR = Path.home() / "perf-analysis-modeling-project/measurements/aaron"
-OUTPUT_DIR = BENCHMARK_DIR / "figures"
-OUTPUT_DIR.mkdir(exist_ok=True)
+MANIFEST_FILENAME = ".figure_manifest.json"
+
+FINAL_DPI = 300
+PREVIEW_DPI = 72
 
-plt.style.use('seaborn-v0_8-darkgrid')
+STYLE = 'seaborn-v0_8-darkgrid'
+plt.style.use(STYLE)
 colors = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#6A994E', '#8B5A3C']
 
-def find_latest_analysis():
-    files = sorted(BENCHMARK_DIR.glob("analysis_*.md"))
+def save_figure(path, preview):
+    """Write the current figure (final export or quick preview) and close it."""
+    fig = plt.gcf()
+    if preview:
+        fig.savefig(path, dpi=PREVIEW_DPI)
+    else:
+        fig.tight_layout()
+        fig.savefig(path, dpi=FINAL_DPI, bbox_inches='tight')
+    plt.close(fig)
+
+def find_latest_analysis(benchmark_dir):
+    files = sorted(benchmark_dir.glob("analysis_*.md"))
     if not files:
         raise FileNotFoundError("No analysis files found")
     return files[-1]
@@ -57,206 +96,636 @@ def parse_analysis(filepath):
     
     return data
 
-def create_visualizations(data):
-    if not data['cpu']:
-        print("⚠ No CPU baseline")
-        return
-    
-    cpu = data['cpu']
-    configs = data['configs']
+def load_results_store(filepath):
+    records = load_store(filepath)
+    configs = summarize_store(records)
+    for c in configs:
+        c.setdefault('pp512', 0.0)
+        c.setdefault('tg128', 0.0)
     
+    data = {'cpu': None, 'configs': configs, 'instances': summarize_instances(records),
+            'shapes': summarize_shapes(records), 'kv': tradeoff_groups(kv_store_rows(records)),
+            'models': model_groups(model_store_rows(records))}
+    # Same rule as analyze_results: the first CPU-only config that measured both tests
+    baseline = next((c for c in configs if c['is_cpu'] and c['pp512'] and c['tg128']), None)
+    if baseline:
+        data['cpu'] = {'pp512': baseline['pp512'], 'tg128': baseline['tg128']}
+    return data
+
+def plot_cpu_vs_gpu(configs):
     cpu_configs = [c for c in configs if c['is_cpu']]
     gpu_configs = [c for c in configs if not c['is_cpu']]
+    if not (cpu_configs and gpu_configs):
+        return False
     
-    # === FIGURE 1: CPU vs GPU ===
-    if cpu_configs and gpu_configs:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        fig.suptitle('CPU vs GPU Performance', fontsize=16, fontweight='bold')
-        
-        plot_configs = cpu_configs[:1]
-        for c in gpu_configs:
-            if 'Partial' in c['name'] or 'Full' in c['name']:
-                plot_configs.append(c)
-                if len(plot_configs) >= 3:
-                    break
-        
-        names = [c['name'].replace(' ', '\n') for c in plot_configs]
-        pp_vals = [c['pp512'] for c in plot_configs]
-        tg_vals = [c['tg128'] for c in plot_configs]
-        
-        bars = ax1.bar(names, pp_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
-        ax1.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
-        ax1.set_title('Prompt Processing (pp512)', fontsize=13, fontweight='bold')
-        ax1.set_yscale('log')
-        ax1.grid(True, alpha=0.3)
-        for bar in bars:
-            h = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        bars = ax2.bar(names, tg_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
-        ax2.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
-        ax2.set_title('Text Generation (tg128)', fontsize=13, fontweight='bold')
-        ax2.set_yscale('log')
-        ax2.grid(True, alpha=0.3)
-        for bar in bars:
-            h = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        plt.tight_layout()
-        plt.savefig(f'{OUTPUT_DIR}/1_cpu_vs_gpu.png', dpi=300, bbox_inches='tight')
-        print('✓ Saved: 1_cpu_vs_gpu.png')
-        plt.close()
-    
-    # === FIGURE 2: Speedup ===
-    if gpu_configs:
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        plot_configs = gpu_configs[:4]
-        names = [c['name'].replace(' ', '\n') for c in plot_configs]
-        pp_speedup = [c['pp512'] / cpu['pp512'] for c in plot_configs]
-        tg_speedup = [c['tg128'] / cpu['tg128'] for c in plot_configs]
-        
-        x = np.arange(len(names))
-        width = 0.35
-        
-        bars1 = ax.bar(x - width/2, pp_speedup, width, label='Prompt',
-                      color=colors[0], edgecolor='black', linewidth=1.2)
-        bars2 = ax.bar(x + width/2, tg_speedup, width, label='Generation',
-                      color=colors[1], edgecolor='black', linewidth=1.2)
-        
-        ax.set_ylabel('Speedup vs CPU', fontsize=12, fontweight='bold')
-        ax.set_title('GPU Acceleration Speedup', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels(names)
-        ax.legend(fontsize=11)
-        ax.set_yscale('log')
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                h = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., h, f'{h:.0f}x',
-                       ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        plt.tight_layout()
-        plt.savefig(f'{OUTPUT_DIR}/2_speedup.png', dpi=300, bbox_inches='tight')
-        print('✓ Saved: 2_speedup.png')
-        plt.close()
-    
-    # === FIGURE 3: Multi-GPU ===
-    multi_gpu = [c for c in gpu_configs if 'Dual' in c['name'] or 'Quad' in c['name'] or 'Single GPU' in c['name']]
-    if len(multi_gpu) > 1:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        fig.suptitle('Multi-GPU Scaling', fontsize=16, fontweight='bold')
-        
-        names = [c['name'].replace(' ', '\n') for c in multi_gpu]
-        pp_vals = [c['pp512'] for c in multi_gpu]
-        tg_vals = [c['tg128'] for c in multi_gpu]
-        
-        bars = ax1.bar(names, pp_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
-        ax1.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
-        ax1.set_title('Prompt Processing', fontsize=13, fontweight='bold')
-        ax1.grid(True, alpha=0.3)
-        if 'Single GPU' in multi_gpu[0]['name']:
-            ax1.axhline(y=pp_vals[0], color='red', linestyle='--', linewidth=2, label='Single GPU')
-            ax1.legend()
-        for bar in bars:
-            h = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., h, f'{h:.0f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        bars = ax2.bar(names, tg_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
-        ax2.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
-        ax2.set_title('Text Generation', fontsize=13, fontweight='bold')
-        ax2.grid(True, alpha=0.3)
-        if 'Single GPU' in multi_gpu[0]['name']:
-            ax2.axhline(y=tg_vals[0], color='red', linestyle='--', linewidth=2, label='Single GPU')
-            ax2.legend()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig.suptitle('CPU vs GPU Performance', fontsize=16, fontweight='bold')
+    
+    plot_configs = cpu_configs[:1]
+    for c in gpu_configs:
+        if 'Partial' in c['name'] or 'Full' in c['name']:
+            plot_configs.append(c)
+            if len(plot_configs) >= 3:
+                break
+    
+    names = [c['name'].replace(' ', '\n') for c in plot_configs]
+    pp_vals = [c['pp512'] for c in plot_configs]
+    tg_vals = [c['tg128'] for c in plot_configs]
+    
+    bars = ax1.bar(names, pp_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
+    ax1.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+    ax1.set_title('Prompt Processing (pp512)', fontsize=13, fontweight='bold')
+    ax1.set_yscale('log')
+    ax1.grid(True, alpha=0.3)
+    for bar in bars:
+        h = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+    
+    bars = ax2.bar(names, tg_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
+    ax2.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+    ax2.set_title('Text Generation (tg128)', fontsize=13, fontweight='bold')
+    ax2.set_yscale('log')
+    ax2.grid(True, alpha=0.3)
+    for bar in bars:
+        h = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+    
+    return True
+
+def plot_speedup(configs, cpu):
+    gpu_configs = [c for c in configs if not c['is_cpu']]
+    if not gpu_configs or not (cpu['pp512'] and cpu['tg128']):
+        return False
+    
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    plot_configs = gpu_configs[:4]
+    names = [c['name'].replace(' ', '\n') for c in plot_configs]
+    pp_speedup = [c['pp512'] / cpu['pp512'] for c in plot_configs]
+    tg_speedup = [c['tg128'] / cpu['tg128'] for c in plot_configs]
+    
+    x = np.arange(len(names))
+    width = 0.35
+    
+    bars1 = ax.bar(x - width/2, pp_speedup, width, label='Prompt',
+                  color=colors[0], edgecolor='black', linewidth=1.2)
+    bars2 = ax.bar(x + width/2, tg_speedup, width, label='Generation',
+                  color=colors[1], edgecolor='black', linewidth=1.2)
+    
+    ax.set_ylabel('Speedup vs CPU', fontsize=12, fontweight='bold')
+    ax.set_title('GPU Acceleration Speedup', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(names)
+    ax.legend(fontsize=11)
+    ax.set_yscale('log')
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    for bars in [bars1, bars2]:
         for bar in bars:
             h = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        plt.tight_layout()
-        plt.savefig(f'{OUTPUT_DIR}/3_multi_gpu.png', dpi=300, bbox_inches='tight')
-        print('✓ Saved: 3_multi_gpu.png')
-        plt.close()
+            ax.text(bar.get_x() + bar.get_width()/2., h, f'{h:.0f}x',
+                   ha='center', va='bottom', fontweight='bold', fontsize=9)
     
-    # === FIGURE 4: Hardware Comparison ===
+    return True
+
+def plot_multi_gpu(configs):
+    multi_gpu = [c for c in configs if not c['is_cpu'] and
+                 ('Dual' in c['name'] or 'Quad' in c['name'] or 'Single GPU' in c['name'])]
+    if len(multi_gpu) < 2:
+        return False
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig.suptitle('Multi-GPU Scaling', fontsize=16, fontweight='bold')
+    
+    names = [c['name'].replace(' ', '\n') for c in multi_gpu]
+    pp_vals = [c['pp512'] for c in multi_gpu]
+    tg_vals = [c['tg128'] for c in multi_gpu]
+    
+    bars = ax1.bar(names, pp_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
+    ax1.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+    ax1.set_title('Prompt Processing', fontsize=13, fontweight='bold')
+    ax1.grid(True, alpha=0.3)
+    if 'Single GPU' in multi_gpu[0]['name']:
+        ax1.axhline(y=pp_vals[0], color='red', linestyle='--', linewidth=2, label='Single GPU')
+        ax1.legend()
+    for bar in bars:
+        h = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., h, f'{h:.0f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+    
+    bars = ax2.bar(names, tg_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
+    ax2.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+    ax2.set_title('Text Generation', fontsize=13, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+    if 'Single GPU' in multi_gpu[0]['name']:
+        ax2.axhline(y=tg_vals[0], color='red', linestyle='--', linewidth=2, label='Single GPU')
+        ax2.legend()
+    for bar in bars:
+        h = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=9)
+    
+    return True
+
+def plot_hardware(configs):
     gpu_types = {}
-    for c in gpu_configs:
-        if 'Full' in c['name'] or 'Single GPU' in c['name']:
+    for c in configs:
+        if not c['is_cpu'] and ('Full' in c['name'] or 'Single GPU' in c['name']):
             gpu = c['gpu_type']
             if gpu not in gpu_types or c['pp512'] > gpu_types[gpu]['pp512']:
                 gpu_types[gpu] = c
+    if len(gpu_types) < 2:
+        return False
     
-    if len(gpu_types) >= 2:
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        fig.suptitle('Hardware Comparison', fontsize=16, fontweight='bold')
-        
-        names = [gpu.replace('NVIDIA ', '') for gpu in gpu_types.keys()]
-        pp_vals = [c['pp512'] for c in gpu_types.values()]
-        tg_vals = [c['tg128'] for c in gpu_types.values()]
-        
-        bars = ax1.bar(names, pp_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
-        ax1.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
-        ax1.set_title('Prompt Processing', fontsize=13, fontweight='bold')
-        ax1.grid(True, alpha=0.3)
-        for bar in bars:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig.suptitle('Hardware Comparison', fontsize=16, fontweight='bold')
+    
+    names = [gpu.replace('NVIDIA ', '') for gpu in gpu_types.keys()]
+    pp_vals = [c['pp512'] for c in gpu_types.values()]
+    tg_vals = [c['tg128'] for c in gpu_types.values()]
+    
+    bars = ax1.bar(names, pp_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
+    ax1.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+    ax1.set_title('Prompt Processing', fontsize=13, fontweight='bold')
+    ax1.grid(True, alpha=0.3)
+    for bar in bars:
+        h = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., h, f'{h:.0f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
+    
+    speedup = max(pp_vals) / min(pp_vals)
+    ax1.text(0.5, max(pp_vals)*0.5, f'{speedup:.2f}x faster',
+            ha='center', fontsize=12, fontweight='bold',
+            bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+    
+    bars = ax2.bar(names, tg_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
+    ax2.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+    ax2.set_title('Text Generation', fontsize=13, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+    for bar in bars:
+        h = bar.get_height()
+        ax2.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
+                ha='center', va='bottom', fontweight='bold', fontsize=10)
+    
+    return True
+
+
+def plot_roofline(configs):
+    """Attained FLOP/s vs arithmetic intensity; pp512 shares one weight read
+    across the 512-token ubatch, tg reads every weight per token."""
+    hardware = {}
+    points = []
+    for c in configs:
+        spec_name = c.get('cpu_model') if c['is_cpu'] else c['gpu_type']
+        if hardware_spec(spec_name) is None:
+            continue
+        # Only configs that run entirely on one kind of device sit under a single roof
+        if not c['is_cpu'] and CONFIG_OFFLOAD.get(c['name'], (99, []))[0] < 99:
+            continue
+        model, quant = identify_model(c.get('model'))
+        if model is None or quant is None:
+            continue
+        key = next(k for k in HARDWARE if k in spec_name)
+        hardware[key] = HARDWARE[key]
+        flops_per_token = 2 * MODELS[model]['params']
+        for test, tokens, marker in [('pp512', 512, 'o'), ('tg128', 1, '^')]:
+            if c.get(test):
+                points.append((key, arithmetic_intensity(model, quant, tokens),
+                               c[test] * flops_per_token, marker))
+    if not points:
+        return False
+    
+    fig, ax = plt.subplots(figsize=(12, 7))
+    ai = np.logspace(-1, 4, 200)
+    for i, (key, spec) in enumerate(hardware.items()):
+        color = colors[i % len(colors)]
+        ax.plot(ai, np.minimum(spec['flops'], ai * spec['bandwidth']), color=color,
+                linewidth=2, label=f'{key} roof')
+        for k, x, y, marker in points:
+            if k == key:
+                ax.scatter(x, y, color=color, marker=marker, s=80, edgecolor='black', zorder=3)
+    ax.scatter([], [], color='gray', marker='o', edgecolor='black', label='pp512')
+    ax.scatter([], [], color='gray', marker='^', edgecolor='black', label='tg128')
+    
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Arithmetic Intensity (FLOP/byte of weights)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Attained FLOP/s', fontsize=12, fontweight='bold')
+    ax.set_title('Roofline', fontsize=16, fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3, which='both')
+    
+    return True
+
+def plot_multi_instance(instances):
+    """Aggregate t/s per layout against N x solo, with the interference slowdown."""
+    tests = [t for t in ['pp512', 'tg128'] if any(e['test'] == t for e in instances)]
+    if not tests:
+        return False
+    
+    fig, axes = plt.subplots(1, len(tests), figsize=(7 * len(tests), 6), squeeze=False)
+    fig.suptitle('Multi-instance Aggregate Throughput', fontsize=16, fontweight='bold')
+    for ax, test in zip(axes[0], tests):
+        entries = sorted((e for e in instances if e['test'] == test),
+                         key=lambda e: (e['node'], e['instances'], e['layout']))
+        nodes = {e['node'] for e in entries}
+        names = [e['layout'] if len(nodes) == 1 else f"{e['node']}\n{e['layout']}" for e in entries]
+        x = np.arange(len(entries))
+        bars = ax.bar(x, [e['aggregate'] for e in entries], color=colors[:len(entries)] * 2,
+                      edgecolor='black', linewidth=1.2)
+        for i, (bar, e) in enumerate(zip(bars, entries)):
             h = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2., h, f'{h:.0f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=10)
-        
-        speedup = max(pp_vals) / min(pp_vals)
-        ax1.text(0.5, max(pp_vals)*0.5, f'{speedup:.2f}x faster',
-                ha='center', fontsize=12, fontweight='bold',
-                bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
+            label = f'{h:.1f}'
+            if e['solo'] and e['instances'] > 1:
+                ideal = e['solo'] * e['instances']
+                ax.plot([i - 0.4, i + 0.4], [ideal, ideal], 'k--', linewidth=1.5,
+                        label=None if ax.get_legend_handles_labels()[1] else 'N × solo')
+                label += f'\n({(1 - e["per_instance"] / e["solo"]) * 100:+.1f}% interference)'
+            ax.text(bar.get_x() + bar.get_width()/2., h, label,
+                    ha='center', va='bottom', fontweight='bold', fontsize=9)
+        ax.set_xticks(x)
+        ax.set_xticklabels(names)
+        ax.set_ylabel('Aggregate Tokens/Second', fontsize=12, fontweight='bold')
+        ax.set_title(f'{test}', fontsize=13, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        if ax.get_legend_handles_labels()[1]:
+            ax.legend()
+    
+    return True
+
+def plot_serving_latency(runs):
+    """TTFT and TPOT percentiles against offered request rate, per serving run."""
+    if not runs:
+        return False
+    
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    fig.suptitle('Serving Latency vs Load', fontsize=16, fontweight='bold')
+    for i, (name, steps) in enumerate(runs.items()):
+        summaries = [step_summary(s) for s in steps]
+        rates = [s['target_rate'] for s in summaries]
+        label = steps[0].get('node') or name
+        color = colors[i % len(colors)]
+        for ax, metric in ((ax1, 'ttft'), (ax2, 'tpot')):
+            ax.plot(rates, [s[f'{metric}_p50'] * 1000 for s in summaries], 'o-', color=color,
+                    linewidth=2, label=f'{label} p50')
+            ax.plot(rates, [s[f'{metric}_p99'] * 1000 for s in summaries], 's--', color=color,
+                    linewidth=2, label=f'{label} p99')
         
-        bars = ax2.bar(names, tg_vals, color=colors[:len(names)], edgecolor='black', linewidth=1.2)
-        ax2.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
-        ax2.set_title('Text Generation', fontsize=13, fontweight='bold')
-        ax2.grid(True, alpha=0.3)
-        for bar in bars:
-            h = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width()/2., h, f'{h:.1f}',
-                    ha='center', va='bottom', fontweight='bold', fontsize=10)
+        slo = {(m, float(p)): v for m, p, v in steps[0].get('slo') or []}
+        for ax, metric in ((ax1, 'ttft'), (ax2, 'tpot')):
+            for (slo_metric, pct), limit in slo.items():
+                if slo_metric == metric:
+                    ax.axhline(limit * 1000, color=color, linestyle=':', linewidth=1.5,
+                               label=f'SLO p{pct:g} {limit*1000:g} ms')
+        best = max_sustainable_rate(steps, slo) if slo else None
+        if best is not None:
+            for ax in (ax1, ax2):
+                ax.axvline(best, color=color, alpha=0.4, linewidth=6)
+            ax1.annotate(f'max {best:.2f} req/s', xy=(best, ax1.get_ylim()[1]), xytext=(5, -15),
+                         textcoords='offset points', fontweight='bold', color=color)
+    
+    for ax, title in ((ax1, 'Time to First Token'), (ax2, 'Time per Output Token')):
+        ax.set_xlabel('Offered Requests/Second', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Latency (ms)', fontsize=12, fontweight='bold')
+        ax.set_title(title, fontsize=13, fontweight='bold')
+        ax.set_yscale('log')
+        ax.legend(fontsize=9)
+        ax.grid(True, alpha=0.3, which='both')
+    
+    return True
+
+def plot_shape_scaling(grids, max_panels=6):
+    """Depth x ubatch heatmap per (setup, test shape); a line over depth or ubatch when only one varies."""
+    if not grids:
+        return False
+    
+    keys = sorted(grids)[:max_panels]
+    multi_node = len({key[0] for key in keys}) > 1
+    multi_model = len({key[1] for key in keys}) > 1
+    ncols = min(3, len(keys))
+    nrows = (len(keys) + ncols - 1) // ncols
+    fig, axes = plt.subplots(nrows, ncols, figsize=(6 * ncols, 5 * nrows), squeeze=False)
+    fig.suptitle('Throughput vs KV Depth and ubatch', fontsize=16, fontweight='bold')
+    
+    for ax, key in zip(axes.flat, keys):
+        node, model, setup, shape = key
+        grid = grids[key]
+        depths = sorted({d for d, _ in grid})
+        ubatches = sorted({u for _, u in grid})
+        ub_names = [str(u) if u else 'default' for u in ubatches]
         
-        plt.tight_layout()
-        plt.savefig(f'{OUTPUT_DIR}/4_hardware.png', dpi=300, bbox_inches='tight')
-        print('✓ Saved: 4_hardware.png')
-        plt.close()
+        if len(depths) > 1 and len(ubatches) > 1:
+            surface = np.array([[grid.get((d, u), np.nan) for u in ubatches] for d in depths])
+            im = ax.imshow(surface, aspect='auto', cmap='viridis', origin='lower')
+            for i in range(len(depths)):
+                for j in range(len(ubatches)):
+                    if not np.isnan(surface[i, j]):
+                        ax.text(j, i, f'{surface[i, j]:.0f}', ha='center', va='center',
+                                color='white', fontsize=9, fontweight='bold')
+            ax.set_xticks(range(len(ubatches)))
+            ax.set_xticklabels(ub_names)
+            ax.set_yticks(range(len(depths)))
+            ax.set_yticklabels([str(d) for d in depths])
+            ax.set_xlabel('ubatch', fontsize=12, fontweight='bold')
+            ax.set_ylabel('KV Depth (tokens)', fontsize=12, fontweight='bold')
+            ax.grid(False)
+            fig.colorbar(im, ax=ax, label='Tokens/Second')
+        elif len(depths) > 1:
+            for j, u in enumerate(ubatches):
+                points = [(d, grid[(d, u)]) for d in depths if (d, u) in grid]
+                ax.plot([p[0] for p in points], [p[1] for p in points], 'o-', color=colors[j % len(colors)],
+                        linewidth=2, markersize=7, label=f'ub {ub_names[j]}')
+            ax.set_xscale('symlog', linthresh=1024, base=2)
+            ax.set_xlabel('KV Depth (tokens)', fontsize=12, fontweight='bold')
+            ax.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+            ax.set_ylim(bottom=0)
+            ax.grid(True, alpha=0.3)
+        else:
+            values = [grid[(depths[0], u)] for u in ubatches]
+            ax.plot(range(len(ubatches)), values, 'o-', color=colors[0], linewidth=2, markersize=7)
+            ax.set_xticks(range(len(ubatches)))
+            ax.set_xticklabels(ub_names)
+            ax.set_xlabel('ubatch', fontsize=12, fontweight='bold')
+            ax.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+            ax.set_ylim(bottom=0)
+            ax.grid(True, alpha=0.3)
+        subtitle = " | ".join(([model] if multi_model else []) + ([node] if multi_node else []))
+        ax.set_title(f"{shape} | {setup}" + (f"\n{subtitle}" if subtitle else ""), fontsize=11, fontweight='bold')
+    
+    for ax in list(axes.flat)[len(keys):]:
+        ax.axis('off')
+    
+    return True
 
-def main():
+def plot_kv_tradeoff(tradeoffs, max_panels=6):
+    """t/s against GPU-resident KV memory per KV variant at each shape's deepest context, with the Pareto front."""
+    deepest = {}
+    for (node, model, base, test), entries in tradeoffs.items():
+        if all(e['gpu_kv'] is None for e in entries):
+            continue
+        shape, depth = test.split(' @ ')[0], parse_test_label(test)[2]
+        key = (node, model, base, shape)
+        if key not in deepest or depth > deepest[key][0]:
+            deepest[key] = (depth, test, entries)
+    if not deepest:
+        return False
+    
+    keys = sorted(deepest)[:max_panels]
+    multi_node = len({key[0] for key in keys}) > 1
+    multi_model = len({key[1] for key in keys}) > 1
+    ncols = min(3, len(keys))
+    nrows = (len(keys) + ncols - 1) // ncols
+    fig, axes = plt.subplots(nrows, ncols, figsize=(6 * ncols, 5 * nrows), squeeze=False)
+    fig.suptitle('KV Cache Trade-off: Throughput vs GPU KV Memory', fontsize=16, fontweight='bold')
+    
+    for ax, key in zip(axes.flat, keys):
+        node, model, base, shape = key
+        _, test, entries = deepest[key]
+        entries = [e for e in entries if e['gpu_kv'] is not None]
+        for i, e in enumerate(entries):
+            ax.scatter(e['gpu_kv'] / 2**30, e['tps'], s=120 if e['pareto'] else 60,
+                       color=colors[i % len(colors)], edgecolor='black', linewidth=1.2 if e['pareto'] else 0.5,
+                       marker='*' if e['pareto'] else 'o', zorder=3)
+            ax.annotate(variant_name(e), (e['gpu_kv'] / 2**30, e['tps']), xytext=(5, 5),
+                        textcoords='offset points', fontsize=8)
+        front = [e for e in entries if e['pareto']]
+        ax.step([e['gpu_kv'] / 2**30 for e in front], [e['tps'] for e in front], where='post',
+                color='black', linestyle='--', linewidth=1.5, label='Pareto front', zorder=2)
+        ax.set_xlabel('GPU KV Cache (GiB)', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Tokens/Second', fontsize=12, fontweight='bold')
+        subtitle = " | ".join(([model] if multi_model else []) + ([node] if multi_node else []))
+        ax.set_title(f"{test} | {base}" + (f"\n{subtitle}" if subtitle else ""), fontsize=11, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=9)
+    
+    for ax in list(axes.flat)[len(keys):]:
+        ax.axis('off')
+    
+    return True
+
+def plot_model_matrix(groups):
+    """Speed-per-byte curves: tg t/s vs weight GB and pp t/s vs params, one series per setup."""
+    if not groups:
+        return False
+    
+    multi_node = len({node for node, _ in groups}) > 1
+    fig, (ax_tg, ax_pp) = plt.subplots(1, 2, figsize=(16, 6))
+    fig.suptitle('Model Matrix: Throughput vs Model Size and Quantization', fontsize=16, fontweight='bold')
+    
+    for i, ((node, setup), rows) in enumerate(sorted(groups.items())):
+        color = colors[i % len(colors)]
+        label = f"{setup} ({node})" if multi_node else setup
+        tg_rows = sorted((r for r in rows if r['tg'] and r['size_gb']), key=lambda r: r['size_gb'])
+        pp_rows = sorted((r for r in rows if r['pp'] and r['params_b']), key=lambda r: r['params_b'])
+        ax_tg.plot([r['size_gb'] for r in tg_rows], [r['tg'] for r in tg_rows], 'o-', color=color,
+                   linewidth=2, markersize=8, label=label)
+        ax_pp.plot([r['params_b'] for r in pp_rows], [r['pp'] for r in pp_rows], 's-', color=color,
+                   linewidth=2, markersize=8, label=label)
+        for r in tg_rows:
+            ax_tg.annotate(f"{r['name']} {r['quant']}", (r['size_gb'], r['tg']), xytext=(5, 5),
+                           textcoords='offset points', fontsize=8)
+        for r in pp_rows:
+            ax_pp.annotate(f"{r['name']} {r['quant']}", (r['params_b'], r['pp']), xytext=(5, 5),
+                           textcoords='offset points', fontsize=8)
+        if len(tg_rows) > 1:
+            # Constant weight bandwidth: t/s = GB/s / GB
+            bandwidth = np.mean([r['tg_gbps'] for r in tg_rows])
+            sizes = np.geomspace(tg_rows[0]['size_gb'], tg_rows[-1]['size_gb'], 50)
+            ax_tg.plot(sizes, bandwidth / sizes, ':', color=color, linewidth=1.2, alpha=0.7)
+    
+    ax_tg.set_xlabel('Weights (GB)', fontsize=12, fontweight='bold')
+    ax_tg.set_ylabel('tg128 Tokens/Second', fontsize=12, fontweight='bold')
+    ax_tg.set_title('Generation (dotted: constant weight GB/s)', fontsize=13, fontweight='bold')
+    ax_pp.set_xlabel('Parameters (B)', fontsize=12, fontweight='bold')
+    ax_pp.set_ylabel('pp512 Tokens/Second', fontsize=12, fontweight='bold')
+    ax_pp.set_title('Prompt Processing', fontsize=13, fontweight='bold')
+    for ax in (ax_tg, ax_pp):
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.grid(True, alpha=0.3, which='both')
+        ax.legend(fontsize=9)
+    
+    return True
+
+def figure_tasks(data, benchmark_dir):
+    """[(filename, plot function, args)]: one independent task per figure; a plot
+    function draws onto the current figure and returns False when it has no data."""
+    tasks = []
+    if data['cpu']:
+        configs = data['configs']
+        tasks += [
+            ('1_cpu_vs_gpu.png', plot_cpu_vs_gpu, (configs,)),
+            ('2_speedup.png', plot_speedup, (configs, data['cpu'])),
+            ('3_multi_gpu.png', plot_multi_gpu, (configs,)),
+            ('4_hardware.png', plot_hardware, (configs,)),
+            ('5_roofline.png', plot_roofline, (configs,)),
+        ]
+    else:
+        print("⚠ No CPU baseline")
+    tasks += [
+        ('6_multi_instance.png', plot_multi_instance, (data.get('instances') or [],)),
+        ('7_serving_latency.png', plot_serving_latency, (load_serving_runs(benchmark_dir),)),
+        ('8_depth_ubatch.png', plot_shape_scaling, (data.get('shapes') or {},)),
+        ('9_kv_tradeoff.png', plot_kv_tradeoff, (data.get('kv') or {},)),
+        ('10_model_matrix.png', plot_model_matrix, (data.get('models') or {},)),
+    ]
+    return tasks
+
+def code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= code_names(const)
+    return names
+
+def figure_sources(func):
+    """Source of func and every function of ours it reaches through globals, plus the constants they read."""
+    here = Path(__file__).resolve().parent
+    parts, seen, todo = [], set(), [func]
+    while todo:
+        f = todo.pop()
+        if f in seen:
+            continue
+        seen.add(f)
+        parts.append(inspect.getsource(f))
+        for name in sorted(code_names(f.__code__)):
+            value = f.__globals__.get(name)
+            if inspect.isfunction(value):
+                if Path(inspect.getfile(value)).resolve().parent == here:
+                    todo.append(value)
+            elif isinstance(value, (dict, list, tuple, str, int, float)):
+                parts.append(f"{f.__module__}.{name} = {value!r}")
+            elif isinstance(value, re.Pattern):
+                parts.append(f"{f.__module__}.{name} = {value.pattern!r}")
+    return parts
+
+def figure_key(filename, func, args, preview):
+    """Hash of everything that decides a figure's pixels: data slice, plotting code (helpers and
+    perf_model constants included), style and mode."""
+    content = repr((filename, args, figure_sources(func) + figure_sources(save_figure), STYLE, colors, preview,
+                    PREVIEW_DPI if preview else FINAL_DPI))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def render_figure(filename, func, args, output_dir, preview):
+    """Pool task: draw and save one figure; False when its data is empty and nothing was written."""
+    if not func(*args):
+        return False
+    save_figure(Path(output_dir) / filename, preview)
+    return True
+
+def load_manifest(path):
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(manifest, path):
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    os.replace(tmp_path, path)
+
+def drop_figure(manifest, output_dir, filename):
+    manifest.pop(filename, None)
+    (output_dir / filename).unlink(missing_ok=True)
+
+def render_figures(tasks, output_dir, preview=False, workers=None, force=False):
+    """Render stale figures in parallel; returns (rendered, unchanged) filenames.
+
+    Figures that no longer have data (their task returned False or is gone) are
+    removed along with their manifest entry, so an old PNG never outlives its data.
+    """
+    manifest_path = output_dir / MANIFEST_FILENAME
+    manifest = load_manifest(manifest_path)
+    for filename in set(manifest) - {t[0] for t in tasks}:
+        drop_figure(manifest, output_dir, filename)
+    if force:
+        manifest = {}
+    stale, unchanged = [], []
+    for filename, func, args in tasks:
+        key = figure_key(filename, func, args, preview)
+        if manifest.get(filename) == key and (output_dir / filename).exists():
+            unchanged.append(filename)
+        else:
+            stale.append((filename, func, args, key))
+    
+    rendered = []
+    workers = min(workers or os.cpu_count() or 1, len(stale))
+    if workers <= 1:
+        results = ((t, render_figure(*t[:3], output_dir, preview)) for t in stale)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        futures = {pool.submit(render_figure, *t[:3], output_dir, preview): t for t in stale}
+        results = ((futures[f], f.result()) for f in as_completed(futures))
+    for (filename, _, _, key), written in results:
+        if written:
+            print(f'✓ Saved: {filename}')
+            manifest[filename] = key
+            rendered.append(filename)
+        else:
+            drop_figure(manifest, output_dir, filename)
+    if workers > 1:
+        pool.shutdown()
+    
+    for filename in unchanged:
+        print(f'= Unchanged: {filename}')
+    save_manifest(manifest, manifest_path)
+    return rendered, unchanged
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render figures from the analysis results store")
+    parser.add_argument('--dir', type=Path, default=BENCHMARK_DIR,
+                        help=f"directory holding {STORE_FILENAME} or analysis_*.md; figures go to <dir>/figures/ "
+                             "(default: %(default)s)")
+    parser.add_argument('--preview', action='store_true',
+                        help=f"quick {PREVIEW_DPI} dpi PNGs without tight_layout, in <dir>/figures/preview/")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="figures rendered in parallel (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="re-render figures whose data has not changed")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    output_dir = args.dir / 'figures'
+    if args.preview:
+        output_dir /= 'preview'
+    
     print("="*70)
     print("VISUALIZATION GENERATION")
     print("="*70)
     
-    try:
-        analysis_file = find_latest_analysis()
-        print(f"\n✓ Found: {analysis_file.name}")
-    except FileNotFoundError as e:
-        print(f"\n✗ {e}")
-        return
-    
-    print("\nParsing analysis file...")
-    data = parse_analysis(analysis_file)
+    store_file = args.dir / STORE_FILENAME
+    if store_file.exists():
+        print(f"\n✓ Found: {store_file.name}")
+        print("\nLoading results store...")
+        data = load_results_store(store_file)
+    else:
+        try:
+            analysis_file = find_latest_analysis(args.dir)
+            print(f"\n✓ Found: {analysis_file.name}")
+        except FileNotFoundError as e:
+            print(f"\n✗ {e}")
+            return
+        
+        print("\nParsing analysis file...")
+        data = parse_analysis(analysis_file)
     
     if data['cpu']:
         print(f"✓ CPU baseline: {data['cpu']['pp512']:.2f} t/s")
     print(f"✓ Found {len(data['configs'])} configurations")
     
-    print(f"\nGenerating figures in: {OUTPUT_DIR}")
+    print(f"\nGenerating {'preview' if args.preview else 'final'} figures in: {output_dir}")
     print("-" * 70)
     
-    create_visualizations(data)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rendered, unchanged = render_figures(figure_tasks(data, args.dir), output_dir, args.preview, args.workers, args.force)
     
     print("-" * 70)
-    print("\n✅ COMPLETE!")
-    print(f"\nFigures saved to: {OUTPUT_DIR}")
-    for f in sorted(OUTPUT_DIR.glob("*.png")):
-        print(f"  • {f.name}")
+    print(f"\n✅ COMPLETE! ({len(rendered)} rendered, {len(unchanged)} unchanged)")
+    print(f"\nFigures saved to: {output_dir}")
+    for name in sorted(rendered + unchanged):
+        print(f"  • {name}")
     print("="*70)
 
 if __name__ == "__main__":
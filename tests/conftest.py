@@ -0,0 +1,31 @@
+"""
+Shared fixtures: both script directories on sys.path, the fake binaries,
+and a fake NUMA sysfs tree so sweeps run the same on any machine.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ROOT / "benchmarking_scripts"
+ANALYSIS = ROOT / "measurements" / "aaron"
+sys.path[:0] = [str(SCRIPTS), str(ANALYSIS)]
+
+FAKE_LLAMA_BENCH = SCRIPTS / "fake_llama_bench.py"
+FAKE_NVIDIA_SMI = SCRIPTS / "fake_nvidia_smi.py"
+MOCK_LLAMA_SERVER = SCRIPTS / "mock_llama_server.py"
+
+@pytest.fixture
+def numa_sysfs(tmp_path):
+    """Two NUMA nodes of four CPUs each, laid out like /sys/devices/system/node."""
+    root = tmp_path / "sys" / "devices" / "system" / "node"
+    for node, cpulist in enumerate(["0-3", "4-7"]):
+        (root / f"node{node}").mkdir(parents=True)
+        (root / f"node{node}" / "cpulist").write_text(cpulist + "\n")
+    return root
+
+@pytest.fixture
+def fast_fakes(monkeypatch):
+    monkeypatch.setenv('FAKE_LLAMA_BENCH_SECONDS', '0')
@@ -0,0 +1,96 @@
+import math
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from analyze_results import parse_llama_bench_output
+from conftest import FAKE_LLAMA_BENCH
+from dashboard import lttb
+from detect_regressions import check_run, find_change_point
+from serving_latency import LatencyHistogram, parse_slo
+
+@pytest.mark.parametrize('value_us', [0, 1, 63, 64, 127, 128, 1000, 12345, 999999, 2**40 + 12345])
+def test_histogram_bucket_round_trip(value_us):
+    low, high = LatencyHistogram.bucket_range(LatencyHistogram.bucket(value_us))
+    assert low <= value_us <= high
+    if value_us >= 2**7:
+        assert (high - low + 1) / low < 0.016
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in range(1, 1001):
+        hist.record(ms / 1000)
+    for q in [50, 90, 99, 99.9]:
+        assert hist.percentile(q) == pytest.approx(q / 100, rel=0.016)
+    assert hist.percentile(100) <= 1.0
+    assert hist.mean() == pytest.approx(0.5005)
+    assert math.isnan(LatencyHistogram().percentile(50))
+
+def test_histogram_serializes_and_merges():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for s in [0.010, 0.020, 0.030]:
+        a.record(s)
+    b.record(0.5)
+    restored = LatencyHistogram.from_dict(a.to_dict())
+    assert restored.counts == a.counts and restored.total == 3
+    restored.merge(b)
+    assert restored.total == 4 and restored.min_us == 10000 and restored.max_us == 500000
+    assert restored.percentile(100) == pytest.approx(0.5, rel=0.016)
+
+def test_parse_slo():
+    assert parse_slo("ttft_p99=2000, tpot_p99_9=100") == {('ttft', 99.0): 2.0, ('tpot', 99.9): 0.1}
+    assert parse_slo("") == {}
+    for bad in ["ttfb_p99=10", "ttft=10"]:
+        with pytest.raises(ValueError):
+            parse_slo(bad)
+
+def test_check_run():
+    assert check_run(2, 100.0, 1.0, 50.0) is None             # too little history
+    assert check_run(5, 100.0, 1.0, 97.0) is None             # within the threshold
+    assert check_run(5, 100.0, 10.0, 80.0) is None            # within the noise
+    assert check_run(5, 100.0, 1.0, 90.0) == pytest.approx(0.10)
+    assert check_run(5, 100.0, 0.0, 90.0) == pytest.approx(0.10)
+
+def test_find_change_point():
+    rng = np.random.default_rng(0)
+    values = list(100 + rng.normal(0, 0.5, 20)) + list(90 + rng.normal(0, 0.5, 10))
+    index, drop, t = find_change_point(values)
+    assert index == 20
+    assert drop == pytest.approx(0.10, abs=0.01)
+    assert find_change_point(list(100 + rng.normal(0, 0.5, 30))) is None
+    assert find_change_point([100.0] * 10 + [110.0] * 10) is None   # a speedup is not a regression
+    assert find_change_point([100.0, 90.0]) is None
+
+def test_lttb():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500] = 10
+    sx, sy = lttb(x, y, 100)
+    assert len(sx) == 100
+    assert sx[0] == 0 and sx[-1] == 999
+    assert np.all(np.diff(sx) > 0)
+    assert 10 in sy                     # the spike survives downsampling
+    assert len(lttb(x[:50], y[:50], 100)[0]) == 50   # short series pass through
+
+def fake_records(visible_devices, *args):
+    env = dict(os.environ, FAKE_LLAMA_BENCH_SECONDS='0', CUDA_VISIBLE_DEVICES=visible_devices)
+    return subprocess.run([sys.executable, str(FAKE_LLAMA_BENCH), '-o', 'jsonl', '-r', '2', *args],
+                          env=env, capture_output=True, text=True, check=True).stdout
+
+def test_gpu_type_looks_past_cpu_only_records(tmp_path):
+    # A sweep that starts with an ngl=0 job: its records carry no gpu_info
+    path = tmp_path / "benchmark_results_sweep.jsonl"
+    path.write_text(fake_records("", '-ngl', '0') + fake_records("0", '-ngl', '99')
+                    + fake_records("0,1", '-ngl', '99', '-ts', '1/1'))
+    results = parse_llama_bench_output(path)
+    assert results['gpu_type'] == "NVIDIA A30"
+    assert results['gpu_count'] == 2
+
+def test_cpu_only_file_has_no_gpu(tmp_path):
+    path = tmp_path / "benchmark_results_cpu.jsonl"
+    path.write_text(fake_records("", '-ngl', '0'))
+    results = parse_llama_bench_output(path)
+    assert results['gpu_type'] is None and results['gpu_count'] is None
@@ -0,0 +1,60 @@
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import load_generator
+from conftest import FAKE_NVIDIA_SMI, MOCK_LLAMA_SERVER
+from serving_latency import LatencyHistogram, load_serving_runs, max_sustainable_rate
+from telemetry import load_telemetry, make_sampler, metric_means
+
+def sample_gpus(tmp_path, seconds=0.5):
+    sampler = make_sampler(['0', '1'], interval=0.1, nvidia_smi=str(FAKE_NVIDIA_SMI))
+    with sampler:
+        time.sleep(seconds)
+    telemetry = load_telemetry(sampler.save(tmp_path / "telemetry.npz"))
+    return metric_means(telemetry, telemetry['time'][0], telemetry['time'][-1])
+
+def test_telemetry_from_fake_nvidia_smi(tmp_path, monkeypatch):
+    monkeypatch.setenv('FAKE_POWER_W', '200')
+    means = sample_gpus(tmp_path)
+    for gpu in ('gpu0', 'gpu1'):
+        assert means[f'{gpu}_power_w'] == pytest.approx(200, rel=0.05)
+        assert means[f'{gpu}_throttle'] == 0
+        assert means[f'{gpu}_pcie_rx_mbps'] > 0
+
+def test_telemetry_sees_fake_throttling(tmp_path, monkeypatch):
+    flag = tmp_path / "throttle"
+    flag.touch()
+    monkeypatch.setenv('FAKE_THROTTLE_FILE', str(flag))
+    assert sample_gpus(tmp_path)['gpu0_throttle'] == 4
+
+@pytest.fixture
+def mock_server():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, str(MOCK_LLAMA_SERVER), '--port', str(port), '--slots', '2',
+                             '--tps', '100'], stdout=subprocess.PIPE, text=True)
+    try:
+        assert "mock llama-server" in proc.stdout.readline()
+        yield f"http://127.0.0.1:{port}/completion"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def test_load_generator_against_mock_server(tmp_path, mock_server):
+    assert load_generator.main(['--url', mock_server, '--rates', '2,8', '--duration', '1', '--arrival', 'constant',
+                                '--prompt-tokens', '64', '--n-predict', '64', '--seed', '1',
+                                '--slo', 'ttft_p99=300', '--output-dir', str(tmp_path), '--node', 'testnode']) == 0
+    [steps] = load_serving_runs(tmp_path).values()
+    assert [s['target_rate'] for s in steps] == [2, 8]
+    for step in steps:
+        assert step['n_errors'] == 0
+        assert LatencyHistogram.from_dict(step['e2e']).total == step['n_requests']
+    # 64 tokens at 100 t/s hold a slot for ~0.7 s: 2 req/s never queues, 8 req/s on two slots does
+    tpot = LatencyHistogram.from_dict(steps[0]['tpot']).percentile(50)
+    assert tpot == pytest.approx(1 / 100, rel=0.5)
+    assert max_sustainable_rate(steps, {('ttft', 99.0): 0.3}) == 2
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+import sweep
+from conftest import FAKE_LLAMA_BENCH
+from sweep import (ResourcePool, completed_points, expand_range, make_jobs, read_journal, remaining_job,
+                   repair_journal)
+
+def test_expand_range():
+    assert expand_range("1-4") == [1, 2, 3, 4]
+    assert expand_range("0-8+4") == [0, 4, 8]
+    assert expand_range("1-16*2") == [1, 2, 4, 8, 16]
+    assert expand_range("5/5/3/3") == ["5/5/3/3"]
+    assert expand_range(99) == [99]
+    with pytest.raises(ValueError):
+        expand_range("1-8*1")
+
+def test_make_jobs_shares():
+    spec = {'sweeps': [{'grid': {'ngl': [0], 'threads': [4, 8]}},
+                       {'grid': {'ngl': 99, 'ts': ["1", "1/1", "1/0/1"]}},
+                       {'grid': {'ngl': 20, 'threads': 4}}]}
+    jobs = make_jobs(spec, cores_per_numa_node=4)
+    assert [(j['gpus'], j['numa_nodes']) for j in jobs] == [(0, 1), (0, 2), (1, 0), (2, 0), (2, 0), (1, 1)]
+    assert [j['index'] for j in jobs] == list(range(1, 7))
+    assert jobs[0]['section'] == "Test 1: ngl=0 threads=4"
+
+def test_make_jobs_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="thread"):
+        make_jobs({'grid': {'ngl': 0, 'thread': 4}}, cores_per_numa_node=4)
+
+def job(gpus, numa_nodes):
+    return {'gpus': gpus, 'numa_nodes': numa_nodes}
+
+def test_resource_pool_shares():
+    pool = ResourcePool(['0', '1'], [0, 1])
+    first = pool.try_acquire(job(1, 0))
+    assert first['gpus'] == ['0']
+    assert pool.try_acquire(job(2, 0)) is None
+    second = pool.try_acquire(job(1, 0))
+    assert second['gpus'] == ['1']
+    pool.release(first)
+    pool.release(second)
+    assert pool.try_acquire(job(2, 0))['gpus'] == ['0', '1']
+    assert not pool.fits_ever(job(3, 0))
+
+def test_resource_pool_keeps_unpinned_jobs_off_pinned_ones():
+    pool = ResourcePool(['0', '1'], [0, 1])
+    gpu = pool.try_acquire(job(1, 0))
+    assert pool.try_acquire(job(0, 1)) is None
+    assert pool.try_acquire(job(1, 0)) is not None
+    pool.release(gpu)
+    assert pool.try_acquire(job(0, 1)) is None  # the second GPU job still runs
+    pool = ResourcePool(['0', '1'], [0, 1])
+    cpu = pool.try_acquire(job(0, 1))
+    assert pool.try_acquire(job(1, 0)) is None
+    assert pool.try_acquire(job(1, 1))['numa_nodes'] == [1]
+    pool.release(cpu)
+
+def record(setup_key, n_prompt, n_gen, **extra):
+    return {'setup_key': setup_key, 'n_prompt': n_prompt, 'n_gen': n_gen, 'n_depth': 0, **extra}
+
+def test_repair_and_read_journal(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    path.write_text(json.dumps(record('a', 512, 0)) + "\n" + '{"setup_key": "a", "n_pro')
+    repair_journal(path)
+    assert path.read_text().endswith("\n")
+    assert read_journal(path) == [record('a', 512, 0)]
+    repair_journal(tmp_path / "missing.jsonl")
+
+def test_remaining_job():
+    job = {'params': {'ngl': 99}, 'setup_key': 'a'}
+    assert remaining_job(job, {}) is job
+    done = completed_points([record('a', 512, 0), record('b', 0, 128)])
+    assert remaining_job(job, done)['params'] == {'ngl': 99, 'n_prompt': 0, 'n_gen': 128}
+    done = completed_points([record('a', 512, 0), record('a', 0, 128)])
+    assert remaining_job(job, done) is None
+
+def test_remaining_job_counts_instances():
+    job = {'params': {'ngl': 0, 'n_gen': 0}, 'setup_key': 'a', 'instances': [[0], [1]]}
+    assert remaining_job(job, completed_points([record('a', 512, 0, instance=0)])) is job
+    done = completed_points([record('a', 512, 0, instance=0), record('a', 512, 0, instance=1)])
+    assert remaining_job(job, done) is None
+
+def run_sweep(tmp_path, numa_sysfs, *extra):
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps({'repetitions': 2, 'sweeps': [{'grid': {'ngl': 0, 'threads': 4}},
+                                                             {'grid': {'ngl': 99, 'ts': ["1", "1/1"]}}]}))
+    return sweep.main([str(spec), '--llama-bench', str(FAKE_LLAMA_BENCH), '--output-dir', str(tmp_path / "out"),
+                       '--gpus', '0,1', '--numa-sysfs', str(numa_sysfs), '--telemetry-interval', '0',
+                       '--node', 'testnode', *extra])
+
+def points(records):
+    return sorted((r['test_section'], r['n_prompt'], r['n_gen']) for r in records)
+
+def test_sweep_resume_measures_only_missing_tests(tmp_path, numa_sysfs, fast_fakes):
+    assert run_sweep(tmp_path, numa_sysfs) == 0
+    journal = next((tmp_path / "out").glob("benchmark_results_sweep_*.jsonl"))
+    full = read_journal(journal)
+    assert len(full) == 6
+
+    # A sweep killed mid-write: two records kept, the third cut short
+    lines = journal.read_text().splitlines(keepends=True)
+    journal.write_text("".join(lines[:2]) + lines[2][:40])
+    assert run_sweep(tmp_path, numa_sysfs, '--resume', str(journal)) == 0
+    resumed = read_journal(journal)
+    assert points(resumed) == points(full)
+    assert resumed[:2] == full[:2]
+
+def test_sweep_rejects_unknown_grid_key(tmp_path, numa_sysfs, capsys):
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps({'grid': {'ngl': 99, 'flash': 1}}))
+    assert sweep.main([str(spec), '--llama-bench', str(FAKE_LLAMA_BENCH), '--output-dir', str(tmp_path / "out"),
+                       '--gpus', '0', '--numa-sysfs', str(numa_sysfs)]) == 1
+    assert "flash" in capsys.readouterr().out
+    assert not (tmp_path / "out").exists()